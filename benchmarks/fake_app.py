@@ -0,0 +1,17 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.run_benchmarks import build_orchestrator
+from src.gateway import main
+from src.gateway.main import app
+
+# The gateway answering through the deterministic fake model, for load tests against a real server:
+#   BENCH_LLM_DELAY_MS=800 uvicorn benchmarks.fake_app:app --port 8001
+main._orchestrator = build_orchestrator(
+    os.environ.get("DATABASE_URL") or "school.db",
+    llm_delay=float(os.environ.get("BENCH_LLM_DELAY_MS", "0")) / 1000,
+)
+
+__all__ = ["app"]
@@ -0,0 +1,59 @@
+import asyncio
+import json
+import os
+import re
+from typing import List, Dict, Any, Optional
+from langchain_core.messages import AIMessage
+
+CORPUS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus.json")
+
+# Load tests tag questions ("... (request 17)") so the question cache cannot answer them
+REQUEST_TAG_RE = re.compile(r"\s*\(request \d+\)$")
+
+def tag_question(question: str, n: int) -> str:
+    return f"{question} (request {n})"
+
+def load_corpus(path: str = CORPUS_PATH) -> List[Dict[str, str]]:
+    """The benchmark questions, each with the SQL the fake model answers it with."""
+    with open(path) as f:
+        return json.load(f)
+
+class FakeChatModel:
+    """
+    Deterministic stand-in for a chat model: answers each known question with
+    its canned SQL after a fixed `delay` (seconds), and anything else with a
+    clarification; a load-test request tag at the end of a question is
+    ignored. Token usage is estimated at four characters per token, so the
+    LLM metrics have something to count.
+    """
+    model_name = "fake-llm"
+
+    def __init__(self, answers: Dict[str, str], delay: float = 0.0):
+        self.answers = {self._key(q): sql for q, sql in answers.items()}
+        self.delay = delay
+        self.calls = 0
+
+    @classmethod
+    def from_corpus(cls, corpus: Optional[List[Dict[str, str]]] = None, delay: float = 0.0) -> "FakeChatModel":
+        corpus = load_corpus() if corpus is None else corpus
+        return cls({item["question"]: item["sql"] for item in corpus}, delay=delay)
+
+    async def ainvoke(self, messages, *args, **kwargs) -> AIMessage:
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        question = messages[-1].content
+        content = self.answers.get(self._key(question), "CLARIFICATION: The benchmark model does not know this question.")
+        prompt_chars = sum(len(m.content) for m in messages)
+        return AIMessage(
+            content=content,
+            usage_metadata={
+                "input_tokens": prompt_chars // 4,
+                "output_tokens": len(content) // 4,
+                "total_tokens": (prompt_chars + len(content)) // 4,
+            },
+        )
+
+    @staticmethod
+    def _key(question: str) -> str:
+        return " ".join(REQUEST_TAG_RE.sub("", question).lower().split())
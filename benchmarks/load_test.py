@@ -0,0 +1,204 @@
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import List, Dict, Any, Optional, Callable
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+from benchmarks.fake_llm import load_corpus, tag_question
+from benchmarks.stats import summarize, environment
+
+DEFAULT_LEVELS = [1, 2, 4, 8, 16, 32, 64, 128, 256]
+
+class LoopLagMonitor:
+    """
+    Measures event-loop lag: how much later than asked a short sleep wakes up.
+    Anything blocking the loop (synchronous I/O, heavy CPU in a coroutine)
+    shows up here. It only says something about the server when the app runs
+    in this process.
+    """
+    def __init__(self, interval: float = 0.01):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self.samples = []
+        self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self) -> List[float]:
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        return self.samples
+
+    async def _run(self):
+        while True:
+            started_at = time.perf_counter()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.perf_counter() - started_at - self.interval) * 1000)
+
+@asynccontextmanager
+async def in_process_client(db_path: str = "school.db", llm_delay: float = 0.0):
+    """An httpx client on the gateway app through the ASGI transport, answering with the fake model."""
+    from benchmarks.run_benchmarks import build_orchestrator
+    from src.gateway import main
+    previous = main._orchestrator
+    main._orchestrator = build_orchestrator(db_path, llm_delay)
+    try:
+        async with httpx.AsyncClient(transport=httpx.ASGITransport(app=main.app), base_url="http://gateway") as client:
+            yield client
+    finally:
+        main._orchestrator = previous
+
+async def run_level(
+    client: httpx.AsyncClient,
+    question: Callable[[int], str],
+    concurrency: int,
+    requests: int,
+    timeout: float = 60.0,
+    monitor: Optional[LoopLagMonitor] = None,
+) -> Dict[str, Any]:
+    """Sends `requests` asks from `concurrency` workers, each issuing its next request as soon as the last returns."""
+    latencies: List[float] = []
+    errors: Dict[str, int] = {}
+    counter = itertools.count()
+
+    async def worker():
+        while True:
+            n = next(counter)
+            if n >= requests:
+                return
+            started_at = time.perf_counter()
+            try:
+                response = await client.post("/api/v1/ask", json={"query": question(n)}, timeout=timeout)
+                if response.status_code != 200:
+                    kind = f"http_{response.status_code}"
+                else:
+                    kind = response.json().get("type")
+            except httpx.HTTPError as e:
+                kind = type(e).__name__
+            latencies.append((time.perf_counter() - started_at) * 1000)
+            if kind != "answer":
+                errors[kind] = errors.get(kind, 0) + 1
+
+    if monitor is not None:
+        monitor.start()
+    started_at = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started_at
+    lag = await monitor.stop() if monitor is not None else None
+
+    failed = sum(errors.values())
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(requests / elapsed, 2) if elapsed else 0.0,
+        "error_rate": round(failed / requests, 4) if requests else 0.0,
+        "errors": errors,
+        "latency": summarize(latencies),
+        "loop_lag": summarize(lag) if lag is not None else None,
+    }
+
+async def sweep(
+    client: httpx.AsyncClient,
+    levels: List[int],
+    corpus: List[Dict[str, str]],
+    requests_per_worker: int = 4,
+    min_requests: int = 20,
+    bust_cache: bool = True,
+    stop_error_rate: float = 0.5,
+    monitor: Optional[LoopLagMonitor] = None,
+    timeout: float = 60.0,
+) -> List[Dict[str, Any]]:
+    """
+    Runs one level per concurrency in `levels`, stopping early once the error
+    rate passes `stop_error_rate`. With `bust_cache`, every request gets a
+    unique tag so each one pays for the (simulated) LLM call instead of being
+    answered by the question cache.
+    """
+    results = []
+    sent = itertools.count()
+
+    def question(n: int) -> str:
+        text = corpus[n % len(corpus)]["question"]
+        return tag_question(text, next(sent)) if bust_cache else text
+
+    for concurrency in levels:
+        requests = max(min_requests, concurrency * requests_per_worker)
+        result = await run_level(client, question, concurrency, requests, timeout=timeout, monitor=monitor)
+        results.append(result)
+        print_level(result)
+        if result["error_rate"] > stop_error_rate:
+            print(f"Stopping: error rate {result['error_rate']:.0%} at concurrency {concurrency}")
+            break
+    return results
+
+def print_level(result: Dict[str, Any]):
+    latency, lag = result["latency"], result["loop_lag"]
+    lag_text = f"{lag['p99_ms']:>10.1f}" if lag and lag.get("count") else f"{'-':>10}"
+    print(
+        f"{result['concurrency']:>6}{result['throughput_rps']:>10.1f}{latency.get('p50_ms', 0):>10.1f}"
+        f"{latency.get('p95_ms', 0):>10.1f}{latency.get('p99_ms', 0):>10.1f}{result['error_rate'] * 100:>8.1f}{lag_text}"
+    )
+
+async def run(args) -> Dict[str, Any]:
+    corpus = load_corpus(args.corpus) if args.corpus else load_corpus()
+    levels = [int(level) for level in args.levels.split(",")]
+    print(f"{'conc':>6}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'err %':>8}{'lag p99':>10}")
+    options = dict(
+        requests_per_worker=args.requests_per_worker,
+        bust_cache=not args.allow_cache_hits,
+        stop_error_rate=args.stop_error_rate,
+        timeout=args.timeout,
+    )
+    if args.url:
+        # Against a running server the server's loop lag cannot be observed from here
+        limits = httpx.Limits(max_connections=max(levels), max_keepalive_connections=max(levels))
+        async with httpx.AsyncClient(base_url=args.url, limits=limits) as client:
+            levels_report = await sweep(client, levels, corpus, **options)
+    else:
+        async with in_process_client(args.db, args.llm_delay_ms / 1000) as client:
+            levels_report = await sweep(client, levels, corpus, monitor=LoopLagMonitor(), **options)
+    return {
+        "meta": {
+            **environment(),
+            "target": args.url or "in-process",
+            "db": None if args.url else args.db,
+            "llm_delay_ms": None if args.url else args.llm_delay_ms,
+            "cache_busting": not args.allow_cache_hits,
+        },
+        "levels": levels_report,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency sweep against /api/v1/ask, in-process or against a running server.")
+    parser.add_argument("--url", help="Base URL of a running gateway (e.g. one started as benchmarks.fake_app:app); in-process if omitted")
+    parser.add_argument("--db", default="school.db", help="Database for the in-process gateway")
+    parser.add_argument("--llm-delay-ms", type=float, default=500.0, help="Simulated LLM latency of the in-process fake model")
+    parser.add_argument("--levels", default=",".join(str(level) for level in DEFAULT_LEVELS), help="Comma-separated concurrency levels")
+    parser.add_argument("--requests-per-worker", type=int, default=4, help="Requests per worker at each level (at least 20 per level)")
+    parser.add_argument("--allow-cache-hits", action="store_true", help="Repeat questions verbatim so the question cache can answer them")
+    parser.add_argument("--stop-error-rate", type=float, default=0.5, help="Stop the sweep once a level's error rate passes this")
+    parser.add_argument("--timeout", type=float, default=60.0, help="Per-request timeout in seconds")
+    parser.add_argument("--corpus", help="Question corpus JSON (default: benchmarks/corpus.json)")
+    parser.add_argument("--output", help="Write the results as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import List, Dict, Any, Optional
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_llm import FakeChatModel, load_corpus
+from benchmarks.stats import summarize, environment, compare
+
+def build_orchestrator(db_path: str, llm_delay: float = 0.0, corpus: Optional[List[Dict[str, str]]] = None, templates: bool = True):
+    """
+    A QueryLifecycleAgent on `db_path` whose only model is the deterministic
+    fake. With `templates=False` the template fast path is off, so every
+    question goes through the (fake) LLM.
+    """
+    from src.agents.query_lifecycle import QueryLifecycleAgent
+    orchestrator = QueryLifecycleAgent(db_path)
+    orchestrator.intent_agent.models = [FakeChatModel.from_corpus(corpus, delay=llm_delay)]
+    if not templates:
+        orchestrator.template_matcher = None
+    return orchestrator
+
+async def run_suite(orchestrator, corpus: List[Dict[str, str]], iterations: int = 20, warmup: int = 2, cold: bool = True) -> Dict[str, Any]:
+    """
+    Runs every corpus question `iterations` times (after `warmup` untimed
+    rounds) through `QueryLifecycleAgent.run`. With `cold`, the question and
+    result caches are cleared before each run, so every run pays for the LLM
+    call and the query; otherwise repeats are served from the caches.
+    """
+    totals: List[float] = []
+    stages: Dict[str, List[float]] = {}
+    per_question: Dict[str, List[float]] = {item["question"]: [] for item in corpus}
+    errors = 0
+    started_at = None
+
+    for round_no in range(warmup + iterations):
+        timed = round_no >= warmup
+        if timed and started_at is None:
+            started_at = time.perf_counter()
+        for item in corpus:
+            if cold:
+                orchestrator.question_cache.clear()
+                if orchestrator.db_client.cache is not None:
+                    orchestrator.db_client.cache.clear()
+            run_started_at = time.perf_counter()
+            result = await orchestrator.run(item["question"])
+            elapsed_ms = (time.perf_counter() - run_started_at) * 1000
+            if not timed:
+                continue
+            data = result.get("data")
+            if result.get("clarification") or result.get("aborted") or (data is not None and data.error):
+                errors += 1
+            totals.append(elapsed_ms)
+            per_question[item["question"]].append(elapsed_ms)
+            for stage, ms in (result.get("timings") or {}).items():
+                stages.setdefault(stage, []).append(ms)
+
+    wall_s = time.perf_counter() - started_at if started_at is not None else 0.0
+    return {
+        "runs": len(totals),
+        "errors": errors,
+        "wall_s": round(wall_s, 3),
+        "throughput_qps": round(len(totals) / wall_s, 2) if wall_s else 0.0,
+        "total": summarize(totals),
+        "stages": {stage: summarize(samples) for stage, samples in stages.items()},
+        "questions": {q: summarize(samples) for q, samples in per_question.items()},
+    }
+
+def print_report(report: Dict[str, Any]):
+    print(f"{report['runs']} runs, {report['errors']} errors, {report['throughput_qps']} q/s")
+    print(f"{'':<24}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = [("total", report["total"])] + [(f"  {stage}", stats) for stage, stats in report["stages"].items()]
+    for name, stats in rows:
+        if stats.get("count"):
+            print(f"{name:<24}{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the query lifecycle end to end with a deterministic fake LLM.")
+    parser.add_argument("--db", default="school.db", help="Database to run against (SQLite path or postgresql:// URL)")
+    parser.add_argument("--corpus", help="Question corpus JSON (default: benchmarks/corpus.json)")
+    parser.add_argument("--iterations", type=int, default=20, help="Timed rounds over the corpus")
+    parser.add_argument("--warmup", type=int, default=2, help="Untimed rounds before measuring")
+    parser.add_argument("--llm-delay-ms", type=float, default=0.0, help="Simulated LLM latency per call")
+    parser.add_argument("--warm-caches", action="store_true", help="Keep the question/result caches between runs")
+    parser.add_argument("--no-templates", action="store_true", help="Disable the template fast path so every question asks the LLM")
+    parser.add_argument("--output", help="Write the results as JSON")
+    parser.add_argument("--baseline", help="Results JSON of an earlier run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Relative slowdown that counts as a regression")
+    args = parser.parse_args()
+
+    corpus = load_corpus(args.corpus) if args.corpus else load_corpus()
+    orchestrator = build_orchestrator(args.db, args.llm_delay_ms / 1000, corpus, templates=not args.no_templates)
+    report = asyncio.run(run_suite(orchestrator, corpus, args.iterations, args.warmup, cold=not args.warm_caches))
+    report["meta"] = {
+        **environment(),
+        "db": args.db,
+        "iterations": args.iterations,
+        "warmup": args.warmup,
+        "questions": len(corpus),
+        "llm_delay_ms": args.llm_delay_ms,
+        "cold": not args.warm_caches,
+        "templates": not args.no_templates,
+    }
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, threshold=args.threshold)
+        if regressions:
+            print(f"Regressions against {args.baseline} (commit {baseline.get('meta', {}).get('commit')}):")
+            for line in regressions:
+                print(f"  {line}")
+            sys.exit(1)
+        print(f"No regressions against {args.baseline}.")
+
+if __name__ == "__main__":
+    main()
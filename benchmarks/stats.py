@@ -0,0 +1,56 @@
+import math
+import platform
+import subprocess
+import sys
+from datetime import datetime, timezone
+from typing import List, Dict, Any, Sequence
+
+def percentile(ordered: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of an already sorted sequence."""
+    if not ordered:
+        return 0.0
+    return ordered[max(0, math.ceil(q / 100 * len(ordered)) - 1)]
+
+def summarize(samples_ms: Sequence[float]) -> Dict[str, Any]:
+    ordered = sorted(samples_ms)
+    if not ordered:
+        return {"count": 0}
+    return {
+        "count": len(ordered),
+        "mean_ms": round(sum(ordered) / len(ordered), 3),
+        "p50_ms": round(percentile(ordered, 50), 3),
+        "p95_ms": round(percentile(ordered, 95), 3),
+        "p99_ms": round(percentile(ordered, 99), 3),
+        "max_ms": round(ordered[-1], 3),
+    }
+
+def environment() -> Dict[str, Any]:
+    """Where a run happened, so results from different machines are not compared blindly."""
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+    }
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], threshold: float = 0.2, min_delta_ms: float = 1.0) -> List[str]:
+    """
+    Regressions of `current` against `baseline`: any p50/p95 of the total or
+    of a stage that grew by more than `threshold` (relative) and by more than
+    `min_delta_ms`, which keeps sub-millisecond noise out.
+    """
+    regressions = []
+    pairs = [("total", current.get("total", {}), baseline.get("total", {}))]
+    for stage, stats in current.get("stages", {}).items():
+        pairs.append((f"stage {stage}", stats, baseline.get("stages", {}).get(stage, {})))
+    for name, now, before in pairs:
+        for key in ("p50_ms", "p95_ms"):
+            if key not in now or key not in before:
+                continue
+            if now[key] > before[key] * (1 + threshold) and now[key] - before[key] > min_delta_ms:
+                regressions.append(f"{name} {key}: {before[key]:.2f} -> {now[key]:.2f} ms (+{(now[key] / before[key] - 1) * 100 if before[key] else math.inf:.0f}%)")
+    return regressions
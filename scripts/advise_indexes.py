@@ -0,0 +1,44 @@
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.retrieval.index_advisor import IndexAdvisor
+from src.retrieval.workload_log import WorkloadLog
+
+def main():
+    parser = argparse.ArgumentParser(description="Recommend indexes for the logged query workload.")
+    parser.add_argument("db_path", nargs="?", default="school.db")
+    parser.add_argument("--workload", help="Workload log (default: <db_path>.workload.json)")
+    parser.add_argument("--top", type=int, default=5, help="Maximum number of recommendations")
+    parser.add_argument("--apply", action="store_true", help="Create the recommended indexes")
+    parser.add_argument("--analyze", action="store_true", help="Run ANALYZE after creating them")
+    args = parser.parse_args()
+
+    workload = WorkloadLog(args.workload or f"{args.db_path}.workload.json")
+    if not workload.entries():
+        print("No logged queries yet; run some questions through the API first.")
+        return
+
+    advisor = IndexAdvisor(args.db_path, workload=workload, max_recommendations=args.top)
+    recommendations = advisor.recommend()
+    if not recommendations:
+        print("No index would improve the logged queries.")
+        return
+
+    for i, rec in enumerate(recommendations, 1):
+        print(f"{i}. {rec['ddl']};")
+        print(f"   {rec['kind']} index, helps {rec['queries']} query shapes "
+              f"({rec['executions']} executions, {rec['total_ms']:.1f} ms logged)")
+        for plan in rec["plans"]:
+            print(f"   - {plan['sql']}")
+            print(f"       before (~{plan['estimated_rows_before']} rows): {' / '.join(plan['before'])}")
+            print(f"       after  (~{plan['estimated_rows_after']} rows): {' / '.join(plan['after'])}")
+
+    if args.apply:
+        for ddl in advisor.apply(recommendations, analyze=args.analyze):
+            print(f"Created: {ddl}")
+
+if __name__ == "__main__":
+    main()
@@ -1,294 +1,428 @@
-import sqlite3
+import argparse
 import os
+import random
+import sqlite3
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import date, timedelta
+from typing import List, Dict, Any, Iterator, Sequence, Tuple
 
 DB_PATH = "school.db"
 
-def init_db():
-    if os.path.exists(DB_PATH):
-        os.remove(DB_PATH)
-    
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    
-    # Enable window functions (if supported by sqlite version)
-    # Most modern sqlite versions support this.
-    
-    print("Creating tables...")
-    
-    # Schema definitions
-    schema = """
-    CREATE TABLE users (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        email TEXT UNIQUE,
-        role TEXT NOT NULL -- 'student', 'teacher', 'admin', 'principal', 'parent'
-    );
-
-    CREATE TABLE departments (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        head_id INTEGER,
-        FOREIGN KEY (head_id) REFERENCES users(id)
-    );
-
-    CREATE TABLE students (
-        user_id INTEGER PRIMARY KEY,
-        grade_level INTEGER,
-        parent_id INTEGER,
-        FOREIGN KEY (user_id) REFERENCES users(id),
-        FOREIGN KEY (parent_id) REFERENCES users(id)
-    );
-
-    CREATE TABLE teachers (
-        user_id INTEGER PRIMARY KEY,
-        department_id INTEGER,
-        specialization TEXT,
-        FOREIGN KEY (user_id) REFERENCES users(id),
-        FOREIGN KEY (department_id) REFERENCES departments(id)
-    );
-
-    CREATE TABLE courses (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        description TEXT,
-        teacher_id INTEGER,
-        FOREIGN KEY (teacher_id) REFERENCES teachers(user_id)
-    );
-
-    CREATE TABLE enrollments (
-        student_id INTEGER,
-        course_id INTEGER,
-        enrollment_date DATE,
-        PRIMARY KEY (student_id, course_id),
-        FOREIGN KEY (student_id) REFERENCES students(user_id),
-        FOREIGN KEY (course_id) REFERENCES courses(id)
-    );
-
-    CREATE TABLE timetable (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        course_id INTEGER,
-        day_of_week TEXT,
-        start_time TIME,
-        end_time TIME,
-        room_number TEXT,
-        FOREIGN KEY (course_id) REFERENCES courses(id)
-    );
-
-    CREATE TABLE assignments (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        course_id INTEGER,
-        title TEXT,
-        description TEXT,
-        due_date DATE,
-        FOREIGN KEY (course_id) REFERENCES courses(id)
-    );
-
-    CREATE TABLE exams (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        course_id INTEGER,
-        title TEXT,
-        exam_date DATE,
-        type TEXT, -- 'midterm', 'final', 'quiz'
-        FOREIGN KEY (course_id) REFERENCES courses(id)
-    );
-
-    CREATE TABLE report_cards (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        student_id INTEGER,
-        course_id INTEGER,
-        grade REAL,
-        remarks TEXT,
-        exam_period TEXT,
-        FOREIGN KEY (student_id) REFERENCES students(user_id),
-        FOREIGN KEY (course_id) REFERENCES courses(id)
-    );
-
-    CREATE TABLE attendance (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        student_id INTEGER,
-        date DATE,
-        status TEXT, -- 'present', 'absent', 'late'
-        FOREIGN KEY (student_id) REFERENCES students(user_id)
-    );
-
-    CREATE TABLE library_books (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        title TEXT NOT NULL,
-        author TEXT,
-        isbn TEXT UNIQUE,
-        category TEXT
-    );
-
-    CREATE TABLE library_borrows (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        book_id INTEGER,
-        student_id INTEGER,
-        borrow_date DATE,
-        due_date DATE,
-        return_date DATE,
-        status TEXT, -- 'borrowed', 'returned', 'overdue'
-        FOREIGN KEY (book_id) REFERENCES library_books(id),
-        FOREIGN KEY (student_id) REFERENCES students(user_id)
-    );
-
-    CREATE TABLE fee_payments (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        student_id INTEGER,
-        amount REAL,
-        payment_date DATE,
-        payment_method TEXT,
-        status TEXT, -- 'paid', 'pending', 'overdue'
-        FOREIGN KEY (student_id) REFERENCES students(user_id)
-    );
-
-    CREATE TABLE clubs (
-        id INTEGER PRIMARY KEY AUTOINCREMENT,
-        name TEXT NOT NULL,
-        description TEXT,
-        teacher_id INTEGER,
-        FOREIGN KEY (teacher_id) REFERENCES teachers(user_id)
-    );
-
-    CREATE TABLE club_memberships (
-        student_id INTEGER,
-        club_id INTEGER,
-        join_date DATE,
-        PRIMARY KEY (student_id, club_id),
-        FOREIGN KEY (student_id) REFERENCES students(user_id),
-        FOREIGN KEY (club_id) REFERENCES clubs(id)
-    );
+SCHEMA = """
+CREATE TABLE users (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    email TEXT UNIQUE,
+    role TEXT NOT NULL -- 'student', 'teacher', 'admin', 'principal', 'parent'
+);
+
+CREATE TABLE departments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    head_id INTEGER,
+    FOREIGN KEY (head_id) REFERENCES users(id)
+);
+
+CREATE TABLE students (
+    user_id INTEGER PRIMARY KEY,
+    grade_level INTEGER,
+    parent_id INTEGER,
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    FOREIGN KEY (parent_id) REFERENCES users(id)
+);
+
+CREATE TABLE teachers (
+    user_id INTEGER PRIMARY KEY,
+    department_id INTEGER,
+    specialization TEXT,
+    FOREIGN KEY (user_id) REFERENCES users(id),
+    FOREIGN KEY (department_id) REFERENCES departments(id)
+);
+
+CREATE TABLE courses (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    description TEXT,
+    teacher_id INTEGER,
+    FOREIGN KEY (teacher_id) REFERENCES teachers(user_id)
+);
+
+CREATE TABLE enrollments (
+    student_id INTEGER,
+    course_id INTEGER,
+    enrollment_date DATE,
+    PRIMARY KEY (student_id, course_id),
+    FOREIGN KEY (student_id) REFERENCES students(user_id),
+    FOREIGN KEY (course_id) REFERENCES courses(id)
+);
+
+CREATE TABLE timetable (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_id INTEGER,
+    day_of_week TEXT,
+    start_time TIME,
+    end_time TIME,
+    room_number TEXT,
+    FOREIGN KEY (course_id) REFERENCES courses(id)
+);
+
+CREATE TABLE assignments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_id INTEGER,
+    title TEXT,
+    description TEXT,
+    due_date DATE,
+    FOREIGN KEY (course_id) REFERENCES courses(id)
+);
+
+CREATE TABLE exams (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    course_id INTEGER,
+    title TEXT,
+    exam_date DATE,
+    type TEXT, -- 'midterm', 'final', 'quiz'
+    FOREIGN KEY (course_id) REFERENCES courses(id)
+);
+
+CREATE TABLE report_cards (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER,
+    course_id INTEGER,
+    grade REAL,
+    remarks TEXT,
+    exam_period TEXT,
+    FOREIGN KEY (student_id) REFERENCES students(user_id),
+    FOREIGN KEY (course_id) REFERENCES courses(id)
+);
+
+CREATE TABLE attendance (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER,
+    date DATE,
+    status TEXT, -- 'present', 'absent', 'late'
+    FOREIGN KEY (student_id) REFERENCES students(user_id)
+);
+
+CREATE TABLE library_books (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    author TEXT,
+    isbn TEXT UNIQUE,
+    category TEXT
+);
+
+CREATE TABLE library_borrows (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    book_id INTEGER,
+    student_id INTEGER,
+    borrow_date DATE,
+    due_date DATE,
+    return_date DATE,
+    status TEXT, -- 'borrowed', 'returned', 'overdue'
+    FOREIGN KEY (book_id) REFERENCES library_books(id),
+    FOREIGN KEY (student_id) REFERENCES students(user_id)
+);
+
+CREATE TABLE fee_payments (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    student_id INTEGER,
+    amount REAL,
+    payment_date DATE,
+    payment_method TEXT,
+    status TEXT, -- 'paid', 'pending', 'overdue'
+    FOREIGN KEY (student_id) REFERENCES students(user_id)
+);
+
+CREATE TABLE clubs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    name TEXT NOT NULL,
+    description TEXT,
+    teacher_id INTEGER,
+    FOREIGN KEY (teacher_id) REFERENCES teachers(user_id)
+);
+
+CREATE TABLE club_memberships (
+    student_id INTEGER,
+    club_id INTEGER,
+    join_date DATE,
+    PRIMARY KEY (student_id, club_id),
+    FOREIGN KEY (student_id) REFERENCES students(user_id),
+    FOREIGN KEY (club_id) REFERENCES clubs(id)
+);
+"""
+
+# Every generated value is drawn from these pools; nothing is built per row beyond formatting
+FIRST_NAMES = [
+    "James", "Mary", "Robert", "Patricia", "John", "Jennifer", "Michael", "Linda", "David", "Elizabeth",
+    "William", "Barbara", "Richard", "Susan", "Joseph", "Jessica", "Thomas", "Sarah", "Charles", "Karen",
+    "Aarav", "Priya", "Wei", "Mei", "Carlos", "Sofia", "Omar", "Fatima", "Kenji", "Yuki",
+    "Liam", "Olivia", "Noah", "Emma", "Ethan", "Ava", "Lucas", "Isabella", "Mateo", "Amara",
+]
+LAST_NAMES = [
+    "Smith", "Johnson", "Williams", "Brown", "Jones", "Garcia", "Miller", "Davis", "Rodriguez", "Martinez",
+    "Hernandez", "Lopez", "Gonzalez", "Wilson", "Anderson", "Thomas", "Taylor", "Moore", "Jackson", "Martin",
+    "Lee", "Perez", "Thompson", "White", "Harris", "Sanchez", "Clark", "Ramirez", "Lewis", "Robinson",
+    "Sharma", "Patel", "Chen", "Wang", "Kim", "Nguyen", "Okafor", "Haddad", "Sato", "Müller",
+]
+DEPARTMENTS = ["Science", "Math", "Arts", "Physical Education", "History", "Computer Science", "Languages"]
+SPECIALIZATIONS = ["Physics", "Calculus", "Literature", "Chemistry", "Biology", "History", "Web Dev", "AI", "French", "Spanish"]
+LIBRARY_CATEGORIES = SPECIALIZATIONS + ["Science", "Technology", "Fiction"]
+SENTENCES = [
+    "An introduction to the core concepts.",
+    "Builds on the foundations from earlier courses.",
+    "Project-based learning with weekly labs.",
+    "Covers theory and practical applications.",
+    "Emphasis on reading, discussion and writing.",
+    "Prepares students for the final examination.",
+]
+BOOK_WORDS = ["Principles", "Foundations", "Advanced", "Modern", "Applied", "Introductory", "Essential", "Practical"]
+ATTENDANCE_STATUSES = ["Present", "Absent", "Late"]
+ATTENDANCE_WEIGHTS = [0.9, 0.05, 0.05]
+START_DATE = date(2024, 2, 1)
+
+# Students per partition of the per-student tables (enrollments, report cards,
+# attendance). Partitions are seeded individually, so the output is the same
+# whatever the number of workers.
+PARTITION_STUDENTS = 5000
+BATCH_ROWS = 50_000
+
+# Bulk-load settings: no rollback journal, no fsync, one writer. A crash
+# mid-load leaves a broken file, which is why the load goes to a temporary file.
+LOAD_PRAGMAS = [
+    "PRAGMA journal_mode = OFF",
+    "PRAGMA synchronous = OFF",
+    "PRAGMA locking_mode = EXCLUSIVE",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -262144",
+]
+
+def entity_counts(scale: float) -> Dict[str, int]:
+    """Row counts for the reference tables; scale 1 is the original demo dataset."""
+    base = {"admins": 10, "teachers": 100, "parents": 450, "students": 500, "courses": 50, "books": 100, "borrows": 50}
+    counts = {name: max(1, round(n * scale)) for name, n in base.items()}
+    counts["principals"] = 2
+    return counts
+
+def user_ids(counts: Dict[str, int]) -> Dict[str, range]:
+    """Users are inserted role by role with explicit ids, so every id range is known up front."""
+    ranges, next_id = {}, 1
+    for role in ("principals", "admins", "teachers", "parents", "students"):
+        ranges[role] = range(next_id, next_id + counts[role])
+        next_id += counts[role]
+    return ranges
+
+def seeded(seed: int, *key: Any) -> random.Random:
+    # String seeds are hashed with SHA-512, so they are stable across runs and processes
+    return random.Random(":".join(str(k) for k in (seed,) + key))
+
+def connect_for_load(path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(path, isolation_level=None)
+    for pragma in LOAD_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+def insert_many(conn: sqlite3.Connection, sql: str, rows: Iterator[tuple]) -> int:
+    total, batch = 0, []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_ROWS:
+            conn.executemany(sql, batch)
+            total += len(batch)
+            batch = []
+    if batch:
+        conn.executemany(sql, batch)
+        total += len(batch)
+    return total
+
+def user_rows(rng: random.Random, ids: range, role: str) -> Iterator[tuple]:
+    firsts = rng.choices(FIRST_NAMES, k=len(ids))
+    lasts = rng.choices(LAST_NAMES, k=len(ids))
+    for user_id, first, last in zip(ids, firsts, lasts):
+        yield user_id, f"{first} {last}", f"{first}.{last}.{user_id}@example.edu".lower(), role
+
+def load_reference_tables(conn: sqlite3.Connection, counts: Dict[str, int], seed: int) -> Dict[str, int]:
+    """Departments, users, teachers, students, courses, assignments and the library."""
+    rng = seeded(seed, "reference")
+    ids = user_ids(counts)
+    loaded = {}
+    conn.execute("BEGIN")
+    loaded["departments"] = insert_many(conn, "INSERT INTO departments (id, name) VALUES (?, ?)", enumerate(DEPARTMENTS, 1))
+
+    users = 0
+    for role, plural in (("principal", "principals"), ("admin", "admins"), ("teacher", "teachers"), ("parent", "parents"), ("student", "students")):
+        users += insert_many(conn, "INSERT INTO users (id, name, email, role) VALUES (?, ?, ?, ?)", user_rows(rng, ids[plural], role))
+    loaded["users"] = users
+
+    teachers = ids["teachers"]
+    loaded["teachers"] = insert_many(conn, "INSERT INTO teachers (user_id, department_id, specialization) VALUES (?, ?, ?)", zip(
+        teachers, rng.choices(range(1, len(DEPARTMENTS) + 1), k=len(teachers)), rng.choices(SPECIALIZATIONS, k=len(teachers))
+    ))
+    students = ids["students"]
+    loaded["students"] = insert_many(conn, "INSERT INTO students (user_id, grade_level, parent_id) VALUES (?, ?, ?)", zip(
+        students, rng.choices(range(9, 13), k=len(students)), rng.choices(ids["parents"], k=len(students))
+    ))
+
+    n = counts["courses"]
+    loaded["courses"] = insert_many(conn, "INSERT INTO courses (id, name, description, teacher_id) VALUES (?, ?, ?, ?)", (
+        (course_id, f"{spec} {number}", description, teacher)
+        for course_id, spec, number, description, teacher in zip(
+            range(1, n + 1), rng.choices(SPECIALIZATIONS, k=n), rng.choices(range(101, 405), k=n),
+            rng.choices(SENTENCES, k=n), rng.choices(teachers, k=n),
+        )
+    ))
+    loaded["assignments"] = insert_many(conn, "INSERT INTO assignments (course_id, title, description, due_date) VALUES (?, ?, ?, ?)", (
+        row for course_id in range(1, n + 1)
+        for row in ((course_id, "Homework 1", "Basic review", "2024-02-15"), (course_id, "Project 1", "Deep dive", "2024-03-01"))
+    ))
+
+    n = counts["books"]
+    loaded["library_books"] = insert_many(conn, "INSERT INTO library_books (id, title, author, isbn, category) VALUES (?, ?, ?, ?, ?)", (
+        (book_id, f"{word} of {spec}", f"{first} {last}", f"978{book_id:010d}", category)
+        for book_id, word, spec, first, last, category in zip(
+            range(1, n + 1), rng.choices(BOOK_WORDS, k=n), rng.choices(SPECIALIZATIONS, k=n),
+            rng.choices(FIRST_NAMES, k=n), rng.choices(LAST_NAMES, k=n), rng.choices(LIBRARY_CATEGORIES, k=n),
+        )
+    ))
+    n = counts["borrows"]
+    loaded["library_borrows"] = insert_many(conn, "INSERT INTO library_borrows (book_id, student_id, borrow_date, due_date, status) VALUES (?, ?, ?, ?, 'Borrowed')", (
+        (book_id, student_id, "2024-02-01", "2024-02-15")
+        for book_id, student_id in zip(rng.choices(range(1, counts["books"] + 1), k=n), rng.choices(students, k=n))
+    ))
+    conn.execute("COMMIT")
+    return loaded
+
+def partitions(counts: Dict[str, int], partition_students: int) -> List[range]:
+    students = user_ids(counts)["students"]
+    return [students[i:i + partition_students] for i in range(0, len(students), partition_students)]
+
+def load_student_partition(
+    conn: sqlite3.Connection, seed: int, index: int, students: Sequence[int], courses: int, days: int, terms: int
+) -> Dict[str, int]:
+    """Enrollments (4-6 courses each), a report card per enrollment and term, and daily attendance."""
+    rng = seeded(seed, "students", index)
+    dates = [(START_DATE + timedelta(days=d)).isoformat() for d in range(days)]
+    periods = [f"Semester {t}" for t in range(1, terms + 1)]
+    course_ids = range(1, courses + 1)
+    enrollments: List[tuple] = []
+    report_cards: List[tuple] = []
+
+    def attendance() -> Iterator[tuple]:
+        # Drawn after each student's enrollments, so the random stream is consumed in one fixed order
+        for student_id in students:
+            for course_id in rng.sample(course_ids, min(courses, rng.randint(4, 6))):
+                enrollments.append((student_id, course_id, "2024-01-15"))
+                for period in periods:
+                    report_cards.append((student_id, course_id, round(rng.uniform(55, 100), 2), period))
+            for day, status in zip(dates, rng.choices(ATTENDANCE_STATUSES, weights=ATTENDANCE_WEIGHTS, k=days)):
+                yield student_id, day, status
+
+    conn.execute("BEGIN")
+    loaded = {"attendance": insert_many(conn, "INSERT INTO attendance (student_id, date, status) VALUES (?, ?, ?)", attendance())}
+    loaded["enrollments"] = insert_many(conn, "INSERT INTO enrollments (student_id, course_id, enrollment_date) VALUES (?, ?, ?)", iter(enrollments))
+    loaded["report_cards"] = insert_many(conn, "INSERT INTO report_cards (student_id, course_id, grade, exam_period) VALUES (?, ?, ?, ?)", iter(report_cards))
+    conn.execute("COMMIT")
+    return loaded
+
+def _build_partition_file(job: Tuple[str, int, int, range, int, int, int]) -> Tuple[str, Dict[str, int]]:
+    """Worker: writes one student partition into its own temporary database file."""
+    directory, seed, index, students, courses, days, terms = job
+    path = os.path.join(directory, f"partition_{index}.db")
+    conn = connect_for_load(path)
+    conn.executescript(SCHEMA)
+    loaded = load_student_partition(conn, seed, index, students, courses, days, terms)
+    conn.close()
+    return path, loaded
+
+def merge_partition(conn: sqlite3.Connection, path: str):
+    # Copied in rowid order without the ids, so AUTOINCREMENT numbers rows exactly as a single-process load would
+    conn.execute("ATTACH DATABASE ? AS part", (path,))
+    conn.execute("BEGIN")
+    conn.execute("INSERT INTO attendance (student_id, date, status) SELECT student_id, date, status FROM part.attendance ORDER BY rowid")
+    conn.execute("INSERT INTO enrollments SELECT * FROM part.enrollments ORDER BY rowid")
+    conn.execute("INSERT INTO report_cards (student_id, course_id, grade, exam_period) SELECT student_id, course_id, grade, exam_period FROM part.report_cards ORDER BY rowid")
+    conn.execute("COMMIT")
+    conn.execute("DETACH DATABASE part")
+
+def init_db(
+    db_path: str = DB_PATH,
+    scale: float = 1.0,
+    days: int = 30,
+    terms: int = 1,
+    seed: int = 42,
+    workers: int = 1,
+    analyze: bool = True,
+    partition_students: int = PARTITION_STUDENTS,
+) -> Dict[str, int]:
     """
-    
-    cursor.executescript(schema)
-    
-    print("Ingesting massive data...")
-    from faker import Faker
-    import random
-    from datetime import datetime, timedelta
-
-    fake = Faker()
-    
-    # 1. Departments
-    depts = ['Science', 'Math', 'Arts', 'Physical Education', 'History', 'Computer Science', 'Languages']
-    dept_ids = []
-    for d in depts:
-        cursor.execute("INSERT INTO departments (name) VALUES (?)", (d,))
-        dept_ids.append(cursor.lastrowid)
-
-    # 2. Users & Roles
-    # Principals (2)
-    principal_ids = []
-    for _ in range(2):
-        name = fake.name()
-        email = fake.unique.email()
-        cursor.execute("INSERT INTO users (name, email, role) VALUES (?, ?, 'principal')", (name, email))
-        principal_ids.append(cursor.lastrowid)
-    
-    # Admins (10)
-    for _ in range(10):
-        name = fake.name()
-        email = fake.unique.email()
-        cursor.execute("INSERT INTO users (name, email, role) VALUES (?, ?, 'admin')", (name, email))
-    
-    # Teachers (100)
-    teacher_user_ids = []
-    specializations = ['Physics', 'Calculus', 'Literature', 'Chemistry', 'Biology', 'History', 'Web Dev', 'AI', 'French', 'Spanish']
-    for _ in range(100):
-        name = fake.name()
-        email = fake.unique.email()
-        cursor.execute("INSERT INTO users (name, email, role) VALUES (?, ?, 'teacher')", (name, email))
-        user_id = cursor.lastrowid
-        teacher_user_ids.append(user_id)
-        
-        dept_id = random.choice(dept_ids)
-        spec = random.choice(specializations)
-        cursor.execute("INSERT INTO teachers (user_id, department_id, specialization) VALUES (?, ?, ?)", (user_id, dept_id, spec))
-
-    # Parents (450)
-    parent_ids = []
-    for _ in range(450):
-        name = fake.name()
-        email = fake.unique.email()
-        cursor.execute("INSERT INTO users (name, email, role) VALUES (?, ?, 'parent')", (name, email))
-        parent_ids.append(cursor.lastrowid)
-
-    # Students (500)
-    student_ids = []
-    for i in range(500):
-        name = fake.name()
-        email = fake.unique.email()
-        parent_id = random.choice(parent_ids)
-        grade_level = random.randint(9, 12)
-        
-        cursor.execute("INSERT INTO users (name, email, role) VALUES (?, ?, 'student')", (name, email))
-        user_id = cursor.lastrowid
-        cursor.execute("INSERT INTO students (user_id, grade_level, parent_id) VALUES (?, ?, ?)", (user_id, grade_level, parent_id))
-        student_ids.append(user_id)
-
-    # 3. Courses (50)
-    course_ids = []
-    for _ in range(50):
-        spec = random.choice(specializations)
-        name = f"{spec} {random.randint(101, 404)}"
-        teacher_id = random.choice(teacher_user_ids)
-        cursor.execute("INSERT INTO courses (name, description, teacher_id) VALUES (?, ?, ?)", (name, fake.sentence(), teacher_id))
-        course_ids.append(cursor.lastrowid)
-
-    # 4. Enrollments (Each student in 4-6 courses)
-    enrollment_data = []
-    report_card_data = []
-    for s_id in student_ids:
-        num_courses = random.randint(4, 6)
-        selected_courses = random.sample(course_ids, num_courses)
-        for c_id in selected_courses:
-            enrollment_data.append((s_id, c_id, '2024-01-15'))
-            # Initial grade
-            grade = round(random.uniform(55, 100), 2)
-            report_card_data.append((s_id, c_id, grade, 'Semester 1'))
-
-    cursor.executemany("INSERT INTO enrollments (student_id, course_id, enrollment_date) VALUES (?, ?, ?)", enrollment_data)
-    cursor.executemany("INSERT INTO report_cards (student_id, course_id, grade, exam_period) VALUES (?, ?, ?, ?)", report_card_data)
-
-    # 5. Assignments (2 per course)
-    assignment_data = []
-    for c_id in course_ids:
-        assignment_data.append((c_id, "Homework 1", "Basic review", "2024-02-15"))
-        assignment_data.append((c_id, "Project 1", "Deep dive", "2024-03-01"))
-    cursor.executemany("INSERT INTO assignments (course_id, title, description, due_date) VALUES (?, ?, ?, ?)", assignment_data)
-
-    # 6. Attendance (~15,000 records: 30 days for 500 students)
-    print("Generating 15,000 attendance records...")
-    attendance_data = []
-    start_date = datetime(2024, 2, 1)
-    for student_id in student_ids:
-        for day in range(30):
-            current_date = (start_date + timedelta(days=day)).strftime('%Y-%m-%d')
-            # Using Title Case for status to match LLM expectations
-            status = random.choices(['Present', 'Absent', 'Late'], weights=[0.9, 0.05, 0.05])[0]
-            attendance_data.append((student_id, current_date, status))
-    
-    # Use batching for the huge attendance insert
-    batch_size = 1000
-    for i in range(0, len(attendance_data), batch_size):
-        cursor.executemany("INSERT INTO attendance (student_id, date, status) VALUES (?, ?, ?)", attendance_data[i:i+batch_size])
-
-    # 7. Library Data
-    # Adding 'Science' as a category for some books to match common queries
-    lib_categories = specializations + ['Science', 'Technology', 'Fiction']
-    books = [(fake.catch_phrase(), fake.name(), fake.isbn13(), random.choice(lib_categories)) for _ in range(100)]
-    cursor.executemany("INSERT INTO library_books (title, author, isbn, category) VALUES (?, ?, ?, ?)", books)
-    
-    # 50 random borrows
-    borrow_data = []
-    for _ in range(50):
-        book_id = random.randint(1, 100)
-        s_id = random.choice(student_ids)
-        borrow_data.append((book_id, s_id, '2024-02-01', '2024-02-15', 'Borrowed'))
-    cursor.executemany("INSERT INTO library_borrows (book_id, student_id, borrow_date, due_date, status) VALUES (?, ?, ?, ?, ?)", borrow_data)
-
-    conn.commit()
+    Generates the school database at `scale` times the demo size, with
+    `days` attendance records per student and `terms` report cards per
+    enrollment. The same seed always produces the same data. It is built in
+    a temporary file and moved into place when complete.
+    """
+    started_at = time.monotonic()
+    counts = entity_counts(scale)
+    tmp_path = f"{db_path}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = connect_for_load(tmp_path)
+    conn.executescript(SCHEMA)
+    loaded = load_reference_tables(conn, counts, seed)
+    for table in ("attendance", "enrollments", "report_cards"):
+        loaded[table] = 0
+
+    jobs = [(index, students) for index, students in enumerate(partitions(counts, partition_students))]
+    print(f"Generating {counts['students']:,} students in {len(jobs)} partition(s) on {workers} worker(s)...")
+    if workers > 1:
+        with tempfile.TemporaryDirectory(dir=os.path.dirname(os.path.abspath(db_path))) as directory, ProcessPoolExecutor(workers) as pool:
+            work = [(directory, seed, index, students, counts["courses"], days, terms) for index, students in jobs]
+            # map() yields in partition order, so merging keeps the row order deterministic
+            for path, part in pool.map(_build_partition_file, work):
+                merge_partition(conn, path)
+                os.remove(path)
+                for table, n in part.items():
+                    loaded[table] += n
+    else:
+        for index, students in jobs:
+            for table, n in load_student_partition(conn, seed, index, students, counts["courses"], days, terms).items():
+                loaded[table] += n
     conn.close()
-    print(f"Database {DB_PATH} expanded successfully with 500 students, 100 teachers, and 15,000+ attendance records.")
+
+    conn = sqlite3.connect(tmp_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    if analyze:
+        # Sampled statistics for the planner (and the cost guard), cheap even on huge tables
+        conn.execute("PRAGMA analysis_limit = 1000")
+        conn.execute("ANALYZE")
+    conn.close()
+
+    # Leftovers of the previous database must not be applied to the new one
+    for suffix in ("-wal", "-shm", ".stats.json"):
+        if os.path.exists(db_path + suffix):
+            os.remove(db_path + suffix)
+    os.replace(tmp_path, db_path)
+
+    elapsed = time.monotonic() - started_at
+    total = sum(loaded.values())
+    print(f"Database {db_path} generated in {elapsed:.1f}s: {total:,} rows ({total / elapsed:,.0f} rows/s)")
+    for table, n in loaded.items():
+        print(f"  {table:<16}{n:>14,}")
+    return loaded
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate the synthetic school database at any scale.")
+    parser.add_argument("--db", default=DB_PATH, help="Output database path")
+    parser.add_argument("--scale", type=float, default=1.0, help="Multiplier on the demo sizes (500 students, 50 courses, ...)")
+    parser.add_argument("--days", type=int, default=30, help="Attendance records per student")
+    parser.add_argument("--terms", type=int, default=1, help="Report cards per enrollment")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed; the same seed gives the same data")
+    parser.add_argument("--workers", type=int, default=1, help="Processes generating student partitions in parallel")
+    parser.add_argument("--no-analyze", action="store_true", help="Skip ANALYZE after loading")
+    args = parser.parse_args()
+    # e.g. --scale 200 --days 180 --terms 2 --workers 8: 100k students, 18M attendance rows, ~1M report cards
+    init_db(args.db, args.scale, args.days, args.terms, args.seed, args.workers, analyze=not args.no_analyze)
 
 if __name__ == "__main__":
-    init_db()
+    main()
@@ -3,16 +3,21 @@ from typing import Dict, Any, Optional
 from langchain_openai import ChatOpenAI
 from langchain_google_genai import ChatGoogleGenerativeAI
 from langchain_core.messages import SystemMessage, HumanMessage
+from .model_router import ModelRouter, model_name
 from ..retrieval.schema_provider import SchemaProvider
+from ..telemetry.metrics import registry
 
 class IntentResolutionAgent:
     """
     A database-aware SQL generation agent.
     Analyzes schema at runtime and generates SQL queries strictly based on the provided schema.
+    Model calls go through a `ModelRouter`, which hedges a slow primary with the
+    next model and skips providers whose circuit breaker is open.
     """
-    def __init__(self):
+    def __init__(self, router: Optional[ModelRouter] = None):
         self.schema_provider = SchemaProvider()
         self.models = self._setup_models()
+        self.router = router or ModelRouter()
 
     def _setup_models(self):
         """Setup available LLMs based on environment variables."""
@@ -56,33 +61,44 @@ CORE RULES:
             HumanMessage(content=query)
         ]
         
-        last_exception = None
-        for model in self.models:
-            try:
-                response = await model.ainvoke(messages)
-                if isinstance(response.content, list):
-                    content = "".join([part.get("text", "") if isinstance(part, dict) else str(part) for part in response.content]).strip()
-                else:
-                    content = str(response.content).strip()
+        try:
+            # Hedged across providers; unhealthy ones are skipped by their circuit breaker
+            content = await self.router.invoke(self.models, lambda model: self._ask(model, messages))
+        except Exception as e:
+            return {"error": f"Internal Model Error: {str(e)}"}
 
-                # Clean markdown code blocks if present
-                if content.startswith("```"):
-                    lines = content.split("\n")
-                    if lines[0].startswith("```"):
-                        lines = lines[1:]
-                    if lines[-1].strip().endswith("```"):
-                        lines = lines[:-1]
-                    content = "\n".join(lines).strip()
-                    if content.lower().startswith("sql"):
-                        content = content[3:].strip()
+        if content.startswith("CLARIFICATION:"):
+            return {"clarification": content.replace("CLARIFICATION:", "").strip()}
 
-                if content.startswith("CLARIFICATION:"):
-                    return {"clarification": content.replace("CLARIFICATION:", "").strip()}
+        return {"sql": content}
 
-                return {"sql": content}
-            except Exception as e:
-                print(f"LLM Model Error ({model.__class__.__name__}): {str(e)}")
-                last_exception = e
-                continue
-        
-        return {"error": f"Internal Model Error: {str(last_exception)}"}
+    async def _ask(self, model, messages) -> str:
+        """One model call, returning the cleaned text of the reply."""
+        name = model_name(model)
+        try:
+            with registry.timed("llm_seconds", model=name):
+                response = await model.ainvoke(messages)
+        except Exception as e:
+            print(f"LLM Model Error ({model.__class__.__name__}): {str(e)}")
+            registry.inc("llm_errors_total", model=name)
+            raise
+        usage = getattr(response, "usage_metadata", None)
+        if isinstance(usage, dict):
+            registry.inc("llm_tokens_total", usage.get("input_tokens", 0), model=name, kind="input")
+            registry.inc("llm_tokens_total", usage.get("output_tokens", 0), model=name, kind="output")
+        if isinstance(response.content, list):
+            content = "".join([part.get("text", "") if isinstance(part, dict) else str(part) for part in response.content]).strip()
+        else:
+            content = str(response.content).strip()
+
+        # Clean markdown code blocks if present
+        if content.startswith("```"):
+            lines = content.split("\n")
+            if lines[0].startswith("```"):
+                lines = lines[1:]
+            if lines[-1].strip().endswith("```"):
+                lines = lines[:-1]
+            content = "\n".join(lines).strip()
+            if content.lower().startswith("sql"):
+                content = content[3:].strip()
+        return content
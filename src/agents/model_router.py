@@ -0,0 +1,210 @@
+import asyncio
+import time
+from collections import deque
+from typing import List, Dict, Any, Optional, Awaitable, Callable
+
+def model_name(model: Any) -> str:
+    for attr in ("model_name", "model"):
+        value = getattr(model, attr, None)
+        if isinstance(value, str):
+            return value
+    return model.__class__.__name__
+
+class ModelHealth:
+    """
+    Latency and error tracking for one model, plus its circuit breaker.
+
+    Latency and error rate are exponentially weighted moving averages; the
+    hedge delay uses the p95 of the last `window` successful latencies. The
+    breaker opens after `failure_threshold` consecutive failures (or when the
+    error rate passes `error_rate_threshold` once `min_samples` calls were
+    seen), stays open for `open_seconds`, then lets a single trial call
+    through (half-open): success closes it, failure re-opens it.
+    """
+    def __init__(
+        self,
+        name: str,
+        alpha: float = 0.2,
+        window: int = 100,
+        min_samples: int = 10,
+        failure_threshold: int = 3,
+        error_rate_threshold: float = 0.5,
+        open_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.open_seconds = open_seconds
+        self.latencies: deque = deque(maxlen=window)
+        self.ewma_latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.state = "closed"
+        self.opened_at = 0.0
+        self.trial_in_flight = False
+
+    def p95(self) -> Optional[float]:
+        if len(self.latencies) < self.min_samples:
+            return None
+        ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+
+    def allow(self, now: float) -> bool:
+        if self.state == "closed":
+            return True
+        if self.state == "open" and now - self.opened_at >= self.open_seconds:
+            self.state = "half_open"
+        if self.state == "half_open" and not self.trial_in_flight:
+            self.trial_in_flight = True
+            return True
+        return False
+
+    def record_success(self, latency: float):
+        self.calls += 1
+        self.latencies.append(latency)
+        self.ewma_latency = latency if self.ewma_latency is None else self.alpha * latency + (1 - self.alpha) * self.ewma_latency
+        self.error_rate = (1 - self.alpha) * self.error_rate
+        self.consecutive_failures = 0
+        self.state = "closed"
+        self.trial_in_flight = False
+
+    def record_failure(self, now: float):
+        self.calls += 1
+        self.failures += 1
+        self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+        self.consecutive_failures += 1
+        self.trial_in_flight = False
+        unhealthy = self.calls >= self.min_samples and self.error_rate > self.error_rate_threshold
+        if self.state == "half_open" or self.consecutive_failures >= self.failure_threshold or unhealthy:
+            self.state = "open"
+            self.opened_at = now
+
+    def record_abandoned(self):
+        """A call cancelled because another model answered first tells nothing about health."""
+        self.trial_in_flight = False
+
+    def snapshot(self) -> Dict[str, Any]:
+        p95 = self.p95()
+        return {
+            "state": self.state,
+            "calls": self.calls,
+            "failures": self.failures,
+            "error_rate": round(self.error_rate, 4),
+            "ewma_latency_s": round(self.ewma_latency, 4) if self.ewma_latency is not None else None,
+            "p95_latency_s": round(p95, 4) if p95 is not None else None,
+        }
+
+class ModelRouter:
+    """
+    Latency-aware routing over an ordered list of chat models.
+
+    Models are tried in preference order, skipping those whose circuit
+    breaker is open. The first is called right away; if it has not answered
+    within its p95 latency (`default_hedge_delay` until enough samples exist),
+    a hedged request is sent to the next healthy model and whichever answers
+    first wins, the other being cancelled and awaited. A failure moves on to the next
+    model immediately. If every breaker is open, all models are tried anyway
+    rather than failing without a single attempt.
+    """
+    def __init__(
+        self,
+        default_hedge_delay: float = 3.0,
+        min_hedge_delay: float = 0.05,
+        **health_options,
+    ):
+        self.default_hedge_delay = default_hedge_delay
+        self.min_hedge_delay = min_hedge_delay
+        self.health_options = health_options
+        # id(model) -> (model, health); the model is kept to detect reused ids
+        self._health: Dict[int, tuple] = {}
+        self._stats = {"requests": 0, "hedges": 0, "hedge_wins": 0, "all_open": 0}
+
+    def health(self, model: Any) -> ModelHealth:
+        entry = self._health.get(id(model))
+        if entry is None or entry[0] is not model:
+            entry = self._health[id(model)] = (model, ModelHealth(model_name(model), **self.health_options))
+        return entry[1]
+
+    def hedge_delay(self, model: Any) -> float:
+        p95 = self.health(model).p95()
+        return max(self.min_hedge_delay, p95 if p95 is not None else self.default_hedge_delay)
+
+    async def invoke(self, models: List[Any], call: Callable[[Any], Awaitable[Any]]) -> Any:
+        """Returns the first successful `call(model)`; raises the last error if every model fails."""
+        if not models:
+            raise RuntimeError("No models configured")
+        self._stats["requests"] += 1
+        candidates = list(models)
+        pending: Dict[asyncio.Task, Any] = {}
+        last_error: Optional[BaseException] = None
+        hedged = False
+
+        def launch(force: bool = False) -> bool:
+            # Breakers are consulted only when a model is actually about to be called
+            while candidates:
+                model = candidates.pop(0)
+                if force or self.health(model).allow(time.monotonic()):
+                    pending[asyncio.ensure_future(self._timed(model, call))] = model
+                    return True
+            return False
+
+        if not launch():
+            self._stats["all_open"] += 1
+            candidates.extend(models)
+            launch(force=True)
+        first = next(iter(pending.values()))
+        try:
+            while pending:
+                # Hedge once the in-flight models are past their p95
+                timeout = min(self.hedge_delay(m) for m in pending.values()) if candidates else None
+                done, _ = await asyncio.wait(pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    if launch():
+                        hedged = True
+                        self._stats["hedges"] += 1
+                    continue
+                # Every finished task is inspected, so no failure goes unretrieved
+                winner = None
+                for task in done:
+                    model = pending.pop(task)
+                    error = task.exception()
+                    if error is not None:
+                        last_error = error
+                    elif winner is None:
+                        winner = (task, model)
+                if winner is not None:
+                    task, model = winner
+                    if hedged and model is not first:
+                        self._stats["hedge_wins"] += 1
+                    return task.result()
+                for _ in done:
+                    launch()
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+            # Losing calls are finished before returning, so none outlives the request
+            await asyncio.gather(*pending, return_exceptions=True)
+            for task, model in pending.items():
+                if task.cancelled():
+                    self.health(model).record_abandoned()
+
+    async def _timed(self, model: Any, call: Callable[[Any], Awaitable[Any]]) -> Any:
+        health = self.health(model)
+        started_at = time.monotonic()
+        try:
+            result = await call(model)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            health.record_failure(time.monotonic())
+            raise
+        health.record_success(time.monotonic() - started_at)
+        return result
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self._stats, "models": {h.name: h.snapshot() for _, h in self._health.values()}}
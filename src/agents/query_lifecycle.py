@@ -1,73 +1,181 @@
-from typing import Dict, Any, List, TypedDict, Optional
+import asyncio
+import os
+import time
+from typing import Dict, Any, List, TypedDict, Optional, AsyncIterator, Tuple, Annotated
 from langgraph.graph import StateGraph, END
 from .intent_agent import IntentResolutionAgent
+from .question_cache import QuestionCache, make_scope, normalize_question
+from .single_flight import SingleFlight
+from .template_matcher import TemplateMatcher
 from ..policy.engine import PolicyEngine
 from ..retrieval.db_client import DBClient
+from ..retrieval.query_planner import QueryCostGuard
+from ..retrieval.rendering import make_writer, render
+from ..retrieval.result_set import ResultSet
 from ..retrieval.schema_provider import SchemaProvider
+from ..telemetry.metrics import registry
+
+def merge_timings(current: Optional[dict], update: Optional[dict]) -> dict:
+    return {**(current or {}), **(update or {})}
 
 class AgentState(TypedDict):
     query: str
     schema: Optional[str]
+    schema_version: Optional[tuple]
     context: Optional[dict]
     intent: Optional[dict]
     authorized: bool
     sql: Optional[str]
-    data: Optional[List[dict]]
+    # Bind values when `sql` is a parameterized statement (template fast path)
+    params: Optional[Any]
+    data: Optional[ResultSet]
     answer: Optional[str]
     clarification: Optional[dict]
+    deadline: Optional[float]
+    aborted: Optional[dict]
+    plan: Optional[dict]
+    output: Optional[dict]
+    truncated: Optional[bool]
+    # Milliseconds per stage; each node adds its own entry
+    timings: Annotated[dict, merge_timings]
 
 class QueryLifecycleAgent:
-    def __init__(self):
+    def __init__(self, db_path: Optional[str] = None):
+        # A SQLite file path or a postgresql:// URL
+        db_path = db_path or os.environ.get("DATABASE_URL") or "school.db"
         self.intent_agent = IntentResolutionAgent()
         self.policy_engine = PolicyEngine()
-        self.db_client = DBClient()
-        self.schema_provider = SchemaProvider()
+        self.db_client = DBClient(db_path)
+        self.schema_provider = SchemaProvider(db_path, backend=self.db_client.backend)
+        self.question_cache = QuestionCache()
+        self.resolutions = SingleFlight()
+        # Common question shapes are answered without the LLM; None disables the fast path
+        self.template_matcher = TemplateMatcher(dialect=self.db_client.backend.dialect)
+        # The cost guard reads SQLite query plans
+        self.cost_guard = None
+        if self.db_client.backend.dialect == "sqlite":
+            self.cost_guard = QueryCostGuard(db_path, pool=self.db_client.pool, stats=self.schema_provider.stats)
         self._build_graph()
 
-    def _build_graph(self):
+    def _build_workflow(self, execute: bool) -> StateGraph:
+        """
+        The lifecycle graph. With `execute=False` it stops once the SQL has been
+        authorized and cost-checked, for callers that execute it themselves (streaming).
+        """
         workflow = StateGraph(AgentState)
-        
+        after = "summarize" if execute else END
+
         # Define nodes
-        workflow.add_node("fetch_schema", self._fetch_schema)
-        workflow.add_node("resolve_intent", self._resolve_intent)
-        workflow.add_node("enforce_policy", self._enforce_policy)
-        workflow.add_node("execute_sql", self._execute_sql)
-        workflow.add_node("summarize", self._summarize)
-        
+        workflow.add_node("match_template", self._traced("match_template", self._match_template))
+        workflow.add_node("fetch_schema", self._traced("fetch_schema", self._fetch_schema))
+        workflow.add_node("resolve_intent", self._traced("resolve_intent", self._resolve_intent))
+        workflow.add_node("enforce_policy", self._traced("enforce_policy", self._enforce_policy))
+        workflow.add_node("plan_query", self._traced("plan_query", self._plan_query))
+        if execute:
+            workflow.add_node("execute_sql", self._traced("execute_sql", self._execute_sql))
+            workflow.add_node("summarize", self._traced("summarize", self._summarize))
+
         # Define edges
-        workflow.set_entry_point("fetch_schema")
+        workflow.set_entry_point("match_template")
+        workflow.add_conditional_edges(
+            "match_template",
+            self._template_outcome,
+            {
+                "matched": "enforce_policy",
+                "miss": "fetch_schema"
+            }
+        )
         workflow.add_edge("fetch_schema", "resolve_intent")
         workflow.add_edge("resolve_intent", "enforce_policy")
         workflow.add_conditional_edges(
             "enforce_policy",
             self._is_authorized,
             {
-                "authorized": "execute_sql",
+                "authorized": "plan_query",
                 "denied": END,
-                "clarify": "summarize"
+                "clarify": after
             }
         )
-        workflow.add_edge("execute_sql", "summarize")
-        workflow.add_edge("summarize", END)
-        
-        self.app = workflow.compile()
+        workflow.add_conditional_edges(
+            "plan_query",
+            self._plan_outcome,
+            {
+                "execute": "execute_sql" if execute else END,
+                "clarify": after,
+                "reject": after
+            }
+        )
+        if execute:
+            workflow.add_edge("execute_sql", "summarize")
+            workflow.add_edge("summarize", END)
+        return workflow
+
+    def _build_graph(self):
+        self.app = self._build_workflow(execute=True).compile()
+        self.plan_app = self._build_workflow(execute=False).compile()
+
+    @staticmethod
+    def _traced(stage: str, node):
+        """Wraps a node so its latency goes into the stage histogram and the state's `timings`."""
+        async def traced(state: AgentState):
+            started_at = time.monotonic()
+            try:
+                update = await node(state)
+            except Exception:
+                registry.inc("stage_errors_total", stage=stage)
+                raise
+            finally:
+                elapsed = time.monotonic() - started_at
+                registry.observe("stage_seconds", elapsed, stage=stage)
+            return {**update, "timings": {stage: round(elapsed * 1000, 2)}}
+        return traced
+
+    async def _match_template(self, state: AgentState):
+        # Template matches skip the schema summary and the LLM altogether
+        if self.template_matcher is None:
+            return {}
+        # Checking the snapshot can be a catalog round trip (PostgreSQL); keep it off the event loop
+        schema = await self.db_client.executor.run(self.schema_provider.get_full_schema)
+        match = self.template_matcher.match(state["query"], schema)
+        if match is None:
+            return {}
+        return {"intent": {**match.intent, "template": match.template}, "sql": match.statement.sql, "params": match.statement.params}
+
+    def _template_outcome(self, state: AgentState):
+        return "matched" if state.get("sql") else "miss"
 
     async def _fetch_schema(self, state: AgentState):
-        schema = self.schema_provider.get_schema_summary()
-        return {"schema": schema}
+        # Batches fetch the schema up front for every item
+        if state.get("schema") is not None:
+            return {}
+        # Only the tables relevant to the question go into the prompt
+        schema = self.schema_provider.get_relevant_summary(state["query"])
+        return {"schema": schema, "schema_version": self.schema_provider.version}
 
     async def _resolve_intent(self, state: AgentState):
-        result = await self.intent_agent.resolve(state["query"], state["schema"])
+        # Repeat (or near-duplicate) questions against the same schema skip the LLM
+        scope = make_scope(state.get("schema_version"), state.get("context"))
+        result = self.question_cache.get(state["query"], scope)
+        if result is None:
+            # Identical questions arriving together share one LLM call
+            key = (scope, normalize_question(state["query"]))
+            result = await self.resolutions.do(key, lambda: self._resolve_uncached(state["query"], state["schema"], scope))
         if "error" in result:
             print(f"ERROR in _resolve_intent: {result['error']}")
-            return {"answer": f"Error: {result['error']}", "authorized": False, "data": [{"error": result['error']}]}
+            registry.inc("stage_errors_total", stage="resolve_intent")
+            return {"answer": f"Error: {result['error']}", "authorized": False, "data": ResultSet.failed({"error": result['error']})}
         if "clarification" in result:
             return {"clarification": result, "authorized": False}
         return {"intent": result, "sql": result.get("sql")}
 
+    async def _resolve_uncached(self, query: str, schema: str, scope) -> Dict[str, Any]:
+        result = await self.intent_agent.resolve(query, schema)
+        self.question_cache.put(query, scope, result)
+        return result
+
     async def _enforce_policy(self, state: AgentState):
         # If already failed or clarification needed, don't override
-        if state.get("clarification") or state.get("data") and "error" in state["data"][0]:
+        if state.get("clarification") or state.get("data") and state["data"].error:
             return {"authorized": False}
         
         # Simplified policy for now
@@ -79,50 +187,241 @@ class QueryLifecycleAgent:
             return "clarify"
         return "authorized" if state["authorized"] else "denied"
 
+    async def _plan_query(self, state: AgentState):
+        # EXPLAIN the generated SQL and reject, clarify or LIMIT it before it costs anything
+        plan = None
+        if state.get("sql") and self.cost_guard is not None:
+            plan = await self.db_client.executor.run(self.cost_guard.check, state["sql"], state.get("params"))
+        if plan is None or plan["action"] in ("allow", "limit"):
+            return {"plan": plan, "sql": plan["sql"] if plan else state.get("sql")}
+        if plan["action"] == "clarify":
+            return {"plan": plan, "clarification": {"clarification": plan["message"]}}
+        return {"plan": plan, "data": ResultSet.failed({"error": plan["message"]})}
+
+    def _plan_outcome(self, state: AgentState):
+        plan = state.get("plan")
+        if plan is None or plan["action"] in ("allow", "limit"):
+            return "execute"
+        return plan["action"]
+
     async def _execute_sql(self, state: AgentState):
         if not state.get("sql"):
-            return {"data": [{"error": "No SQL generated"}]}
-        data = self.db_client.execute(state["sql"])
+            return {"data": ResultSet.failed({"error": "No SQL generated"})}
+        data = await self.db_client.aexecute(state["sql"], deadline=state.get("deadline"), params=state.get("params"))
+        if data.aborted:
+            return {"data": data, "aborted": data.aborted}
         return {"data": data}
 
     async def _summarize(self, state: AgentState):
         if state.get("clarification"):
             return {"answer": state["clarification"]["clarification"], "type": "clarification"}
-            
-        # Format the data results as a table if possible
-        data_summary = ""
-        if state["data"]:
-            if isinstance(state["data"], list) and len(state["data"]) > 0:
-                if "error" in state["data"][0]:
-                    data_summary = f"\nError: {state['data'][0]['error']}"
-                else:
-                    # Implement simple Markdown table formatting
-                    headers = state["data"][0].keys()
-                    header_str = " | ".join(headers)
-                    sep_str = " | ".join(["---"] * len(headers))
-                    rows = []
-                    for row in state["data"]:
-                        rows.append(" | ".join([str(v) for v in row.values()]))
-                    data_summary = f"\n\n| {header_str} |\n| {sep_str} |\n| " + " |\n| ".join(rows) + " |"
+
+        data = state["data"]
+        if data is None or data.error or not data:
+            return {"answer": self._answer(state)}
+        # Only the rows that fit the output caps are ever formatted
+        fmt, limits = self._output_options(state)
+        rendering = render(data, fmt, **limits)
+        return {"answer": self._answer(state, rendering.text, rendering.summary), "truncated": rendering.truncated}
+
+    def _output_options(self, state: AgentState) -> Tuple[str, Dict[str, int]]:
+        output = state.get("output") or {}
+        limits = {k: output[k] for k in ("max_rows", "max_bytes") if output.get(k)}
+        return output.get("format") or "markdown", limits
+
+    def _answer(self, state: AgentState, table: Optional[str] = None, note: Optional[str] = None) -> str:
+        data = state.get("data")
+        fmt, _ = self._output_options(state)
+        if table is None:
+            if data is None:
+                data_summary = "\nNo data returned."
+            elif data.error:
+                data_summary = f"\nError: {data.error}"
             else:
                 data_summary = "\nNo records found."
+        elif fmt != "markdown":
+            # Machine-readable formats carry the result alone
+            return table
+        else:
+            data_summary = "\n\n" + table.rstrip("\n")
+            if note:
+                data_summary += f"\n\n_{note}_"
+
+        plan = state.get("plan")
+        if plan and plan["action"] == "limit" and table is not None:
+            data_summary += f"\n\n_{plan['message']}_"
+
+        params = f"\n\n**Parameters:** `{list(state['params'])}`" if state.get("params") else ""
+        return f"**SQL used:**\n```sql\n{state['sql']}\n```{params}\n\n**Results:**{data_summary}"
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of the caches, the LLM router and the database client, for /metrics."""
+        return {
+            "question_cache": self.question_cache.metrics(),
+            "resolutions": self.resolutions.metrics(),
+            "llm": self.intent_agent.router.metrics(),
+            "db": self.db_client.metrics(),
+            "template_matcher": self.template_matcher.metrics() if self.template_matcher is not None else {},
+        }
+
+    async def run(self, query: str, context: Optional[dict] = None, deadline: Optional[float] = None, output: Optional[dict] = None):
+        """
+        Runs the full lifecycle. `deadline` is an absolute `time.monotonic()`
+        value; SQL execution is aborted once it passes. `output` selects how
+        results are rendered: `format` (markdown, json, csv or columns),
+        `max_rows` and `max_bytes`.
+        """
+        result = await self.app.ainvoke(self._initial_state(query, context, deadline, output))
+        return result
+
+    async def run_many(
+        self,
+        queries: List[str],
+        context: Optional[dict] = None,
+        max_concurrency: int = 8,
+        deadline: Optional[float] = None,
+        output: Optional[dict] = None,
+    ) -> List[Dict[str, Any]]:
+        """
+        Runs the lifecycle for a batch of questions sharing one caller context.
+        The schema snapshot is fetched once for the whole batch, at most
+        `max_concurrency` items are in flight at a time, and results come back
+        in input order. An item that fails holds an `error` entry; one that is
+        still running when `deadline` passes holds an `aborted` entry.
+        """
+        started_at = time.monotonic()
+        schema_version = self.schema_provider.version
+        states = []
+        for query in queries:
+            state = self._initial_state(query, context, deadline, output)
+            state["schema"] = self.schema_provider.get_relevant_summary(query)
+            state["schema_version"] = schema_version
+            states.append(state)
+
+        semaphore = asyncio.Semaphore(max(1, max_concurrency))
+
+        async def run_one(state: AgentState) -> Dict[str, Any]:
+            async with semaphore:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                try:
+                    if remaining is not None and remaining <= 0:
+                        raise asyncio.TimeoutError
+                    return await asyncio.wait_for(self.app.ainvoke(state), timeout=remaining)
+                except asyncio.TimeoutError as e:
+                    if deadline is None:
+                        # Raised inside the item itself, not by the batch deadline
+                        error = e
+                    else:
+                        elapsed_ms = round((time.monotonic() - started_at) * 1000, 1)
+                        budget_ms = round((deadline - started_at) * 1000, 1)
+                        return {**state, "aborted": {"reason": "deadline", "elapsed_ms": elapsed_ms, "budget_ms": budget_ms}}
+                except Exception as e:
+                    error = e
+                message = str(error) or type(error).__name__
+                print(f"ERROR in run_many item {state['query']!r}: {message}")
+                registry.inc("request_errors_total", kind="batch_item")
+                return {**state, "error": message}
+
+        return list(await asyncio.gather(*(run_one(state) for state in states)))
+
+    async def prepare(self, query: str, context: Optional[dict] = None, deadline: Optional[float] = None):
+        """Runs the lifecycle up to policy enforcement and the cost guard, without executing the SQL."""
+        return await self.plan_app.ainvoke(self._initial_state(query, context, deadline))
+
+    async def stream(
+        self,
+        query: str,
+        context: Optional[dict] = None,
+        deadline: Optional[float] = None,
+        chunk_size: int = 500,
+        output: Optional[dict] = None,
+    ) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+        """
+        Runs the lifecycle as a sequence of (event, payload) pairs for streaming
+        clients: a `stage` event as each graph node finishes (with its duration),
+        `sql` once the query is authorized and cost-checked, `columns` and one
+        `rows` event per fetched chunk, then `answer`. A run that stops early
+        ends with `clarification`, `denied`, `error` or `aborted` instead.
+        """
+        started_at = time.monotonic()
+        state = self._initial_state(query, context, deadline, output)
+
+        def ms(seconds: float) -> float:
+            return round(seconds * 1000, 1)
+
+        stage_started_at = started_at
+        async for update in self.plan_app.astream(state, stream_mode="updates"):
+            for stage, delta in update.items():
+                state.update(delta or {})
+                now = time.monotonic()
+                yield "stage", {"stage": stage, "duration_ms": ms(now - stage_started_at), "elapsed_ms": ms(now - started_at)}
+                stage_started_at = now
+
+        if state.get("clarification"):
+            yield "clarification", {"clarification": state["clarification"]}
+            return
+        if state.get("data") is not None and state["data"].error:
+            yield "error", {"error": state["data"].error}
+            return
+        if not state.get("authorized"):
+            yield "denied", {}
+            return
+
+        yield "sql", {"sql": state["sql"], "elapsed_ms": ms(time.monotonic() - started_at)}
+        # The answer is rendered chunk by chunk, within the output caps, as rows go out
+        fmt, limits = self._output_options(state)
+        writer = None
+        parts: List[str] = []
+        async for kind, payload in self.stream_rows(state, chunk_size=chunk_size):
+            if kind == "columns":
+                writer = make_writer(fmt, payload, **limits)
+                parts.append(writer.open())
+                yield "columns", {"columns": payload}
+            elif kind == "rows":
+                parts.append(writer.write(payload))
+                yield "rows", {"rows": [list(r) for r in payload]}
+            else:
+                if payload.get("aborted"):
+                    yield "aborted", payload["aborted"]
+                else:
+                    yield "error", {"error": payload.get("error")}
+                return
+
+        row_count = writer.rows_seen if writer else 0
+        if row_count:
+            parts.append(writer.close())
+            answer = self._answer(state, "".join(parts), writer.summary())
         else:
-            data_summary = "\nNo data returned."
-            
-        answer = f"**SQL used:**\n```sql\n{state['sql']}\n```\n\n**Results:**{data_summary}"
-        return {"answer": answer}
+            answer = self._answer(state)
+        yield "answer", {
+            "answer": answer,
+            "row_count": row_count,
+            "truncated": bool(writer and writer.truncated),
+            "elapsed_ms": ms(time.monotonic() - started_at),
+        }
+
+    async def stream_rows(self, state: AgentState, chunk_size: int = 500):
+        """Streams the results of an authorized, prepared state as (kind, payload) chunks."""
+        async for item in self.db_client.astream(state["sql"], chunk_size=chunk_size, deadline=state.get("deadline"), params=state.get("params")):
+            yield item
 
-    async def run(self, query: str, context: Optional[dict] = None):
-        initial_state = {
+    def _initial_state(self, query: str, context: Optional[dict], deadline: Optional[float], output: Optional[dict] = None) -> AgentState:
+        return {
             "query": query,
             "schema": None,
+            "schema_version": None,
             "context": context,
             "intent": None,
             "authorized": False,
             "sql": None,
+            "params": None,
             "data": None,
             "answer": None,
-            "clarification": None
+            "clarification": None,
+            "deadline": deadline,
+            "aborted": None,
+            "plan": None,
+            "output": output,
+            "truncated": None,
+            "timings": {}
         }
-        result = await self.app.ainvoke(initial_state)
-        return result
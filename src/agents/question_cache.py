@@ -0,0 +1,136 @@
+import json
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Set, Tuple, Hashable
+
+# Words, plus the operators and signs that change what is asked ("score > 90" vs
+# "score < 90"); only plain punctuation is dropped.
+_WORD_RE = re.compile(r"[a-z0-9]+|[<>]=?|!=|==?|[-+*/%]")
+# Numbers, quoted strings and capitalized words (names, codes) change the meaning
+# of a question even when the surrounding text is nearly identical.
+_LITERAL_RE = re.compile(r"\d+(?:\.\d+)?|'[^']*'|\"[^\"]*\"|\b[A-Z][A-Za-z0-9]*\b")
+
+def normalize_question(question: str) -> str:
+    return " ".join(_WORD_RE.findall(question.lower()))
+
+def literal_signature(question: str) -> Tuple[str, ...]:
+    # The first word is capitalized anyway, so it says nothing
+    literals = _LITERAL_RE.findall(question.strip())
+    if literals and question.strip().startswith(literals[0]) and literals[0][0].isalpha():
+        literals = literals[1:]
+    return tuple(sorted(l.lower() for l in literals))
+
+# Words that only carry the phrasing of a question. Negations, comparatives,
+# prepositions and units are deliberately absent: they change what is asked.
+STOPWORDS = frozenset({
+    "a", "an", "the", "is", "are", "was", "were", "be", "what", "whats", "which",
+    "please", "me", "us", "can", "could", "would", "you", "tell", "give", "show",
+    "list", "display", "get", "find", "all", "do", "does", "there", "i", "want", "to", "see",
+})
+
+def content_key(normalized: str) -> Tuple[str, ...]:
+    """The words of a normalized question that carry its meaning, in order."""
+    return tuple(w for w in normalized.split() if w not in STOPWORDS)
+
+def make_scope(schema_version: Any, context: Optional[dict]) -> Hashable:
+    """Cache scope: answers are only shared for the same schema and caller context (role, selections)."""
+    return (repr(schema_version), json.dumps(context or {}, sort_keys=True, default=str))
+
+class QuestionCache:
+    """
+    Maps questions to their resolved intent (generated SQL or clarification) so
+    repeat questions skip the LLM.
+
+    Lookups first try the normalized question text exactly, then fall back to
+    near-duplicate matching within the same scope: a cached question is reused
+    only if its content words (see `content_key`) are identical, in order, and
+    it carries the same literals (numbers, quoted strings, capitalized names).
+    Questions may differ in whitespace, punctuation, case and stopwords, never
+    in a word that could change the meaning: "present" vs "absent", "not in",
+    "per week" vs "per month" and "grade 10" vs "grade 11" all miss. Pass
+    `near_matching=False` to use exact matches only.
+    """
+    def __init__(self, max_entries: int = 1024, near_matching: bool = True, ttl: Optional[float] = None):
+        self.max_entries = max_entries
+        self.near_matching = near_matching
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # (scope, normalized) -> (result, content key, literals, stored_at)
+        self._entries: "OrderedDict[Tuple[Hashable, str], tuple]" = OrderedDict()
+        # (scope, content key) -> keys, for near-duplicate lookups
+        self._variants: Dict[Tuple[Hashable, Tuple[str, ...]], Set[Tuple[Hashable, str]]] = {}
+        self._stats = {"exact_hits": 0, "near_hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def get(self, question: str, scope: Hashable) -> Optional[Dict[str, Any]]:
+        normalized = normalize_question(question)
+        key = (scope, normalized)
+        with self._lock:
+            entry = self._live_entry(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._stats["exact_hits"] += 1
+                return entry[0]
+
+            near = self._nearest(scope, normalized, literal_signature(question)) if self.near_matching else None
+            if near is not None:
+                self._entries.move_to_end(near)
+                self._stats["near_hits"] += 1
+                return self._entries[near][0]
+
+            self._stats["misses"] += 1
+            return None
+
+    def put(self, question: str, scope: Hashable, result: Dict[str, Any]):
+        """Stores a resolved intent; errors are never cached."""
+        if "error" in result:
+            return
+        normalized = normalize_question(question)
+        key = (scope, normalized)
+        content = content_key(normalized)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (result, content, literal_signature(question), time.monotonic())
+            self._variants.setdefault((scope, content), set()).add(key)
+            self._stats["stores"] += 1
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._variants.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = self._stats["exact_hits"] + self._stats["near_hits"]
+            lookups = hits + self._stats["misses"]
+            return {**self._stats, "entries": len(self._entries), "hit_rate": round(hits / lookups, 4) if lookups else 0.0}
+
+    def _live_entry(self, key) -> Optional[tuple]:
+        entry = self._entries.get(key)
+        if entry is not None and self.ttl is not None and time.monotonic() - entry[3] > self.ttl:
+            self._remove(key)
+            return None
+        return entry
+
+    def _nearest(self, scope: Hashable, normalized: str, literals: Tuple[str, ...]) -> Optional[Tuple[Hashable, str]]:
+        content = content_key(normalized)
+        if not content:
+            return None
+        for key in list(self._variants.get((scope, content), ())):
+            entry = self._live_entry(key)
+            if entry is not None and entry[2] == literals:
+                return key
+        return None
+
+    def _remove(self, key):
+        _, content, _, _ = self._entries.pop(key)
+        variants = self._variants.get((key[0], content))
+        if variants is not None:
+            variants.discard(key)
+            if not variants:
+                del self._variants[(key[0], content)]
@@ -0,0 +1,62 @@
+import asyncio
+from typing import Dict, Any, Awaitable, Callable, Hashable
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one in-flight call.
+
+    The first caller for a key (the leader) starts `fn()` as a task; callers
+    arriving while it runs await the same task and get the same result, or
+    the same exception. A caller that is cancelled only stops waiting: the
+    shared call keeps running for the others, and is cancelled only once every
+    caller has gone. Nothing is remembered after the call finishes; caching
+    results is the caller's business.
+    """
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+        self._waiters: Dict[Hashable, int] = {}
+        self._stats = {"leaders": 0, "coalesced": 0, "failed": 0, "abandoned": 0}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        task = self._calls.get(key)
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            self._waiters[key] = 0
+            task.add_done_callback(lambda t: self._finished(key, t))
+            self._stats["leaders"] += 1
+        else:
+            self._stats["coalesced"] += 1
+
+        self._waiters[key] += 1
+        try:
+            # shield: one waiter being cancelled must not cancel the shared call
+            return await asyncio.shield(task)
+        except asyncio.CancelledError:
+            if self._calls.get(key) is task:
+                self._waiters[key] -= 1
+                if self._waiters[key] == 0 and not task.done():
+                    # Last one out: nobody wants the result any more
+                    self._forget(key)
+                    task.cancel()
+                    self._stats["abandoned"] += 1
+            raise
+        finally:
+            if self._calls.get(key) is task and task.done():
+                self._forget(key)
+
+    def in_flight(self) -> int:
+        return len(self._calls)
+
+    def metrics(self) -> Dict[str, Any]:
+        return {**self._stats, "in_flight": len(self._calls)}
+
+    def _finished(self, key: Hashable, task: asyncio.Task):
+        if not task.cancelled() and task.exception() is not None:
+            self._stats["failed"] += 1
+        if self._calls.get(key) is task:
+            self._forget(key)
+
+    def _forget(self, key: Hashable):
+        self._calls.pop(key, None)
+        self._waiters.pop(key, None)
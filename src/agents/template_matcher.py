@@ -0,0 +1,215 @@
+import re
+import threading
+import time
+from typing import Dict, Any, Optional, List, Callable, NamedTuple
+from ..retrieval.sql_builder import SQLBuilder, Statement
+from ..telemetry.metrics import registry
+
+# A name slot that caught one of these is really the tail of a more complex question
+_NOT_A_NAME = {
+    "a", "all", "and", "any", "each", "every", "last", "most", "of", "or", "our", "the", "this", "that", "who", "whose", "with", "without",
+    "today", "yesterday", "tomorrow", "week", "month", "year", "term", "semester",
+    "january", "february", "march", "april", "may", "june", "july", "august", "september", "october", "november", "december",
+    "monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday",
+}
+# A proper name: one to three capitalized words ("Alice Smith", "Mary-Jane O'Neil"), nothing after it
+_NAME_RE = re.compile(r"[A-Z][A-Za-z.'\-]{0,29}(?: [A-Z][A-Za-z.'\-]{0,29}){0,2}")
+
+def clean_question(question: str) -> str:
+    """Collapses whitespace and drops trailing punctuation; case is kept for slot values."""
+    return " ".join(question.strip().rstrip("?.!").split())
+
+def column_info(schema: Dict[str, Any], table: str, column: str) -> Optional[Dict[str, Any]]:
+    for col in schema.get(table, {}).get("columns", []):
+        if col["name"] == column:
+            return col
+    return None
+
+def grade_level(value: str, schema: Dict[str, Any]) -> Optional[int]:
+    """A grade level, if it lies within the range the column statistics have seen."""
+    level = int(value)
+    stats = (column_info(schema, "students", "grade_level") or {}).get("stats") or {}
+    if stats.get("min") is not None and stats.get("max") is not None and not stats["min"] <= level <= stats["max"]:
+        return None
+    return level
+
+def _singular(word: str) -> str:
+    return word[:-1] if word.endswith("s") else word
+
+def student_filter(value: str, schema: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """
+    Filter for a student given by id or by proper name. Anything else ("absent
+    students", "Alice in March", "Teachers") is left to the LLM; a word that
+    names a table is never part of a name.
+    """
+    if value.isdigit():
+        return {"column": "attendance.student_id", "operator": "==", "value": int(value)}
+    words = value.lower().split()
+    entities = {_singular(t.lower()) for t in schema}
+    if not _NAME_RE.fullmatch(value) or _NOT_A_NAME.intersection(words) or entities.intersection(_singular(w) for w in words):
+        return None
+    return {"column": "users.name", "operator": "LIKE", "value": value}
+
+def case_insensitive(intent: Dict[str, Any]) -> Dict[str, Any]:
+    """LIKE filters as ILIKE, for PostgreSQL where LIKE is case-sensitive."""
+    filters = intent.get("filters")
+    if not any(f["operator"] == "LIKE" for f in filters or []):
+        return intent
+    return {**intent, "filters": [{**f, "operator": "ILIKE"} if f["operator"] == "LIKE" else f for f in filters]}
+
+class QueryTemplate(NamedTuple):
+    name: str
+    # Matched against the whole (cleaned) question, case-insensitively
+    pattern: re.Pattern
+    # Tables and columns the intent reads; the template is skipped if any is missing
+    requires: Dict[str, List[str]]
+    # (slots, schema) -> SQLBuilder intent, or None if a slot does not resolve
+    build: Callable[[Dict[str, Optional[str]], Dict[str, Any]], Optional[Dict[str, Any]]]
+
+def _average_grade_per_course(slots, schema):
+    return {
+        "action": "aggregate",
+        "function": "AVG",
+        "target": "report_cards.grade",
+        "alias": "average_grade",
+        "joins": [{"from": "report_cards", "to": "courses", "on": "courses.id = report_cards.course_id"}],
+        "group_by": "courses.name",
+        "order_by": "courses.name",
+    }
+
+def _attendance_for_student(slots, schema):
+    student = student_filter(slots["student"], schema)
+    if student is None:
+        return None
+    return {
+        "entities": ["users.name", "attendance.date", "attendance.status"],
+        "joins": [{"from": "attendance", "to": "users", "on": "users.id = attendance.student_id"}],
+        "filters": [student],
+        "order_by": "attendance.date",
+    }
+
+def _students_in_grade(slots, schema):
+    level = grade_level(slots["grade"], schema)
+    if level is None:
+        return None
+    return {
+        "entities": ["users.name", "students.grade_level"],
+        "joins": [{"from": "students", "to": "users", "on": "users.id = students.user_id"}],
+        "filters": [{"column": "students.grade_level", "operator": "==", "value": level}],
+        "order_by": "users.name",
+    }
+
+def _count_students(slots, schema):
+    intent = {"action": "aggregate", "function": "COUNT", "target": "students.user_id", "alias": "student_count"}
+    if slots.get("grade") is not None:
+        level = grade_level(slots["grade"], schema)
+        if level is None:
+            return None
+        intent["filters"] = [{"column": "grade_level", "operator": "==", "value": level}]
+    return intent
+
+DEFAULT_TEMPLATES = [
+    QueryTemplate(
+        "average_grade_per_course",
+        re.compile(r"(?:what is |what's |show |show me |list |get )?(?:the )?(?:average|avg|mean) (?:grade|score|mark)s? (?:per|by|for each|of each|in each) (?:course|class|subject)", re.I),
+        {"report_cards": ["grade", "course_id"], "courses": ["id", "name"]},
+        _average_grade_per_course,
+    ),
+    QueryTemplate(
+        "attendance_for_student",
+        re.compile(r"(?:show |show me |list |get |what is |what's )?(?:the )?attendance (?:records? )?(?:for|of) (?:the )?(?:student )?(?P<student>.+)", re.I),
+        {"attendance": ["student_id", "date", "status"], "users": ["id", "name"]},
+        _attendance_for_student,
+    ),
+    QueryTemplate(
+        "students_in_grade",
+        re.compile(r"(?:list |show |show me |get |who are |which are )?(?:all )?(?:of )?(?:the )?students (?:in|of|from) grade(?: level)? (?P<grade>\d{1,2})", re.I),
+        {"students": ["user_id", "grade_level"], "users": ["id", "name"]},
+        _students_in_grade,
+    ),
+    QueryTemplate(
+        "count_students",
+        re.compile(r"how many students(?: (?:are there|are enrolled|do we have))?(?: (?:are )?in grade(?: level)? (?P<grade>\d{1,2}))?", re.I),
+        {"students": ["user_id", "grade_level"]},
+        _count_students,
+    ),
+]
+
+class TemplateMatch(NamedTuple):
+    template: str
+    intent: Dict[str, Any]
+    statement: Statement
+
+class TemplateMatcher:
+    """
+    Local fast path for the most common question shapes. Each `QueryTemplate`
+    is a pattern with named slots; a question that matches one completely, and
+    whose slots resolve against the schema (the tables and columns exist,
+    grade levels lie within the observed range, names look like names), is
+    turned into a `SQLBuilder` intent and compiled to a parameterized
+    statement without asking the LLM. Anything else is a miss and goes to
+    `IntentResolutionAgent` as before.
+
+    Name filters compare case-insensitively: LIKE on SQLite, ILIKE on
+    PostgreSQL.
+
+    Every lookup is counted per template (`template_lookups_total`, outcome
+    hit / unresolved / miss) and timed (`template_match_seconds`).
+    """
+    def __init__(self, templates: Optional[List[QueryTemplate]] = None, builder: Optional[SQLBuilder] = None, dialect: str = "sqlite"):
+        self.templates = list(DEFAULT_TEMPLATES if templates is None else templates)
+        self.builder = builder or SQLBuilder(dialect)
+        self._lock = threading.Lock()
+        self._stats = {t.name: {"hits": 0, "unresolved": 0} for t in self.templates}
+        self._misses = 0
+
+    def match(self, question: str, schema: Dict[str, Any]) -> Optional[TemplateMatch]:
+        started_at = time.monotonic()
+        text = clean_question(question)
+        for template in self.templates:
+            m = template.pattern.fullmatch(text)
+            if m is None:
+                continue
+            intent = template.build(m.groupdict(), schema) if self._available(template, schema) else None
+            if intent is None:
+                # The shape matched but a slot did not resolve; another template may still fit
+                self._record(template.name, "unresolved")
+                continue
+            if self.builder.dialect.name == "postgresql":
+                intent = case_insensitive(intent)
+            statement = self.builder.build(intent)
+            self._record(template.name, "hit", started_at)
+            return TemplateMatch(template.name, intent, statement)
+        self._record(None, "miss", started_at)
+        return None
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            hits = sum(s["hits"] for s in self._stats.values())
+            lookups = hits + self._misses
+            return {
+                "lookups": lookups,
+                "matched": hits,
+                "misses": self._misses,
+                "match_rate": round(hits / lookups, 4) if lookups else 0.0,
+                "templates": {
+                    name: {**stats, "hit_rate": round(stats["hits"] / lookups, 4) if lookups else 0.0}
+                    for name, stats in self._stats.items()
+                },
+            }
+
+    @staticmethod
+    def _available(template: QueryTemplate, schema: Dict[str, Any]) -> bool:
+        return all(column_info(schema, table, col) is not None for table, cols in template.requires.items() for col in cols)
+
+    def _record(self, template: Optional[str], outcome: str, started_at: Optional[float] = None):
+        label = template or "none"
+        registry.inc("template_lookups_total", template=label, outcome=outcome)
+        if started_at is not None:
+            registry.observe("template_match_seconds", time.monotonic() - started_at, template=label)
+        with self._lock:
+            if template is None:
+                self._misses += 1
+            else:
+                stats = self._stats.setdefault(template, {"hits": 0, "unresolved": 0})
+                stats["hits" if outcome == "hit" else "unresolved"] += 1
@@ -1,37 +1,281 @@
-from fastapi import FastAPI, Depends, HTTPException
-from .models import AskRequest, AskResponse, ResponseType
-from ..agents.query_lifecycle import QueryLifecycleAgent
+import asyncio
+import json
+import os
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from fastapi import FastAPI, Depends, HTTPException, Request
+from fastapi.responses import JSONResponse, PlainTextResponse, StreamingResponse
+from ..telemetry.metrics import registry
+from .models import AskRequest, AskResponse, ResponseType, AbortInfo, ClarificationPayload, BatchAskRequest, BatchAskResponse
+
+# The orchestrator pulls in LangGraph and the model clients, so it is only
+# built on first use (or by the start-up warm-up), never at import time
+_orchestrator = None
+_orchestrator_lock = threading.Lock()
+_warmup = {"state": "pending", "elapsed_ms": None, "error": None}
+
+def get_orchestrator():
+    global _orchestrator
+    if _orchestrator is None:
+        with _orchestrator_lock:
+            if _orchestrator is None:
+                from ..agents.query_lifecycle import QueryLifecycleAgent
+                _orchestrator = QueryLifecycleAgent()
+    return _orchestrator
+
+def __getattr__(name):
+    # `main.orchestrator` keeps working for existing callers
+    if name == "orchestrator":
+        return get_orchestrator()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def warm_up():
+    """Builds the orchestrator (graph compile), loads the schema snapshot and opens the connection pool."""
+    started_at = time.monotonic()
+    _warmup["state"] = "warming"
+    try:
+        orchestrator = get_orchestrator()
+        orchestrator.schema_provider.get_full_schema()
+        orchestrator.db_client.backend.health_check()
+    except Exception as e:
+        print(f"Warm-up failed: {str(e)}")
+        _warmup.update(state="failed", error=str(e))
+        return
+    _warmup.update(state="ready", elapsed_ms=round((time.monotonic() - started_at) * 1000, 1))
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Warm up in the background so the server binds straight away; /ready tells when it is done
+    task = None
+    if os.environ.get("SUTRADHARA_WARMUP", "1") != "0":
+        task = asyncio.ensure_future(asyncio.to_thread(warm_up))
+    else:
+        _warmup["state"] = "disabled"
+    yield
+    if task is not None:
+        task.cancel()
 
 app = FastAPI(
     title="Sutradhara API",
     description="Generic, Domain-Agnostic AI Data Access Platform",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
-# Initialize the orchestrator
-orchestrator = QueryLifecycleAgent()
+# How often a running request checks whether its client has gone away
+DISCONNECT_POLL_INTERVAL = 0.25
+
+async def run_cancellable(coro, http_request: Request, deadline: Optional[float] = None):
+    """
+    Runs `coro` as a task and cancels it if the client disconnects or the
+    deadline passes. Returns (result, abort_reason); result is None when aborted.
+    """
+    task = asyncio.ensure_future(coro)
+    try:
+        while True:
+            timeout = DISCONNECT_POLL_INTERVAL
+            if deadline is not None:
+                timeout = max(0.0, min(timeout, deadline - time.monotonic()))
+            done, _ = await asyncio.wait({task}, timeout=timeout)
+            if done:
+                return task.result(), None
+            if deadline is not None and time.monotonic() >= deadline:
+                reason = "deadline"
+                break
+            if await http_request.is_disconnected():
+                reason = "client_disconnected"
+                break
+    except asyncio.CancelledError:
+        task.cancel()
+        raise
+
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+    return None, reason
+
+def output_options(request) -> dict:
+    """Rendering options of an ask request, as the orchestrator takes them."""
+    return {"format": request.format.value, "max_rows": request.max_rows, "max_bytes": request.max_bytes}
 
 @app.get("/")
 async def root():
     return {"message": "Welcome to Sutradhara API"}
 
+@app.middleware("http")
+async def record_latency(request: Request, call_next):
+    # Streaming responses are timed until their headers are sent
+    started_at = time.monotonic()
+    response = await call_next(request)
+    route = request.scope.get("route")
+    registry.observe("http_request_seconds", time.monotonic() - started_at, path=route.path if route else "unmatched", status=response.status_code)
+    return response
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus text exposition of latency histograms, counters and component gauges."""
+    # A scrape never builds the orchestrator; before first use only process-wide series exist
+    gauges = _orchestrator.metrics() if _orchestrator is not None else None
+    return PlainTextResponse(registry.render(gauges, label_keys={"models": "model", "templates": "template"}), media_type="text/plain; version=0.0.4")
+
+@app.get("/ready")
+async def ready():
+    """Readiness probe: 503 until the start-up warm-up has finished (always ready when it is disabled)."""
+    is_ready = _warmup["state"] in ("ready", "disabled")
+    return JSONResponse({"ready": is_ready, **_warmup}, status_code=200 if is_ready else 503)
+
 @app.post("/api/v1/ask", response_model=AskResponse)
-async def ask(request: AskRequest):
+async def ask(request: AskRequest, http_request: Request):
+    started_at = time.monotonic()
+    deadline = started_at + request.timeout_ms / 1000 if request.timeout_ms else None
+
     # Call the LangGraph orchestrator
-    result = await orchestrator.run(request.query, request.context)
-    
-    # Map AgentState to AskResponse
+    result, abort_reason = await run_cancellable(
+        get_orchestrator().run(request.query, request.context, deadline=deadline, output=output_options(request)), http_request, deadline
+    )
+
+    if abort_reason:
+        return AskResponse(
+            type=ResponseType.ABORTED,
+            answer=f"Request aborted: {abort_reason.replace('_', ' ')}.",
+            aborted=AbortInfo(
+                reason=abort_reason,
+                elapsed_ms=round((time.monotonic() - started_at) * 1000, 1),
+                budget_ms=request.timeout_ms,
+            )
+        )
+
+    response = to_response(result)
+    if request.include_timings:
+        response.timings = result.get("timings")
+    return response
+
+def to_response(result: dict) -> AskResponse:
+    """Maps a finished AgentState to an AskResponse."""
+    if result.get("error"):
+        return AskResponse(type=ResponseType.ERROR, error=result["error"])
+
     if result.get("clarification"):
+        clarification = result["clarification"]
+        if "question" not in clarification:
+            # Agents ask free-text questions: {"clarification": "..."}
+            clarification = ClarificationPayload(question=clarification.get("clarification", ""), options=[])
         return AskResponse(
             type=ResponseType.CLARIFICATION,
-            clarification=result["clarification"]
+            clarification=clarification
         )
-    
+
+    if result.get("aborted"):
+        return AskResponse(
+            type=ResponseType.ABORTED,
+            answer=result.get("answer"),
+            aborted=AbortInfo(**result["aborted"])
+        )
+
     return AskResponse(
         type=ResponseType.ANSWER,
-        answer=result.get("answer", "No answer generated.")
+        answer=result.get("answer", "No answer generated."),
+        sql=result.get("sql"),
+        truncated=result.get("truncated")
+    )
+
+# Default parallelism for batch requests
+BATCH_MAX_CONCURRENCY = 8
+
+@app.post("/api/v1/ask/batch", response_model=BatchAskResponse)
+async def ask_batch(request: BatchAskRequest, http_request: Request):
+    """
+    Answers a batch of questions with one schema fetch and bounded parallelism.
+    Results are returned in order; a failed or timed-out item does not fail
+    the rest of the batch.
+    """
+    started_at = time.monotonic()
+    deadline = started_at + request.timeout_ms / 1000 if request.timeout_ms else None
+    max_concurrency = request.max_concurrency or BATCH_MAX_CONCURRENCY
+
+    results, abort_reason = await run_cancellable(
+        get_orchestrator().run_many(
+            request.queries, request.context, max_concurrency=max_concurrency, deadline=deadline, output=output_options(request)
+        ),
+        http_request,
+    )
+    if abort_reason:
+        # Client went away; nobody is left to read the response
+        raise HTTPException(status_code=499, detail="Client disconnected")
+
+    responses = [to_response(r) for r in results]
+    if request.include_timings:
+        for response, result in zip(responses, results):
+            response.timings = result.get("timings")
+    return BatchAskResponse(
+        results=responses,
+        elapsed_ms=round((time.monotonic() - started_at) * 1000, 1),
     )
 
+def _ndjson(event: dict) -> str:
+    return json.dumps(event, default=str) + "\n"
+
+@app.post("/api/v1/ask/stream")
+async def ask_stream(request: AskRequest):
+    """
+    Streams the answer as newline-delimited JSON: a `sql` event as soon as the
+    query is authorized, then `columns`, one `rows` event per fetched chunk and
+    a final `end` (or `error` / `clarification` / `denied`) event. Rows are
+    never accumulated server-side.
+    """
+    deadline = time.monotonic() + request.timeout_ms / 1000 if request.timeout_ms else None
+    state = await get_orchestrator().prepare(request.query, request.context, deadline=deadline)
+
+    async def events():
+        if state.get("clarification"):
+            yield _ndjson({"type": "clarification", "clarification": state["clarification"]})
+            return
+        if state.get("data") and state["data"].error:
+            yield _ndjson({"type": "error", **state["data"][0]})
+            return
+        if not state.get("authorized"):
+            yield _ndjson({"type": "denied"})
+            return
+
+        yield _ndjson({"type": "sql", "sql": state["sql"]})
+        row_count = 0
+        async for kind, payload in get_orchestrator().stream_rows(state):
+            if kind == "columns":
+                yield _ndjson({"type": "columns", "columns": payload})
+            elif kind == "rows":
+                row_count += len(payload)
+                yield _ndjson({"type": "rows", "rows": [list(r) for r in payload]})
+            else:
+                yield _ndjson({"type": "error", **payload})
+                return
+        yield _ndjson({"type": "end", "row_count": row_count})
+
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+def _sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.post("/api/v1/ask/events")
+async def ask_events(request: AskRequest):
+    """
+    Streams the lifecycle as server-sent events: a `stage` event with timings
+    as each step finishes, `sql` as soon as the query is authorized, `columns`
+    and `rows` as results are fetched, and a final `answer` (or
+    `clarification` / `denied` / `error` / `aborted`).
+    """
+    deadline = time.monotonic() + request.timeout_ms / 1000 if request.timeout_ms else None
+
+    async def events():
+        async for event, data in get_orchestrator().stream(request.query, request.context, deadline=deadline, output=output_options(request)):
+            yield _sse(event, data)
+
+    # No proxy buffering, or the first event arrives together with the last
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
+
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
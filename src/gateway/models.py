@@ -1,10 +1,18 @@
-from typing import List, Optional, Union
+from typing import Dict, List, Optional, Union
 from pydantic import BaseModel
 from enum import Enum
 
 class ResponseType(str, Enum):
     ANSWER = "answer"
     CLARIFICATION = "clarification"
+    ABORTED = "aborted"
+    ERROR = "error"
+
+class ResultFormat(str, Enum):
+    MARKDOWN = "markdown"
+    JSON = "json"
+    CSV = "csv"
+    COLUMNS = "columns"
 
 class ClarificationOption(BaseModel):
     label: str
@@ -14,11 +22,40 @@ class ClarificationPayload(BaseModel):
     question: str
     options: List[ClarificationOption]
 
+class AbortInfo(BaseModel):
+    reason: str  # "timeout", "deadline" or "client_disconnected"
+    elapsed_ms: Optional[float] = None
+    budget_ms: Optional[float] = None
+
 class AskRequest(BaseModel):
     query: str
     context: Optional[dict] = None
+    timeout_ms: Optional[int] = None
+    format: ResultFormat = ResultFormat.MARKDOWN
+    max_rows: Optional[int] = None  # rendering caps; the result is truncated past them
+    max_bytes: Optional[int] = None
+    include_timings: bool = False  # adds a per-stage latency breakdown to the response
 
 class AskResponse(BaseModel):
     type: ResponseType
     answer: Optional[str] = None
     clarification: Optional[ClarificationPayload] = None
+    aborted: Optional[AbortInfo] = None
+    error: Optional[str] = None
+    sql: Optional[str] = None
+    truncated: Optional[bool] = None
+    timings: Optional[Dict[str, float]] = None  # milliseconds per lifecycle stage
+
+class BatchAskRequest(BaseModel):
+    queries: List[str]
+    context: Optional[dict] = None
+    timeout_ms: Optional[int] = None
+    max_concurrency: Optional[int] = None
+    format: ResultFormat = ResultFormat.MARKDOWN
+    max_rows: Optional[int] = None
+    max_bytes: Optional[int] = None
+    include_timings: bool = False  # adds a per-stage latency breakdown to the response
+
+class BatchAskResponse(BaseModel):
+    results: List[AskResponse]  # in the order of `queries`
+    elapsed_ms: float
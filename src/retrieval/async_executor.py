@@ -0,0 +1,83 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Callable, Optional
+
+class AsyncQueryExecutor:
+    """
+    Runs blocking database calls on a dedicated thread pool so they never stall
+    the event loop. `max_workers` is the concurrency limit: extra queries wait in
+    the executor queue, and the time they spend there is tracked separately from
+    execution time. Optionally rejects work once `max_queue` queries are waiting.
+    """
+    def __init__(self, max_workers: int = 4, max_queue: Optional[int] = None, name: str = "sqlite"):
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=f"{name}-query")
+        self._lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._stats = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "queue_wait_s_total": 0.0,
+            "queue_wait_s_max": 0.0,
+            "run_s_total": 0.0,
+            "run_s_max": 0.0,
+        }
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """Runs `fn(*args, **kwargs)` on the pool and awaits its result."""
+        with self._lock:
+            if self.max_queue is not None and self._queued >= self.max_queue:
+                self._stats["rejected"] += 1
+                raise RuntimeError(f"Query queue is full ({self._queued} waiting)")
+            self._queued += 1
+            self._stats["submitted"] += 1
+        enqueued_at = time.perf_counter()
+
+        def task():
+            started_at = time.perf_counter()
+            with self._lock:
+                self._queued -= 1
+                self._running += 1
+                wait = started_at - enqueued_at
+                self._stats["queue_wait_s_total"] += wait
+                self._stats["queue_wait_s_max"] = max(self._stats["queue_wait_s_max"], wait)
+            ok = False
+            try:
+                result = fn(*args, **kwargs)
+                ok = True
+                return result
+            finally:
+                elapsed = time.perf_counter() - started_at
+                with self._lock:
+                    self._running -= 1
+                    self._stats["completed" if ok else "failed"] += 1
+                    self._stats["run_s_total"] += elapsed
+                    self._stats["run_s_max"] = max(self._stats["run_s_max"], elapsed)
+
+        future = self._executor.submit(task)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # Cancelled before a worker picked it up: it will never run
+            if future.cancelled():
+                with self._lock:
+                    self._queued -= 1
+            raise
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self._stats,
+                "queued": self._queued,
+                "running": self._running,
+                "max_workers": self.max_workers,
+            }
+
+    def shutdown(self, wait: bool = True):
+        self._executor.shutdown(wait=wait)
@@ -0,0 +1,27 @@
+import threading
+from typing import Dict
+from .base import DatabaseBackend
+from .postgres import PostgresBackend
+from .sqlite import SQLiteBackend
+
+_backends: Dict[str, DatabaseBackend] = {}
+_backends_lock = threading.Lock()
+
+def is_postgres_url(target: str) -> bool:
+    return target.startswith(("postgres://", "postgresql://"))
+
+def get_backend(target: str = "school.db", **kwargs) -> DatabaseBackend:
+    """
+    Returns the backend for a database: a `postgresql://` URL gets the
+    process-wide PostgreSQL pool for that URL; anything else is a SQLite file
+    path on the shared connection pool.
+    """
+    if is_postgres_url(target):
+        with _backends_lock:
+            backend = _backends.get(target)
+            if backend is None:
+                backend = _backends[target] = PostgresBackend(target, **kwargs)
+            return backend
+    return SQLiteBackend(target, **kwargs)
+
+__all__ = ["DatabaseBackend", "SQLiteBackend", "PostgresBackend", "get_backend", "is_postgres_url"]
@@ -0,0 +1,65 @@
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Union
+
+# Bind values in the driver's paramstyle: a tuple for positional placeholders, a dict for named ones
+Params = Union[Tuple[Any, ...], Dict[str, Any], None]
+
+class DatabaseBackend:
+    """
+    Interface between the retrieval layer and a database driver.
+
+    A backend owns a pool of connections and knows how to run a query under a
+    `QueryBudget`, stream a large result in chunks (server-side where the
+    driver supports it), introspect the schema and report change tokens for
+    cache invalidation. Calls are blocking; `DBClient` runs them on its
+    `AsyncQueryExecutor` so they never stall the event loop.
+
+    `dialect` names the SQL dialect ("sqlite", "postgresql") for components
+    that only work on one of them. `tracks_writes` says whether `version`
+    reports a data token, i.e. whether results can be cached at all.
+    """
+    dialect = ""
+    tracks_writes = True
+
+    @property
+    def max_size(self) -> int:
+        """Maximum number of concurrently open connections."""
+        raise NotImplementedError
+
+    def execute(self, sql: str, budget, params: Params = None) -> Tuple[List[str], List[tuple]]:
+        """
+        Runs a query to completion and returns (column names, tuple rows).
+        `params` are the statement's bind values. Errors are raised.
+        """
+        raise NotImplementedError
+
+    def iter_rows(self, sql: str, chunk_size: int, budget, params: Params = None) -> Iterator[Tuple[str, Any]]:
+        """Yields ("columns", names) and then ("rows", tuples) per chunk. Errors are raised."""
+        raise NotImplementedError
+
+    def introspect(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns {table: {"columns": [{"name", "type"}], "foreign_keys":
+        [{"table", "from", "to"}]}} for every user table.
+        """
+        raise NotImplementedError
+
+    def version(self) -> Optional[Tuple[Any, Any, Any]]:
+        """
+        Returns (database identity, schema token, data token), or None if the
+        database is unavailable. The data token is None when the driver has no
+        cheap way to detect writes, in which case results are not cached.
+        """
+        raise NotImplementedError
+
+    def error_message(self, error: Exception) -> str:
+        """User-facing message for a failed query."""
+        return str(error)
+
+    def health_check(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def metrics(self) -> Dict[str, Any]:
+        return {}
+
+    def close(self):
+        pass
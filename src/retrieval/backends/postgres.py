@@ -0,0 +1,211 @@
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from .base import DatabaseBackend, Params
+
+_COLUMNS_SQL = """
+SELECT c.table_name, c.column_name, c.data_type
+FROM information_schema.columns c
+JOIN information_schema.tables t ON t.table_schema = c.table_schema AND t.table_name = c.table_name
+WHERE c.table_schema = %s AND t.table_type = 'BASE TABLE'
+ORDER BY c.table_name, c.ordinal_position
+"""
+
+_FOREIGN_KEYS_SQL = """
+SELECT cl.relname, att.attname, fcl.relname, fatt.attname
+FROM pg_constraint con
+JOIN pg_class cl ON cl.oid = con.conrelid
+JOIN pg_class fcl ON fcl.oid = con.confrelid
+CROSS JOIN LATERAL unnest(con.conkey, con.confkey) AS k(col, fcol)
+JOIN pg_attribute att ON att.attrelid = con.conrelid AND att.attnum = k.col
+JOIN pg_attribute fatt ON fatt.attrelid = con.confrelid AND fatt.attnum = k.fcol
+WHERE con.contype = 'f' AND cl.relnamespace = %s::regnamespace
+ORDER BY cl.relname, con.conname
+"""
+
+# Postgres has no schema cookie; a digest of the catalog entries for the schema's tables stands in for it
+_SCHEMA_TOKEN_SQL = """
+SELECT md5(coalesce(string_agg(c.relname || '.' || a.attname || ':' || a.atttypid, ',' ORDER BY c.relname, a.attnum), ''))
+FROM pg_class c
+JOIN pg_attribute a ON a.attrelid = c.oid
+WHERE c.relnamespace = %s::regnamespace AND c.relkind IN ('r', 'p') AND a.attnum > 0 AND NOT a.attisdropped
+"""
+
+class PostgresBackend(DatabaseBackend):
+    """
+    PostgreSQL backend on a psycopg2 `ThreadedConnectionPool`.
+
+    Connections run read-only transactions. Budgets map onto
+    `SET LOCAL statement_timeout` for the remaining time, and a cancelled
+    budget sends a cancel request to the server for the running statement.
+    `iter_rows` uses a named (server-side) cursor, so large results are
+    fetched `chunk_size` rows at a time instead of being buffered by the
+    driver.
+
+    Schema changes are detected with a digest of the catalog, rechecked at
+    most every `schema_check_interval` seconds. There is no cheap per-write
+    counter, so the data token is None and results are not cached.
+    """
+    dialect = "postgresql"
+    tracks_writes = False
+
+    def __init__(
+        self,
+        dsn: str,
+        min_size: int = 1,
+        max_size: int = 8,
+        acquire_timeout: float = 10.0,
+        schema: str = "public",
+        schema_check_interval: float = 5.0,
+    ):
+        try:
+            import psycopg2
+            import psycopg2.pool
+        except ImportError as e:
+            raise RuntimeError("PostgreSQL support requires psycopg2 (pip install psycopg2-binary)") from e
+        self._errors = psycopg2.Error
+        self.dsn = dsn
+        self.schema = schema
+        self.acquire_timeout = acquire_timeout
+        self.schema_check_interval = schema_check_interval
+        self._max_size = max_size
+        self._pool = psycopg2.pool.ThreadedConnectionPool(min_size, max_size, dsn)
+        # The psycopg2 pool fails instead of waiting when exhausted
+        self._slots = threading.BoundedSemaphore(max_size)
+        self._lock = threading.Lock()
+        self._in_use = 0
+        self._version: Optional[Tuple[Any, Any, Any]] = None
+        self._version_checked_at = 0.0
+        self._stats = {"checkouts": 0, "waits": 0, "wait_time_s": 0.0, "discarded": 0}
+
+    @property
+    def max_size(self) -> int:
+        return self._max_size
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        timeout = self.acquire_timeout if timeout is None else timeout
+        started_at = time.monotonic()
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._stats["waits"] += 1
+            if not self._slots.acquire(timeout=timeout):
+                raise TimeoutError(f"No database connection available within {timeout}s")
+        try:
+            conn = self._pool.getconn()
+        except Exception:
+            self._slots.release()
+            raise
+        with self._lock:
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            self._stats["wait_time_s"] += time.monotonic() - started_at
+
+        discard = False
+        try:
+            if not conn.readonly:
+                conn.set_session(readonly=True, autocommit=False)
+            yield conn
+        finally:
+            # Always end the transaction (and its SET LOCAL settings) before the
+            # connection goes back, also when a streaming generator is closed early
+            try:
+                if not conn.closed:
+                    conn.rollback()
+            except self._errors:
+                discard = True
+            discard = discard or bool(conn.closed)
+            self._pool.putconn(conn, close=discard)
+            with self._lock:
+                self._in_use -= 1
+                if discard:
+                    self._stats["discarded"] += 1
+            self._slots.release()
+
+    def execute(self, sql: str, budget, params: Params = None) -> Tuple[List[str], List[tuple]]:
+        with self.connection(timeout=budget.remaining) as conn:
+            try:
+                cursor = conn.cursor()
+                self._arm(conn, cursor, budget)
+                cursor.execute(sql, params)
+                rows = cursor.fetchall() if cursor.description else []
+            finally:
+                budget.remove_cancel_callback(conn.cancel)
+            return [d[0] for d in cursor.description or []], rows
+
+    def iter_rows(self, sql: str, chunk_size: int, budget, params: Params = None) -> Iterator[Tuple[str, Any]]:
+        with self.connection(timeout=budget.remaining) as conn:
+            cursor = None
+            try:
+                self._arm(conn, conn.cursor(), budget)
+                cursor = conn.cursor(name=f"sutradhara_{uuid.uuid4().hex}")
+                cursor.itersize = chunk_size
+                cursor.execute(sql, params)
+                # A named cursor only has a description after the first fetch
+                rows = cursor.fetchmany(chunk_size)
+                yield "columns", [d[0] for d in cursor.description or []]
+                while rows:
+                    yield "rows", rows
+                    rows = cursor.fetchmany(chunk_size)
+            finally:
+                budget.remove_cancel_callback(conn.cancel)
+                if cursor is not None:
+                    cursor.close()
+
+    def introspect(self) -> Dict[str, Dict[str, Any]]:
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            schema: Dict[str, Dict[str, Any]] = {}
+            cursor.execute(_COLUMNS_SQL, (self.schema,))
+            for table, name, data_type in cursor.fetchall():
+                schema.setdefault(table, {"columns": [], "foreign_keys": []})["columns"].append({"name": name, "type": data_type.upper()})
+            cursor.execute(_FOREIGN_KEYS_SQL, (self.schema,))
+            for table, column, ref_table, ref_column in cursor.fetchall():
+                if table in schema:
+                    schema[table]["foreign_keys"].append({"table": ref_table, "from": column, "to": ref_column})
+            return schema
+
+    def version(self) -> Optional[Tuple[Any, Any, Any]]:
+        now = time.monotonic()
+        if self._version is not None and now - self._version_checked_at < self.schema_check_interval:
+            return self._version
+        try:
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute(_SCHEMA_TOKEN_SQL, (self.schema,))
+                identity = (conn.info.host, conn.info.port, conn.info.dbname, self.schema)
+                self._version = (identity, cursor.fetchone()[0], None)
+        except Exception as e:
+            print(f"Could not read schema version from PostgreSQL: {str(e)}")
+            self._version = None
+        self._version_checked_at = now
+        return self._version
+
+    def health_check(self) -> Dict[str, Any]:
+        try:
+            with self.connection() as conn:
+                conn.cursor().execute("SELECT 1;")
+            return {"ok": True, "checked": 1, "failed": 0}
+        except Exception:
+            return {"ok": False, "checked": 1, "failed": 1}
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self._stats, "in_use": self._in_use, "max_size": self._max_size}
+
+    def close(self):
+        self._pool.closeall()
+
+    @staticmethod
+    def _arm(conn, cursor, budget):
+        """
+        Applies the budget to the current transaction: server-side timeout plus
+        cancel-on-abort. Callers disarm it in a `finally` (remove the callback);
+        the timeout ends with the transaction, which `connection` rolls back.
+        """
+        remaining = budget.remaining
+        if remaining is not None:
+            cursor.execute("SET LOCAL statement_timeout = %s;", (max(1, int(remaining * 1000)),))
+        budget.add_cancel_callback(conn.cancel)
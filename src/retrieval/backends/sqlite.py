@@ -0,0 +1,81 @@
+import os
+from typing import List, Dict, Any, Optional, Iterator, Tuple
+from ..connection_pool import ConnectionPool, get_pool
+from .base import DatabaseBackend, Params
+
+class SQLiteBackend(DatabaseBackend):
+    """
+    SQLite backend on the shared read-only `ConnectionPool`. Budgets are
+    enforced with a progress handler that SQLite calls every
+    `progress_interval` VM instructions; change tokens are the pool probe's
+    file identity, `schema_version` and `data_version`.
+    """
+    dialect = "sqlite"
+
+    def __init__(self, db_path: str = "school.db", pool: Optional[ConnectionPool] = None, progress_interval: int = 5000):
+        self.db_path = db_path
+        self.pool = pool or get_pool(db_path)
+        self.progress_interval = progress_interval
+
+    @property
+    def max_size(self) -> int:
+        return self.pool.max_size
+
+    def execute(self, sql: str, budget, params: Params = None) -> Tuple[List[str], List[tuple]]:
+        with self.pool.connection(timeout=budget.remaining) as conn:
+            conn.set_progress_handler(budget.should_abort, self.progress_interval)
+            try:
+                cursor = conn.cursor()
+                cursor.execute(sql, params or ())
+                rows = cursor.fetchall()
+            finally:
+                conn.set_progress_handler(None, 0)
+            return [d[0] for d in cursor.description or []], rows
+
+    def iter_rows(self, sql: str, chunk_size: int, budget, params: Params = None) -> Iterator[Tuple[str, Any]]:
+        with self.pool.connection(timeout=budget.remaining) as conn:
+            conn.set_progress_handler(budget.should_abort, self.progress_interval)
+            try:
+                cursor = conn.cursor()
+                cursor.execute(sql, params or ())
+                yield "columns", [d[0] for d in cursor.description or []]
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    yield "rows", rows
+            finally:
+                conn.set_progress_handler(None, 0)
+
+    def introspect(self) -> Dict[str, Dict[str, Any]]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
+            tables = [row[0] for row in cursor.fetchall()]
+
+            schema = {}
+            for table in tables:
+                cursor.execute(f"PRAGMA table_info({table});")
+                cols = [{"name": r[1], "type": r[2]} for r in cursor.fetchall()]
+                cursor.execute(f"PRAGMA foreign_key_list({table});")
+                fks = [{"table": r[2], "from": r[3], "to": r[4]} for r in cursor.fetchall()]
+                schema[table] = {"columns": cols, "foreign_keys": fks}
+            return schema
+
+    def version(self) -> Optional[Tuple[Any, Any, Any]]:
+        return self.pool.change_counters()
+
+    def error_message(self, error: Exception) -> str:
+        # Only touch the filesystem once something has gone wrong
+        if not os.path.exists(self.db_path):
+            return f"Database {self.db_path} not found."
+        return str(error)
+
+    def health_check(self) -> Dict[str, Any]:
+        return self.pool.health_check()
+
+    def metrics(self) -> Dict[str, Any]:
+        return self.pool.metrics()
+
+    def close(self):
+        self.pool.close()
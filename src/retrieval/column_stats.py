@@ -0,0 +1,247 @@
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from collections import Counter
+from typing import List, Dict, Any, Optional, Tuple
+
+class ColumnStatsCatalog:
+    """
+    Persistent per-column statistics (sample values, distinct-count estimate,
+    null fraction, min/max) for a SQLite database.
+
+    Statistics live in a JSON side file next to the database and are refreshed
+    table by table in a background thread, so the request path only ever reads
+    the in-memory copy. A check does nothing unless the database changed since
+    the last one (`schema_version` / `data_version` on a dedicated probe
+    connection) or some stats are older than `max_age` seconds; then a table is
+    re-scanned only when its fingerprint (max rowid) moved or its stats expired.
+    """
+    def __init__(
+        self,
+        db_path: str = "school.db",
+        path: Optional[str] = None,
+        sample_rows: int = 10000,
+        sample_values: int = 3,
+        min_check_interval: float = 30.0,
+        max_age: float = 24 * 3600.0,
+    ):
+        self.db_path = db_path
+        self.path = path or f"{db_path}.stats.json"
+        self.sample_rows = sample_rows
+        self.sample_values = sample_values
+        self.min_check_interval = min_check_interval
+        self.max_age = max_age
+
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Dict[str, Any]] = {}
+        self._loaded = False
+        self._worker: Optional[threading.Thread] = None
+        self._last_check = 0.0
+        self.version = 0
+        # data_version is only comparable between calls on the same connection
+        self._probe: Optional[sqlite3.Connection] = None
+        self._probe_identity: Optional[Tuple[int, int]] = None
+        self._probe_lock = threading.Lock()
+        self._checked_token: Optional[tuple] = None
+
+    def get_table(self, table: str) -> Dict[str, Any]:
+        """Returns the cached stats for a table ({} if not computed yet)."""
+        self._ensure_loaded()
+        return self._tables.get(table, {})
+
+    def get_column(self, table: str, column: str) -> Dict[str, Any]:
+        return self.get_table(table).get("columns", {}).get(column, {})
+
+    def maybe_refresh_async(self) -> bool:
+        """
+        Kicks off a background refresh if none is running and the last check is
+        older than `min_check_interval`. Never blocks the caller.
+        """
+        self._ensure_loaded()
+        now = time.monotonic()
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return False
+            if self._last_check and now - self._last_check < self.min_check_interval:
+                return False
+            self._last_check = now
+            self._worker = threading.Thread(target=self._refresh_quietly, name="column-stats-refresh", daemon=True)
+            self._worker.start()
+            return True
+
+    def wait(self, timeout: Optional[float] = None):
+        """Blocks until a running background refresh has finished."""
+        worker = self._worker
+        if worker is not None:
+            worker.join(timeout)
+
+    def refresh(self, tables: Optional[List[str]] = None, force: bool = False) -> List[str]:
+        """
+        Synchronously refreshes stale tables (or the given ones) and persists the
+        catalog. Returns the names of the tables that were re-scanned.
+        """
+        self._ensure_loaded()
+        if not os.path.exists(self.db_path):
+            return []
+        token = self._database_token()
+        if not force and tables is None and token is not None and token == self._checked_token and not self._expired():
+            return []
+
+        conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        try:
+            cursor = conn.cursor()
+            cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
+            existing = [row[0] for row in cursor.fetchall()]
+            targets = [t for t in (tables or existing) if t in existing]
+
+            refreshed = []
+            for table in targets:
+                fingerprint = self._fingerprint(cursor, table)
+                cached = self._tables.get(table)
+                if not force and cached and cached.get("fingerprint") == fingerprint \
+                        and time.time() - cached.get("refreshed_at", 0) < self.max_age:
+                    continue
+                stats = self._scan_table(cursor, table, fingerprint)
+                with self._lock:
+                    self._tables[table] = stats
+                refreshed.append(table)
+
+            dropped = [t for t in self._tables if t not in existing]
+            with self._lock:
+                for t in dropped:
+                    del self._tables[t]
+                if refreshed or dropped:
+                    self.version += 1
+        finally:
+            conn.close()
+
+        if refreshed or dropped:
+            self._save()
+        if tables is None:
+            self._checked_token = token
+        return refreshed
+
+    def _refresh_quietly(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"Column stats refresh failed: {str(e)}")
+
+    def _database_token(self) -> Optional[tuple]:
+        """(file identity, schema_version, data_version), or None if the file cannot be read."""
+        try:
+            st = os.stat(self.db_path)
+            identity = (st.st_dev, st.st_ino)
+            with self._probe_lock:
+                if self._probe is None or identity != self._probe_identity:
+                    if self._probe is not None:
+                        self._probe.close()
+                    self._probe = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, check_same_thread=False)
+                    self._probe_identity = identity
+                schema_version = self._probe.execute("PRAGMA schema_version;").fetchone()[0]
+                data_version = self._probe.execute("PRAGMA data_version;").fetchone()[0]
+        except (OSError, sqlite3.Error):
+            return None
+        return (identity, schema_version, data_version)
+
+    def _expired(self) -> bool:
+        now = time.time()
+        with self._lock:
+            return any(now - stats.get("refreshed_at", 0) >= self.max_age for stats in self._tables.values())
+
+    def _fingerprint(self, cursor, table: str) -> List[Any]:
+        # MAX(rowid) is a single b-tree descent; COUNT(*) would scan the whole table
+        try:
+            cursor.execute(f"SELECT MAX(rowid) FROM {table};")
+        except sqlite3.OperationalError:
+            # WITHOUT ROWID tables
+            cursor.execute(f"SELECT COUNT(*) FROM {table};")
+        return list(cursor.fetchone())
+
+    def _scan_table(self, cursor, table: str, fingerprint: List[Any]) -> Dict[str, Any]:
+        """One aggregate pass for nulls/min/max plus one strided sample for distinct estimates."""
+        cursor.execute(f"PRAGMA table_info({table});")
+        col_names = [r[1] for r in cursor.fetchall()]
+
+        columns: Dict[str, Dict[str, Any]] = {}
+        if not col_names:
+            return {"fingerprint": fingerprint, "row_count": 0, "refreshed_at": time.time(), "columns": columns}
+
+        # The row count rides along with the aggregate pass the scan makes anyway
+        aggregates = ", ".join(f"COUNT({c}), MIN({c}), MAX({c})" for c in col_names)
+        cursor.execute(f"SELECT COUNT(*), {aggregates} FROM {table};")
+        row_count, *agg_row = cursor.fetchone()
+        row_count = row_count or 0
+
+        sample = self._sample(cursor, table, col_names, row_count)
+        for i, col in enumerate(col_names):
+            non_null, min_val, max_val = agg_row[3 * i: 3 * i + 3]
+            values = [row[i] for row in sample if row[i] is not None]
+            counts = Counter(values)
+            columns[col] = {
+                "samples": [v for v, _ in counts.most_common(self.sample_values)],
+                "distinct_estimate": self._estimate_distinct(counts, len(values), non_null or 0),
+                "null_fraction": round(1 - (non_null or 0) / row_count, 4) if row_count else 0.0,
+                "min": min_val,
+                "max": max_val,
+            }
+
+        return {"fingerprint": fingerprint, "row_count": row_count, "refreshed_at": time.time(), "columns": columns}
+
+    def _sample(self, cursor, table: str, col_names: List[str], row_count: int) -> List[tuple]:
+        cols = ", ".join(col_names)
+        if row_count <= self.sample_rows:
+            cursor.execute(f"SELECT {cols} FROM {table};")
+            return cursor.fetchall()
+        stride = max(1, row_count // self.sample_rows)
+        try:
+            cursor.execute(f"SELECT {cols} FROM {table} WHERE rowid % ? = 0 LIMIT ?;", (stride, self.sample_rows))
+        except sqlite3.OperationalError:
+            cursor.execute(f"SELECT {cols} FROM {table} LIMIT ?;", (self.sample_rows,))
+        return cursor.fetchall()
+
+    @staticmethod
+    def _estimate_distinct(counts: Counter, sampled: int, total: int) -> int:
+        """GEE estimator: scale up the values seen exactly once, keep the repeated ones."""
+        if not sampled or sampled >= total:
+            return len(counts)
+        singletons = sum(1 for c in counts.values() if c == 1)
+        if singletons == sampled:
+            # No repeats at all in the sample: treat the column as unique
+            return total
+        estimate = math.sqrt(total / sampled) * singletons + (len(counts) - singletons)
+        return int(min(total, round(estimate)))
+
+    def _ensure_loaded(self):
+        if self._loaded:
+            return
+        with self._lock:
+            if self._loaded:
+                return
+            try:
+                with open(self.path, "r") as f:
+                    self._tables = json.load(f).get("tables", {})
+                self.version += 1
+            except (OSError, ValueError):
+                self._tables = {}
+            self._loaded = True
+
+    def _save(self):
+        with self._lock:
+            payload = json.dumps({"db_path": self.db_path, "tables": self._tables}, default=str)
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                f.write(payload)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"Could not persist column stats to {self.path}: {str(e)}")
+
+if __name__ == "__main__":
+    import sys
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    catalog = ColumnStatsCatalog(args[0] if args else "school.db")
+    print(f"Refreshed: {catalog.refresh(force='--force' in sys.argv)}")
@@ -0,0 +1,257 @@
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+
+# Applied to every pooled connection (read-only workload tuning)
+DEFAULT_PRAGMAS = {
+    "query_only": "ON",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64 * 1024,  # negative = KiB, i.e. 64 MiB page cache
+    "temp_store": "MEMORY",
+}
+
+class ConnectionPool:
+    """
+    Pool of long-lived, read-only SQLite connections.
+
+    Connections are opened with `mode=ro` URIs, tuned with `DEFAULT_PRAGMAS` and
+    handed out exclusively (check-out / check-in), so they can be used from any
+    thread. Each connection keeps its own prepared-statement cache
+    (`cached_statements`), which survives between queries because connections
+    are reused. Idle connections are handed out LIFO to keep page caches warm.
+
+    A dedicated probe connection, outside the pool, reads the database change
+    counters (`schema_version`, `data_version`) for cache invalidation.
+    """
+    def __init__(
+        self,
+        db_path: str = "school.db",
+        max_size: int = 8,
+        acquire_timeout: float = 10.0,
+        cached_statements: int = 256,
+        pragmas: Optional[Dict[str, Any]] = None,
+        wal: bool = True,
+    ):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.acquire_timeout = acquire_timeout
+        self.cached_statements = cached_statements
+        self.pragmas = dict(DEFAULT_PRAGMAS if pragmas is None else pragmas)
+        self.wal = wal
+
+        self._cond = threading.Condition()
+        self._idle: List[sqlite3.Connection] = []
+        self._in_use = 0
+        self._generation = 0
+        self._conn_generation: Dict[int, int] = {}
+        self._identity: Optional[Tuple[int, int]] = None
+        self._wal_checked = False
+        self._probe: Optional[sqlite3.Connection] = None
+        self._probe_lock = threading.Lock()
+        self._stats = {"created": 0, "closed": 0, "checkouts": 0, "waits": 0, "wait_time_s": 0.0, "discarded": 0}
+
+    @property
+    def uri(self) -> str:
+        return Path(self.db_path).absolute().as_uri() + "?mode=ro"
+
+    def _connect(self) -> sqlite3.Connection:
+        if self.wal and not self._wal_checked:
+            self._enable_wal()
+        conn = sqlite3.connect(
+            self.uri,
+            uri=True,
+            check_same_thread=False,
+            cached_statements=self.cached_statements,
+        )
+        for name, value in self.pragmas.items():
+            conn.execute(f"PRAGMA {name}={value};")
+        return conn
+
+    def _enable_wal(self):
+        """WAL lets readers run alongside a writer; it is persistent, so it is set once per file."""
+        self._wal_checked = True
+        if not os.access(self.db_path, os.W_OK):
+            return
+        try:
+            conn = sqlite3.connect(self.db_path)
+            try:
+                conn.execute("PRAGMA journal_mode=WAL;")
+            finally:
+                conn.close()
+        except sqlite3.Error as e:
+            print(f"Could not enable WAL on {self.db_path}: {str(e)}")
+
+    def acquire(self, timeout: Optional[float] = None) -> sqlite3.Connection:
+        """Checks out a connection, opening a new one if the pool is not full yet."""
+        timeout = self.acquire_timeout if timeout is None else timeout
+        deadline = time.monotonic() + timeout
+        waited_from = None
+        with self._cond:
+            while True:
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._in_use < self.max_size:
+                    conn = None
+                    break
+                if waited_from is None:
+                    waited_from = time.monotonic()
+                    self._stats["waits"] += 1
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"No database connection available within {timeout}s")
+                self._cond.wait(remaining)
+            self._in_use += 1
+            self._stats["checkouts"] += 1
+            if waited_from is not None:
+                self._stats["wait_time_s"] += time.monotonic() - waited_from
+            generation = self._generation
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._cond:
+                    self._in_use -= 1
+                    self._cond.notify()
+                raise
+            with self._cond:
+                self._stats["created"] += 1
+                self._conn_generation[id(conn)] = generation
+        return conn
+
+    def release(self, conn: sqlite3.Connection, discard: bool = False):
+        """Returns a connection to the pool; stale or broken connections are closed instead."""
+        with self._cond:
+            self._in_use -= 1
+            stale = self._conn_generation.get(id(conn)) != self._generation
+            if discard or stale:
+                self._close(conn)
+                if discard:
+                    self._stats["discarded"] += 1
+            else:
+                self._idle.append(conn)
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None):
+        conn = self.acquire(timeout)
+        discard = False
+        try:
+            yield conn
+        except Exception:
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                discard = True
+            raise
+        finally:
+            self.release(conn, discard=discard)
+
+    def change_counters(self) -> Optional[Tuple[Tuple[int, int], int, int]]:
+        """
+        Returns (file identity, schema_version, data_version), or None if the file
+        is missing. `data_version` is only comparable between calls on the same
+        connection, hence the dedicated probe. If the file was replaced, all
+        pooled connections are recycled.
+        """
+        try:
+            st = os.stat(self.db_path)
+        except OSError:
+            return None
+        identity = (st.st_dev, st.st_ino)
+
+        if self.wal and not self._wal_checked:
+            # Switching journal mode bumps data_version, so do it before probing
+            self._enable_wal()
+
+        with self._probe_lock:
+            if self._probe is None or identity != self._identity:
+                if self._identity is not None and identity != self._identity:
+                    self.recycle()
+                if self._probe is not None:
+                    self._probe.close()
+                self._probe = sqlite3.connect(self.uri, uri=True, check_same_thread=False)
+                self._identity = identity
+            schema_version = self._probe.execute("PRAGMA schema_version;").fetchone()[0]
+            data_version = self._probe.execute("PRAGMA data_version;").fetchone()[0]
+        return (identity, schema_version, data_version)
+
+    def recycle(self):
+        """Closes idle connections and marks checked-out ones to be closed on release."""
+        with self._cond:
+            self._generation += 1
+            idle, self._idle = self._idle, []
+            for conn in idle:
+                self._close(conn)
+
+    def health_check(self) -> Dict[str, Any]:
+        """Pings every idle connection, dropping the ones that fail."""
+        with self._cond:
+            idle, self._idle = self._idle, []
+            # Count them as checked out so acquire() can't overshoot max_size meanwhile
+            self._in_use += len(idle)
+        healthy, broken = [], []
+        for conn in idle:
+            try:
+                conn.execute("SELECT 1;").fetchone()
+                healthy.append(conn)
+            except sqlite3.Error:
+                broken.append(conn)
+        with self._cond:
+            self._in_use -= len(idle)
+            for conn in broken:
+                self._close(conn)
+            self._idle.extend(healthy)
+            self._stats["discarded"] += len(broken)
+            self._cond.notify_all()
+
+        ok = True
+        if not healthy:
+            # Nothing idle to ping: prove we can still open the database
+            try:
+                with self.connection() as conn:
+                    conn.execute("SELECT 1;").fetchone()
+            except Exception:
+                ok = False
+        return {"ok": ok, "checked": len(idle), "failed": len(broken)}
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                **self._stats,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "max_size": self.max_size,
+            }
+
+    def close(self):
+        self.recycle()
+        with self._probe_lock:
+            if self._probe is not None:
+                self._probe.close()
+                self._probe = None
+
+    def _close(self, conn: sqlite3.Connection):
+        self._conn_generation.pop(id(conn), None)
+        self._stats["closed"] += 1
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+_pools: Dict[str, ConnectionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_pool(db_path: str = "school.db", **kwargs) -> ConnectionPool:
+    """Returns the process-wide pool for a database file, creating it on first use."""
+    key = os.path.abspath(db_path)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = ConnectionPool(db_path, **kwargs)
+        return pool
@@ -1,29 +1,312 @@
-import sqlite3
-import os
-from typing import List, Dict, Any
+import asyncio
+import concurrent.futures
+import time
+from typing import List, Dict, Any, Optional, Iterator, AsyncIterator, Tuple, Union, Hashable, Callable
+from .async_executor import AsyncQueryExecutor
+from .backends import DatabaseBackend, SQLiteBackend, get_backend, is_postgres_url
+from .backends.base import Params
+from .connection_pool import ConnectionPool
+from .result_cache import ResultCache, normalize_sql, is_cacheable
+from .result_set import ResultSet
+from .workload_log import WorkloadLog
+from ..telemetry.metrics import registry
+
+class QueryBudget:
+    """
+    Execution budget for a single query: an optional deadline plus a cooperative
+    cancel flag. `should_abort` is installed as the SQLite progress handler, so a
+    running statement stops within a few thousand VM instructions of the budget
+    running out or `cancel()` being called from another thread. Backends without
+    such a hook register a cancel callback instead.
+    """
+    def __init__(self, timeout: Optional[float] = None, deadline: Optional[float] = None):
+        self.started_at = time.monotonic()
+        candidates = [d for d in (deadline, self.started_at + timeout if timeout is not None else None) if d is not None]
+        self.deadline = min(candidates) if candidates else None
+        # Which limit the deadline came from, for the abort reason
+        self._deadline_reason = "deadline" if deadline is not None and self.deadline == deadline else "timeout"
+        self.reason: Optional[str] = None
+        self._cancel_callbacks: List[Callable[[], Any]] = []
+
+    def cancel(self, reason: str = "cancelled"):
+        if self.reason is None:
+            self.reason = reason
+        for callback in list(self._cancel_callbacks):
+            try:
+                callback()
+            except Exception as e:
+                print(f"Query cancel callback failed: {str(e)}")
+
+    def add_cancel_callback(self, callback: Callable[[], Any]):
+        """Registers a driver hook (e.g. a server-side cancel) to run when the budget is cancelled."""
+        self._cancel_callbacks.append(callback)
+        if self.reason is not None:
+            callback()
+
+    def remove_cancel_callback(self, callback: Callable[[], Any]):
+        if callback in self._cancel_callbacks:
+            self._cancel_callbacks.remove(callback)
+
+    def should_abort(self) -> int:
+        if self.reason is None and self.deadline is not None and time.monotonic() >= self.deadline:
+            self.reason = self._deadline_reason
+        return 1 if self.reason is not None else 0
+
+    @property
+    def remaining(self) -> Optional[float]:
+        return None if self.deadline is None else max(0.0, self.deadline - time.monotonic())
+
+    def aborted_row(self) -> Dict[str, Any]:
+        elapsed_ms = round((time.monotonic() - self.started_at) * 1000, 1)
+        budget_ms = round((self.deadline - self.started_at) * 1000, 1) if self.deadline is not None else None
+        details = {
+            "timeout": f"exceeded the {budget_ms} ms execution budget",
+            "deadline": "request deadline passed",
+            "cancelled": "query was cancelled",
+        }
+        return {
+            "error": f"Query aborted: {details.get(self.reason, self.reason)}",
+            "aborted": {"reason": self.reason, "elapsed_ms": elapsed_ms, "budget_ms": budget_ms},
+        }
 
 class DBClient:
     """
-    Handles execution of SQL queries against the local SQLite database.
+    Handles execution of SQL queries through a `DatabaseBackend`: the local
+    SQLite file by default, or PostgreSQL when `db_path` is a `postgresql://`
+    URL. Queries run on pooled, read-only connections shared with the
+    SchemaProvider. `aexecute` runs them on a dedicated thread pool, sized to
+    the connection pool by default, so a slow query never blocks the event loop.
+
+    Every query runs under a `QueryBudget` (`query_timeout` seconds by default);
+    queries that overrun it or are cancelled return an error row carrying an
+    `aborted` entry with the structured reason.
+
+    Results come back as a compact `ResultSet` (column header plus the tuple
+    rows SQLite already produces) rather than a list of dictionaries.
+
+    Successful results are kept in a `ResultCache` keyed on the normalized SQL
+    and the database change counters, so repeated reads skip SQLite entirely
+    until something writes to the file. Pass `cache=False` to disable it.
+    Backends that cannot detect writes cheaply (PostgreSQL) are not cached.
+
+    On SQLite, the shape of every statement that actually runs is recorded in
+    a `WorkloadLog` (see `IndexAdvisor`); pass `workload=False` to disable it.
+    Literal values are not logged (see `WorkloadLog.record_values`).
     """
-    def __init__(self, db_path: str = "school.db"):
+    def __init__(
+        self,
+        db_path: str = "school.db",
+        pool: Optional[ConnectionPool] = None,
+        executor: Optional[AsyncQueryExecutor] = None,
+        query_timeout: Optional[float] = 30.0,
+        progress_interval: int = 5000,
+        cache: Union[ResultCache, bool, None] = None,
+        workload: Union[WorkloadLog, bool, None] = None,
+        backend: Optional[DatabaseBackend] = None,
+    ):
         self.db_path = db_path
+        if backend is None:
+            backend = get_backend(db_path) if is_postgres_url(db_path) else SQLiteBackend(db_path, pool, progress_interval)
+        self.backend = backend
+        self.executor = executor or AsyncQueryExecutor(max_workers=self.backend.max_size, name=self.backend.dialect)
+        self.query_timeout = query_timeout
+        self.cache = (cache or ResultCache()) if cache is not False else None
+        if workload is None and self.backend.dialect == "sqlite":
+            workload = WorkloadLog(f"{db_path}.workload.json")
+        self.workload = workload or None
+
+    @property
+    def pool(self) -> Optional[ConnectionPool]:
+        """The SQLite connection pool (None on other backends)."""
+        return getattr(self.backend, "pool", None)
+
+    def cache_key(self, sql: str, params: Params = None) -> Optional[Hashable]:
+        """Cache key for a query, or None if it must not be cached."""
+        # Skip the version probe (a catalog query on PostgreSQL) when nothing could be cached anyway
+        if self.cache is None or not self.backend.tracks_writes or not is_cacheable(sql):
+            return None
+        counters = self.backend.version()
+        if counters is None or counters[2] is None:
+            return None
+        bound = tuple(sorted(params.items())) if isinstance(params, dict) else params
+        return (normalize_sql(sql), bound, counters)
 
-    def execute(self, sql: str) -> List[Dict[str, Any]]:
-        """Executes a SQL query and returns results as a list of dictionaries."""
-        if not os.path.exists(self.db_path):
-            return [{"error": f"Database {self.db_path} not found."}]
-            
+    def execute(
+        self,
+        sql: str,
+        budget: Optional[QueryBudget] = None,
+        cache_key: Optional[Hashable] = None,
+        params: Params = None,
+    ) -> ResultSet:
+        """
+        Executes a SQL query and returns its rows as a ResultSet. `params` are
+        bind values for a parameterized statement (see `SQLBuilder.build`).
+        """
+        if cache_key is None:
+            cache_key = self.cache_key(sql, params)
+            if cache_key is not None:
+                cached = self.cache.get(cache_key)
+                if cached is not None:
+                    return cached
+        result = self._execute(sql, budget, params)
+        if cache_key is not None:
+            self.cache.put(cache_key, result)
+        return result
+
+    def _execute(self, sql: str, budget: Optional[QueryBudget] = None, params: Params = None) -> ResultSet:
+        budget = budget or QueryBudget(self.query_timeout)
+        if budget.should_abort():
+            return ResultSet.failed(budget.aborted_row())
+        try:
+            columns, rows = self.backend.execute(sql, budget, params)
+            self._record(sql, budget, len(rows), params)
+            # Keep the driver's tuples as-is; only the header is built here
+            return ResultSet(columns, rows)
+        except Exception as e:
+            if budget.should_abort():
+                registry.inc("db_aborted_total", dialect=self.backend.dialect, reason=budget.reason)
+                return ResultSet.failed(budget.aborted_row())
+            registry.inc("db_errors_total", dialect=self.backend.dialect)
+            return ResultSet.failed({"error": self.backend.error_message(e)})
+
+    async def aexecute(self, sql: str, deadline: Optional[float] = None, params: Params = None) -> ResultSet:
+        """
+        Async variant of `execute` that runs the query off the event loop.
+        `deadline` is an absolute `time.monotonic()` value for the whole request.
+        If the awaiting task is cancelled (e.g. the client disconnected), the
+        running statement is interrupted as the cancellation propagates.
+        """
+        # Cache hits are answered on the event loop without a thread hop
+        cache_key = self.cache_key(sql, params)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        budget = QueryBudget(self.query_timeout, deadline)
+        try:
+            return await self.executor.run(self.execute, sql, budget, cache_key, params)
+        except asyncio.CancelledError:
+            budget.cancel("cancelled")
+            raise
+        except RuntimeError as e:
+            return ResultSet.failed({"error": str(e)})
+
+    def iter_chunks(
+        self,
+        sql: str,
+        chunk_size: int = 500,
+        budget: Optional[QueryBudget] = None,
+        params: Params = None,
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Generator over a query's results that reads the cursor with `fetchmany`.
+        Yields ("columns", [names]) first, then ("rows", [tuples]) per chunk, or a
+        single ("error", row) on failure. The pooled connection (and, on
+        PostgreSQL, the server-side cursor) is held until the generator is
+        exhausted or closed.
+        """
+        budget = budget or QueryBudget(self.query_timeout)
+        if budget.should_abort():
+            yield "error", budget.aborted_row()
+            return
+        row_count = 0
         try:
-            conn = sqlite3.connect(self.db_path)
-            conn.row_factory = sqlite3.Row # Enable dict-like access
-            cursor = conn.cursor()
-            cursor.execute(sql)
-            rows = cursor.fetchall()
-            
-            # Convert sqlite3.Row objects to real dictionaries
-            result = [dict(row) for row in rows]
-            conn.close()
-            return result
+            for item in self.backend.iter_rows(sql, chunk_size, budget, params):
+                if item[0] == "rows":
+                    row_count += len(item[1])
+                yield item
+            self._record(sql, budget, row_count, params)
         except Exception as e:
-            return [{"error": str(e)}]
+            if budget.should_abort():
+                registry.inc("db_aborted_total", dialect=self.backend.dialect, reason=budget.reason)
+                yield "error", budget.aborted_row()
+            else:
+                registry.inc("db_errors_total", dialect=self.backend.dialect)
+                yield "error", {"error": self.backend.error_message(e)}
+
+    async def astream(
+        self,
+        sql: str,
+        chunk_size: int = 500,
+        max_buffered_chunks: int = 4,
+        deadline: Optional[float] = None,
+        params: Params = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Async generator over `iter_chunks`, produced on the query thread pool.
+        At most `max_buffered_chunks` chunks are held in memory: the producer
+        blocks until the consumer catches up, so memory stays bounded whatever
+        the result size. Closing the generator early interrupts the query.
+        """
+        budget = QueryBudget(self.query_timeout, deadline)
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max_buffered_chunks)
+
+        def put(item) -> bool:
+            future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+            while True:
+                try:
+                    future.result(timeout=0.1)
+                    return True
+                except concurrent.futures.TimeoutError:
+                    if budget.reason is not None:
+                        future.cancel()
+                        return False
+
+        def produce():
+            chunks = self.iter_chunks(sql, chunk_size, budget, params)
+            try:
+                for item in chunks:
+                    if not put(item):
+                        return
+                put(("end", None))
+            finally:
+                chunks.close()
+
+        producer = asyncio.ensure_future(self.executor.run(produce))
+        getter: Optional[asyncio.Future] = None
+        try:
+            while True:
+                # A producer that ended without "end" was rejected by the executor or crashed
+                if producer.done() and queue.empty():
+                    error = producer.exception() if not producer.cancelled() else None
+                    yield "error", {"error": str(error) if error is not None else "Result stream ended unexpectedly"}
+                    break
+                getter = asyncio.ensure_future(queue.get())
+                await asyncio.wait({getter, producer}, return_when=asyncio.FIRST_COMPLETED)
+                if not getter.done():
+                    getter.cancel()
+                    continue
+                kind, payload = getter.result()
+                if kind == "end":
+                    break
+                yield kind, payload
+                if kind == "error":
+                    break
+        finally:
+            if getter is not None and not getter.done():
+                getter.cancel()
+            # Releases a producer blocked on a full queue and stops the statement
+            # if the consumer went away early; a no-op once the stream has ended.
+            budget.cancel("cancelled")
+            try:
+                await producer
+            except Exception as e:
+                print(f"Result stream producer failed: {str(e)}")
+
+    def _record(self, sql: str, budget: QueryBudget, row_count: int, params: Params = None):
+        elapsed = time.monotonic() - budget.started_at
+        registry.observe("db_query_seconds", elapsed, dialect=self.backend.dialect)
+        registry.inc("db_rows_total", row_count, dialect=self.backend.dialect)
+        if self.workload is not None:
+            self.workload.record(sql, elapsed * 1000, params)
+
+    def health_check(self) -> Dict[str, Any]:
+        return self.backend.health_check()
+
+    def metrics(self) -> Dict[str, Any]:
+        metrics = {"pool": self.backend.metrics(), "executor": self.executor.metrics()}
+        if self.cache is not None:
+            metrics["result_cache"] = self.cache.metrics()
+        return metrics
@@ -0,0 +1,306 @@
+import math
+import re
+import sqlite3
+from typing import List, Dict, Any, Optional, Tuple
+from .query_planner import table_names, table_aliases
+from .workload_log import WorkloadLog
+
+_PLAN_RE = re.compile(r"^(SCAN|SEARCH) (?:TABLE )?(\S+)(.*)$")
+_AUTO_INDEX_RE = re.compile(r"USING AUTOMATIC (?:PARTIAL )?(?:COVERING )?INDEX \(([^)]*)\)")
+_COLUMN_REF = r"(?:([A-Za-z_]\w*)\.)?([A-Za-z_]\w*)"
+# Column on the left of a comparison, and column on the right of an equality (join predicates)
+_LEFT_PREDICATE_RE = re.compile(_COLUMN_REF + r"\s*(==|=|<=|>=|<|>|\bIN\b|\bBETWEEN\b)", re.I)
+_RIGHT_EQUALITY_RE = re.compile(r"(?<![<>!])==?\s*" + _COLUMN_REF + r"(?!\s*\()", re.I)
+_IDENTIFIER_RE = re.compile(_COLUMN_REF)
+_NAMED_PARAM_RE = re.compile(r"[:@$]([A-Za-z_]\w*)")
+
+def step_cost(detail: str, rows: int) -> float:
+    """
+    Rough number of rows one plan step touches in a table of `rows` rows: a
+    scan reads all of them (half as many pages through a covering index), an
+    automatic index has to be built from all of them, a lookup is logarithmic.
+    """
+    match = _PLAN_RE.match(detail)
+    if not match:
+        return 0.0
+    op, rest = match.group(1), match.group(3)
+    if op == "SCAN":
+        return rows / 2 if "COVERING INDEX" in rest else float(rows)
+    if "AUTOMATIC" in rest:
+        return float(rows)
+    lookup = math.log2(rows + 1) + 1
+    return lookup if "COVERING INDEX" in rest or "PRIMARY KEY" in rest else 2 * lookup
+
+class IndexAdvisor:
+    """
+    Recommends indexes for the queries that actually ran, as recorded in a
+    `WorkloadLog`.
+
+    Every logged query is EXPLAINed against an in-memory clone of the schema
+    (plus `sqlite_stat1`, if the database has been ANALYZEd), so the plans
+    match the real database without touching it. Candidates come from the
+    plans and the SQL: automatic indexes SQLite had to build for a join,
+    foreign-key and filter columns of scanned tables, and covering variants
+    that include every column the query reads from the table. Each candidate
+    is created in the clone and scored by how much it improves the plans of
+    the queries it affects, weighted by their total logged run time; the best
+    ones are picked greedily, so a recommendation never duplicates the work
+    of an earlier one.
+    """
+    def __init__(
+        self,
+        db_path: str = "school.db",
+        workload: Optional[WorkloadLog] = None,
+        max_recommendations: int = 5,
+        max_index_columns: int = 4,
+        max_queries: int = 500,
+        max_examples: int = 3,
+    ):
+        self.db_path = db_path
+        self.workload = workload or WorkloadLog(f"{db_path}.workload.json")
+        self.max_recommendations = max_recommendations
+        self.max_index_columns = max_index_columns
+        self.max_queries = max_queries
+        self.max_examples = max_examples
+        self._row_counts: Dict[str, int] = {}
+
+    def recommend(self) -> List[Dict[str, Any]]:
+        """
+        Returns the recommended indexes, best first: {"table", "columns", "kind"
+        ("fk" | "filter" | "covering"), "ddl", "queries", "executions",
+        "total_ms", "plans": [{"sql", "before", "after", "estimated_rows_before",
+        "estimated_rows_after"}]}.
+        """
+        clone = self._clone()
+        try:
+            tables = table_names(clone)
+            columns = {t: [r[1] for r in clone.execute(f'PRAGMA table_info("{t}")')] for t in tables.values()}
+            foreign_keys = {t: {r[3] for r in clone.execute(f'PRAGMA foreign_key_list("{t}")')} for t in tables.values()}
+
+            queries = []
+            for entry in self.workload.entries()[:self.max_queries]:
+                plan = self._explain(clone, entry["sql"], entry.get("params"))
+                if plan is None:
+                    continue
+                aliases = table_aliases(entry["sql"], tables)
+                queries.append({**entry, "aliases": aliases, "plan": plan})
+
+            candidates: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+            for query in queries:
+                for key, kind in self._candidates(query, tables, columns, foreign_keys).items():
+                    candidates.setdefault(key, kind)
+            existing = self._existing_indexes(clone)
+            candidates = {k: v for k, v in candidates.items() if not any(ix[:len(k[1])] == k[1] for ix in existing.get(k[0], []))}
+
+            recommendations = []
+            while candidates and len(recommendations) < self.max_recommendations:
+                best, best_score, best_affected = None, 0.0, []
+                for key in sorted(candidates, key=lambda k: (len(k[1]), k)):
+                    score, affected = self._evaluate(clone, key, queries, tables)
+                    if score > best_score:
+                        best, best_score, best_affected = key, score, affected
+                if best is None:
+                    break
+
+                table, cols = best
+                clone.execute(self._ddl(table, cols))
+                # Later candidates are scored against the improved plans
+                for query, _, after in best_affected:
+                    query["plan"] = after
+                recommendations.append({
+                    "table": table,
+                    "columns": list(cols),
+                    "kind": candidates.pop(best),
+                    "ddl": self._ddl(table, cols),
+                    "queries": len(best_affected),
+                    "executions": sum(q["count"] for q, _, _ in best_affected),
+                    "total_ms": round(sum(q["total_ms"] for q, _, _ in best_affected), 3),
+                    "plans": [
+                        {
+                            "sql": q["sql"],
+                            "before": before,
+                            "after": after,
+                            "estimated_rows_before": round(self._plan_cost(before, q["aliases"], tables)),
+                            "estimated_rows_after": round(self._plan_cost(after, q["aliases"], tables)),
+                        }
+                        for q, before, after in best_affected[:self.max_examples]
+                    ],
+                })
+            return recommendations
+        finally:
+            clone.close()
+
+    def apply(self, recommendations: List[Dict[str, Any]], analyze: bool = False) -> List[str]:
+        """Creates the recommended indexes on the real database; returns the DDL that was run."""
+        conn = sqlite3.connect(self.db_path)
+        try:
+            for rec in recommendations:
+                conn.execute(rec["ddl"])
+            if analyze:
+                conn.execute("ANALYZE")
+            conn.commit()
+        finally:
+            conn.close()
+        return [rec["ddl"] for rec in recommendations]
+
+    def _evaluate(self, clone, key: Tuple[str, Tuple[str, ...]], queries: List[Dict[str, Any]], tables: Dict[str, str]):
+        """Score of a candidate: plan improvement times logged run time, over the queries it changes."""
+        table, cols = key
+        name = self._index_name(table, cols)
+        clone.execute(self._ddl(table, cols))
+        try:
+            score, affected = 0.0, []
+            for query in queries:
+                if table not in self._plan_tables(query, tables):
+                    continue
+                after = self._explain(clone, query["sql"], query.get("params"))
+                if after is None or not any(name in d for d in after):
+                    continue
+                before_cost = self._plan_cost(query["plan"], query["aliases"], tables)
+                gain = before_cost - self._plan_cost(after, query["aliases"], tables)
+                if gain <= 0:
+                    continue
+                # Relative improvement, so each query counts by its logged run time
+                score += gain / before_cost * (query["total_ms"] or query["count"])
+                affected.append((query, query["plan"], after))
+        finally:
+            clone.execute(f'DROP INDEX "{name}"')
+        return score, affected
+
+    def _candidates(self, query: Dict[str, Any], tables: Dict[str, str], columns: Dict[str, List[str]], foreign_keys: Dict[str, set]):
+        sql, aliases = query["sql"], query["aliases"]
+        involved = set(self._plan_tables(query, tables))
+        candidates: Dict[Tuple[str, Tuple[str, ...]], str] = {}
+
+        def resolve(qualifier: Optional[str], column: str) -> Optional[str]:
+            if qualifier:
+                table = tables.get(qualifier.lower()) or aliases.get(qualifier.lower())
+                return table if table and column in columns[table] else None
+            owners = [t for t in involved if column in columns[t]]
+            return owners[0] if len(owners) == 1 else None
+
+        equality: Dict[str, List[str]] = {}
+        ranges: Dict[str, List[str]] = {}
+        for qualifier, column, op in _LEFT_PREDICATE_RE.findall(sql):
+            table = resolve(qualifier, column)
+            if table:
+                target = equality if op.upper() in ("=", "==", "IN") else ranges
+                if column not in target.setdefault(table, []):
+                    target[table].append(column)
+        for qualifier, column in _RIGHT_EQUALITY_RE.findall(sql):
+            table = resolve(qualifier, column)
+            if table and column not in equality.setdefault(table, []):
+                equality[table].append(column)
+
+        referenced: Dict[str, List[str]] = {}
+        for qualifier, column in _IDENTIFIER_RE.findall(sql):
+            table = resolve(qualifier, column)
+            if table and column not in referenced.setdefault(table, []):
+                referenced[table].append(column)
+
+        slow = {}
+        for detail in query["plan"]:
+            match = _PLAN_RE.match(detail)
+            if not match or (match.group(1) == "SEARCH" and "AUTOMATIC" not in detail):
+                continue
+            table = tables.get(match.group(2).lower()) or aliases.get(match.group(2).lower())
+            if table:
+                slow[table] = _AUTO_INDEX_RE.search(detail)
+
+        for table, auto_index in slow.items():
+            keys: List[Tuple[str, ...]] = []
+            if auto_index:
+                keys.append(tuple(re.findall(r"(\w+)=\?", auto_index.group(1))))
+            eq = equality.get(table, [])
+            keys.extend((c,) for c in eq)
+            composite = tuple(eq + ranges.get(table, [])[:1])
+            if composite:
+                keys.append(composite[:self.max_index_columns])
+            for key in keys:
+                if not key:
+                    continue
+                kind = "fk" if len(key) == 1 and key[0] in foreign_keys[table] else "filter"
+                candidates.setdefault((table, key), kind)
+                # A covering variant, unless the query reads every column
+                extra = [c for c in referenced.get(table, []) if c not in key]
+                if "*" not in sql and extra and len(key) + len(extra) <= self.max_index_columns:
+                    candidates.setdefault((table, key + tuple(extra)), "covering")
+        return candidates
+
+    def _plan_cost(self, plan: List[str], aliases: Dict[str, str], tables: Dict[str, str]) -> float:
+        cost = 0.0
+        for detail in plan:
+            match = _PLAN_RE.match(detail)
+            if match:
+                table = tables.get(match.group(2).lower()) or aliases.get(match.group(2).lower())
+                cost += step_cost(detail, self._row_counts.get(table, 0))
+        return cost
+
+    @staticmethod
+    def _plan_tables(query: Dict[str, Any], tables: Dict[str, str]) -> List[str]:
+        found = []
+        for detail in query["plan"]:
+            match = _PLAN_RE.match(detail)
+            if match:
+                table = tables.get(match.group(2).lower()) or query["aliases"].get(match.group(2).lower())
+                if table:
+                    found.append(table)
+        return found
+
+    @staticmethod
+    def _explain(conn, sql: str, params=None) -> Optional[List[str]]:
+        if params is None:
+            # Logged shapes carry no values; NULLs bind every placeholder without changing the plan
+            names = _NAMED_PARAM_RE.findall(sql)
+            params = {name: None for name in names} if names else (None,) * sql.count("?")
+        try:
+            return [row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", params)]
+        except sqlite3.Error:
+            return None
+
+    @staticmethod
+    def _existing_indexes(conn) -> Dict[str, List[Tuple[str, ...]]]:
+        existing: Dict[str, List[Tuple[str, ...]]] = {}
+        for name, table in conn.execute("SELECT name, tbl_name FROM sqlite_master WHERE type='index'"):
+            cols = tuple(r[2] for r in conn.execute(f'PRAGMA index_info("{name}")'))
+            existing.setdefault(table, []).append(cols)
+        return existing
+
+    @staticmethod
+    def _index_name(table: str, columns: Tuple[str, ...]) -> str:
+        return f"idx_{table}_{'_'.join(columns)}"
+
+    def _ddl(self, table: str, columns: Tuple[str, ...]) -> str:
+        return f"CREATE INDEX IF NOT EXISTS {self._index_name(table, columns)} ON {table} ({', '.join(columns)})"
+
+    def _clone(self) -> sqlite3.Connection:
+        """Empty in-memory copy of the schema (and planner statistics) of the database."""
+        source = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True)
+        clone = sqlite3.connect(":memory:")
+        try:
+            objects = source.execute(
+                "SELECT type, sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' "
+                "ORDER BY CASE type WHEN 'table' THEN 0 WHEN 'index' THEN 1 ELSE 2 END"
+            ).fetchall()
+            for _, sql in objects:
+                clone.execute(sql)
+            try:
+                stats = source.execute("SELECT tbl, idx, stat FROM sqlite_stat1").fetchall()
+            except sqlite3.OperationalError:
+                stats = []
+            # The clone is empty, so table sizes for the cost estimate come from the real file
+            self._row_counts = {}
+            for (table,) in source.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%'"):
+                try:
+                    self._row_counts[table] = source.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()[0] or 0
+                except sqlite3.OperationalError:
+                    self._row_counts[table] = source.execute(f'SELECT COUNT(*) FROM "{table}"').fetchone()[0]
+            if stats:
+                clone.execute("ANALYZE")
+                clone.execute("DELETE FROM sqlite_stat1")
+                clone.executemany("INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (?, ?, ?)", stats)
+                clone.execute("ANALYZE sqlite_schema")
+            clone.commit()
+        finally:
+            source.close()
+        return clone
@@ -0,0 +1,223 @@
+import re
+import sqlite3
+from typing import List, Dict, Any, Optional
+from .column_stats import ColumnStatsCatalog
+from .connection_pool import ConnectionPool, get_pool
+
+# "SCAN users", "SCAN u", "SCAN users USING INDEX ..." (older SQLite says "SCAN TABLE users")
+_SCAN_RE = re.compile(r"^SCAN (?:TABLE )?(\S+)(.*)$")
+_TEMP_BTREE_RE = re.compile(r"USE TEMP B-TREE FOR (.+)$")
+_IDENT_RE = re.compile(r'"([^"]+)"|`([^`]+)`|\[([^\]]+)\]|([A-Za-z_][A-Za-z0-9_]*)')
+_AGGREGATE_RE = re.compile(r"\b(count|sum|avg|min|max|total|group_concat)\s*\(|\bgroup\s+by\b", re.I)
+# "LIMIT n", "LIMIT n OFFSET m" or SQLite's "LIMIT m, n" (offset first) at the end of a statement;
+# either number may also be a bind placeholder (?, %s, :name, %(name)s)
+_LIMIT_VALUE = r"(\d+|\?|%s|:\w+|%\(\w+\)s)"
+_TRAILING_LIMIT_RE = re.compile(rf"\blimit\s+{_LIMIT_VALUE}(?:\s*(offset|,)\s*{_LIMIT_VALUE})?\s*;?\s*$", re.I)
+_POSITIONAL = ("?", "%s")
+
+def trailing_limit(match: "re.Match", params=None) -> Optional[int]:
+    """
+    The row count of a `_TRAILING_LIMIT_RE` match. A placeholder is looked up
+    in `params`; None if its value is unknown.
+    """
+    group = 3 if match.group(2) == "," else 1
+    value = match.group(group)
+    if value.isdigit():
+        return int(value)
+    try:
+        if value in _POSITIONAL:
+            # Positional placeholders after the count (an OFFSET) are the last bind values
+            after = 1 if group == 1 and match.group(3) in _POSITIONAL else 0
+            value = params[len(params) - 1 - after]
+        else:
+            value = params[value[2:-2] if value.startswith("%(") else value[1:]]
+        return int(value)
+    except (TypeError, KeyError, IndexError, ValueError):
+        return None
+
+# Words that can follow a table name but are not an alias
+_NOT_ALIAS = {
+    "as", "on", "using", "where", "join", "inner", "left", "right", "full", "cross", "natural", "outer",
+    "group", "order", "limit", "having", "union", "intersect", "except", "window", "indexed", "not", "set",
+}
+
+def table_names(conn) -> Dict[str, str]:
+    """Lowercased name -> name of the user tables in the database."""
+    rows = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';").fetchall()
+    return {r[0].lower(): r[0] for r in rows}
+
+def table_aliases(sql: str, tables: Dict[str, str]) -> Dict[str, str]:
+    """Maps aliases to table names: a known table followed by [AS] identifier."""
+    # Qualified references ("students.id") are not table-alias pairs
+    idents = [(next(g for g in m.groups() if g), sql[m.end():m.end() + 1] == ".") for m in _IDENT_RE.finditer(sql)]
+    aliases = {}
+    for i, (ident, qualified) in enumerate(idents[:-1]):
+        table = tables.get(ident.lower())
+        if table is None or qualified:
+            continue
+        j = i + 2 if idents[i + 1][0].lower() == "as" and i + 2 < len(idents) else i + 1
+        alias = idents[j][0].lower()
+        if alias not in _NOT_ALIAS and alias not in tables:
+            aliases[alias] = table
+    return aliases
+
+class QueryCostGuard:
+    """
+    Pre-execution check of generated SQL based on `EXPLAIN QUERY PLAN`.
+
+    The plan is inspected for full scans of large tables, nested scans with no
+    usable join predicate (cartesian products) and temp B-tree sorts, and the
+    estimated number of rows visited is compared against the thresholds:
+
+    - above `max_cost`: the query is rejected;
+    - a cartesian product over more than `large_table_rows`: the user is asked
+      to clarify how the tables relate (or the query is rejected, see
+      `cartesian_action`);
+    - a non-aggregating full scan of a large table: the query is rewritten with
+      a `LIMIT limit_rows`;
+    - otherwise it runs unchanged.
+
+    Table sizes come from the column statistics catalog, falling back to
+    `MAX(rowid)` for tables it has not scanned yet. Explaining only prepares
+    the statement, so the check costs no more than a cache-missed compile.
+    """
+    def __init__(
+        self,
+        db_path: str = "school.db",
+        pool: Optional[ConnectionPool] = None,
+        stats: Optional[ColumnStatsCatalog] = None,
+        large_table_rows: int = 100_000,
+        limit_rows: int = 10_000,
+        max_cost: float = 50_000_000,
+        sort_cost_factor: float = 2.0,
+        cartesian_action: str = "clarify",
+    ):
+        self.db_path = db_path
+        self.pool = pool or get_pool(db_path)
+        self.stats = stats or ColumnStatsCatalog(db_path)
+        self.large_table_rows = large_table_rows
+        self.limit_rows = limit_rows
+        self.max_cost = max_cost
+        self.sort_cost_factor = sort_cost_factor
+        self.cartesian_action = cartesian_action
+
+    def check(self, sql: str, params=None) -> Dict[str, Any]:
+        """
+        Returns the decision for a query: {"action": "allow" | "limit" | "reject" | "clarify",
+        "sql": <statement to run>, "findings": [...], "estimated_rows": int, "cost": float,
+        "message": str | None}. `params` are the bind values of a parameterized statement.
+        """
+        try:
+            with self.pool.connection() as conn:
+                plan = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params or ()).fetchall()
+                tables = table_names(conn)
+                aliases = table_aliases(sql, tables)
+                findings, estimated_rows = self._inspect(conn, plan, tables, aliases)
+        except Exception as e:
+            # Invalid SQL is reported by the executor with the real error message
+            return self._decision("allow", sql, [], 0, 0.0, None, error=str(e))
+
+        cost = float(estimated_rows)
+        if any(f["kind"] == "temp_btree" for f in findings):
+            cost *= self.sort_cost_factor
+
+        if cost > self.max_cost:
+            message = (f"Query rejected by cost guard: it would visit about {estimated_rows:,} rows "
+                       f"(limit {int(self.max_cost):,}). Please narrow the question.")
+            return self._decision("reject", sql, findings, estimated_rows, cost, message)
+
+        cartesian = [f for f in findings if f["kind"] == "cartesian" and f["rows"] > self.large_table_rows]
+        if cartesian:
+            tables_str = " and ".join(cartesian[0]["tables"])
+            if self.cartesian_action == "reject":
+                message = f"Query rejected by cost guard: {tables_str} are combined without a join condition."
+                return self._decision("reject", sql, findings, estimated_rows, cost, message)
+            message = f"The question combines {tables_str} without saying how they are related. Which records should be matched together?"
+            return self._decision("clarify", sql, findings, estimated_rows, cost, message)
+
+        large_scan = any(f["kind"] == "full_scan" and f["rows"] > self.large_table_rows for f in findings)
+        if large_scan and not _AGGREGATE_RE.search(sql):
+            existing = _TRAILING_LIMIT_RE.search(sql)
+            count = trailing_limit(existing, params) if existing else None
+            if count is None or count > self.limit_rows:
+                limited = self.limit(sql)
+                message = f"Results limited to the first {self.limit_rows:,} rows; add a filter to see specific records."
+                return self._decision("limit", limited, findings, estimated_rows, cost, message)
+
+        return self._decision("allow", sql, findings, estimated_rows, cost, None)
+
+    def limit(self, sql: str) -> str:
+        """
+        Caps the statement at `limit_rows`. A trailing LIMIT is lowered in place
+        (keeping its offset); otherwise one is appended on its own line, so a
+        trailing comment can't swallow it. A parameterized LIMIT can't be
+        lowered without touching the bind values, so the statement is wrapped
+        in a capped subquery instead.
+        """
+        body = sql.strip().rstrip(";").rstrip()
+        existing = _TRAILING_LIMIT_RE.search(body)
+        if existing is None:
+            return f"{body}\nLIMIT {self.limit_rows}"
+        if not all(v is None or v.isdigit() for v in (existing.group(1), existing.group(3))):
+            return f"SELECT * FROM (\n{body}\n) LIMIT {self.limit_rows}"
+        count = min(trailing_limit(existing), self.limit_rows)
+        offset = existing.group(1) if existing.group(2) == "," else existing.group(3)
+        clause = f"LIMIT {count}" if offset is None else f"LIMIT {count} OFFSET {offset}"
+        return body[:existing.start()] + clause
+
+    def _inspect(self, conn, plan: List[tuple], tables: Dict[str, str], aliases: Dict[str, str]):
+        findings: List[Dict[str, Any]] = []
+        # Nested loops of one SELECT share the same parent node in the plan tree
+        loops: Dict[int, List[tuple]] = {}
+        estimated_rows = 0
+        for _, parent, _, detail in plan:
+            sort = _TEMP_BTREE_RE.search(detail)
+            if sort:
+                findings.append({"kind": "temp_btree", "purpose": sort.group(1)})
+                continue
+            scan = _SCAN_RE.match(detail)
+            if not scan:
+                continue
+            name, rest = scan.group(1), scan.group(2)
+            table = tables.get(name.lower()) or aliases.get(name.lower())
+            if table is None:
+                # Subquery or CTE: its base tables appear as their own plan rows
+                continue
+            rows = self._row_count(conn, table)
+            # Walking a whole index still visits every row; it only avoids a sort
+            findings.append({"kind": "full_scan", "table": table, "rows": rows, "index": "USING" in rest})
+            loops.setdefault(parent, []).append((table, rows))
+
+        for parent, scans in loops.items():
+            if len(scans) > 1:
+                product = 1
+                for _, rows in scans:
+                    product *= max(rows, 1)
+                findings.append({"kind": "cartesian", "tables": [t for t, _ in scans], "rows": product})
+                estimated_rows += product
+            else:
+                estimated_rows += scans[0][1]
+        return findings, estimated_rows
+
+    def _row_count(self, conn, table: str) -> int:
+        row_count = self.stats.get_table(table).get("row_count")
+        if row_count is not None:
+            return row_count
+        try:
+            return conn.execute(f'SELECT MAX(rowid) FROM "{table}"').fetchone()[0] or 0
+        except sqlite3.OperationalError:
+            return 0
+
+    @staticmethod
+    def _decision(action, sql, findings, estimated_rows, cost, message, error=None) -> Dict[str, Any]:
+        decision = {
+            "action": action,
+            "sql": sql,
+            "findings": findings,
+            "estimated_rows": estimated_rows,
+            "cost": cost,
+            "message": message,
+        }
+        if error:
+            decision["error"] = error
+        return decision
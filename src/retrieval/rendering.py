@@ -0,0 +1,179 @@
+import csv
+import io
+import json
+from typing import List, Dict, Any, Optional, Sequence, NamedTuple, Type
+from .result_set import ResultSet
+
+class ResultWriter:
+    """
+    Incremental, size-bounded renderer for tabular results.
+
+    Rows are fed in chunks with `write`, which returns the text for the rows
+    it accepted. Once `max_rows` rows or `max_bytes` (UTF-8) bytes have been
+    produced, later rows are only counted, so the cost of rendering depends
+    on the caps, not on the size of the result. Values longer than
+    `max_cell_chars` are cut short. `open()` and `close()` return the text
+    that goes before and after the rows.
+    """
+    def __init__(self, columns: Sequence[str], max_rows: int = 200, max_bytes: int = 64_000, max_cell_chars: int = 200):
+        self.columns = list(columns)
+        self.max_rows = max_rows
+        self.max_bytes = max_bytes
+        self.max_cell_chars = max_cell_chars
+        self.rows_written = 0
+        self.rows_seen = 0
+        self.bytes_written = 0
+        self.truncated = False
+
+    def open(self) -> str:
+        return self._count(self._header())
+
+    def write(self, rows: Sequence[tuple]) -> str:
+        self.rows_seen += len(rows)
+        if self.truncated:
+            return ""
+        parts = []
+        for row in rows:
+            if self.rows_written >= self.max_rows:
+                self.truncated = True
+                break
+            text = self._row(row)
+            size = len(text.encode("utf-8"))
+            if self.bytes_written + size > self.max_bytes:
+                self.truncated = True
+                break
+            self.bytes_written += size
+            self.rows_written += 1
+            parts.append(self._emit(row, text))
+        return "".join(parts)
+
+    def skip(self, count: int):
+        """Counts rows that were never fed to `write` (they are past the row cap)."""
+        if count > 0:
+            self.rows_seen += count
+            self.truncated = True
+
+    def close(self) -> str:
+        return self._count(self._footer())
+
+    def summary(self) -> Optional[str]:
+        if not self.truncated:
+            return None
+        return f"Showing the first {self.rows_written:,} of {self.rows_seen:,} rows."
+
+    def _cell(self, value: Any) -> Any:
+        if isinstance(value, str) and len(value) > self.max_cell_chars:
+            return value[:self.max_cell_chars] + "…"
+        return value
+
+    def _count(self, text: str) -> str:
+        self.bytes_written += len(text.encode("utf-8"))
+        return text
+
+    def _emit(self, row: tuple, text: str) -> str:
+        return text
+
+    def _header(self) -> str:
+        return ""
+
+    def _row(self, row: tuple) -> str:
+        raise NotImplementedError
+
+    def _footer(self) -> str:
+        return ""
+
+class MarkdownWriter(ResultWriter):
+    def _header(self) -> str:
+        return "| " + " | ".join(self.columns) + " |\n| " + " | ".join(["---"] * len(self.columns)) + " |\n"
+
+    def _row(self, row: tuple) -> str:
+        return "| " + " | ".join(self._text(v) for v in row) + " |\n"
+
+    def _text(self, value: Any) -> str:
+        if value is None:
+            return ""
+        text = str(self._cell(value))
+        return text.replace("|", "\\|").replace("\n", " ")
+
+class CSVWriter(ResultWriter):
+    def __init__(self, columns: Sequence[str], **limits):
+        super().__init__(columns, **limits)
+        self._buffer = io.StringIO()
+        self._csv = csv.writer(self._buffer, lineterminator="\n")
+
+    def _header(self) -> str:
+        return self._line(self.columns)
+
+    def _row(self, row: tuple) -> str:
+        return self._line([self._cell(v) for v in row])
+
+    def _line(self, values: Sequence[Any]) -> str:
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        self._csv.writerow(values)
+        return self._buffer.getvalue()
+
+class JSONWriter(ResultWriter):
+    """`{"columns": [...], "rows": [[...], ...], "row_count": n, "truncated": bool}`, written row by row."""
+    def _header(self) -> str:
+        return '{"columns": ' + json.dumps(self.columns) + ', "rows": ['
+
+    def _row(self, row: tuple) -> str:
+        text = json.dumps([self._cell(v) for v in row], default=str)
+        return text if self.rows_written == 0 else ", " + text
+
+    def _footer(self) -> str:
+        return f'], "row_count": {self.rows_seen}, "truncated": {json.dumps(self.truncated)}}}'
+
+class ColumnsWriter(JSONWriter):
+    """
+    Compact column form, `{"name": [v1, v2, ...], ...}` plus the row count.
+    Columns can only be written once every row is known, so the accepted rows
+    are held (within the caps) and everything is written by `close()`.
+    """
+    def __init__(self, columns: Sequence[str], **limits):
+        super().__init__(columns, **limits)
+        self._values: List[List[Any]] = [[] for _ in self.columns]
+
+    def _header(self) -> str:
+        return ""
+
+    def _emit(self, row: tuple, text: str) -> str:
+        for values, value in zip(self._values, row):
+            values.append(self._cell(value))
+        return ""
+
+    def _footer(self) -> str:
+        data = {"columns": dict(zip(self.columns, self._values)), "row_count": self.rows_seen, "truncated": self.truncated}
+        return json.dumps(data, default=str)
+
+WRITERS: Dict[str, Type[ResultWriter]] = {
+    "markdown": MarkdownWriter,
+    "json": JSONWriter,
+    "csv": CSVWriter,
+    "columns": ColumnsWriter,
+}
+
+def make_writer(fmt: str, columns: Sequence[str], **limits) -> ResultWriter:
+    try:
+        writer = WRITERS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown result format {fmt!r}; expected one of {', '.join(WRITERS)}") from None
+    return writer(columns, **limits)
+
+class Rendering(NamedTuple):
+    text: str
+    rows_rendered: int
+    total_rows: int
+    truncated: bool
+    summary: Optional[str]
+
+def render(result: ResultSet, fmt: str = "markdown", **limits) -> Rendering:
+    """Renders a whole ResultSet; rows past the row cap are counted, never formatted."""
+    writer = make_writer(fmt, result.columns, **limits)
+    # One row past the cap, so the writer notices the truncation itself
+    head = result.rows[:writer.max_rows + 1]
+    text = writer.open() + writer.write(head)
+    writer.skip(len(result.rows) - len(head))
+    text += writer.close()
+    return Rendering(text, writer.rows_written, writer.rows_seen, writer.truncated, writer.summary())
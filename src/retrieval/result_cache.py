@@ -0,0 +1,105 @@
+import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Hashable
+from .result_set import ResultSet
+
+# Quoted literals/identifiers are kept verbatim; everything else is normalized
+_SQL_PART_RE = re.compile(r"""('(?:[^']|'')*'|"(?:[^"]|"")*"|`[^`]*`|\[[^\]]*\])|([^'"`\[]+|.)""", re.S)
+# Statements whose result can change without any write to the database
+_VOLATILE_RE = re.compile(r"\b(random|randomblob|changes|last_insert_rowid|total_changes)\s*\(|'now'|\bcurrent_(date|time|timestamp)\b", re.I)
+
+def normalize_sql(sql: str) -> str:
+    """Collapses whitespace, lowercases outside quotes and drops trailing semicolons."""
+    parts = []
+    for quoted, other in _SQL_PART_RE.findall(sql):
+        parts.append(quoted if quoted else re.sub(r"\s+", " ", other).lower())
+    return "".join(parts).strip().rstrip(";").strip()
+
+def is_cacheable(sql: str) -> bool:
+    return not _VOLATILE_RE.search(sql)
+
+def estimate_size(result: ResultSet, sample_rows: int = 100) -> int:
+    """Approximate memory footprint of a result, extrapolated from its first rows."""
+    rows = result.rows
+    size = sys.getsizeof(rows) + sum(sys.getsizeof(c) for c in result.columns)
+    if not rows:
+        return size
+    sample = rows[:sample_rows]
+    per_row = sum(sys.getsizeof(r) + sum(sys.getsizeof(v) for v in r) for r in sample) / len(sample)
+    return int(size + per_row * len(rows))
+
+class ResultCache:
+    """
+    LRU cache of query results under a byte budget, with an optional TTL.
+
+    Keys are (normalized SQL, data token); the data token comes from the
+    database change counters, so any committed write produces new keys and old
+    entries simply age out. Only successful results are stored, and results
+    larger than `max_entry_bytes` are not cached at all.
+    """
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, ttl: Optional[float] = None, max_entry_bytes: Optional[int] = None):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes or max_bytes // 8
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._bytes = 0
+        self._stats = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "expirations": 0, "oversized": 0}
+
+    def get(self, key: Hashable) -> Optional[ResultSet]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return None
+            result, size, stored_at = entry
+            if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+                self._drop(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return result
+
+    def put(self, key: Hashable, result: ResultSet) -> bool:
+        if result.error:
+            return False
+        size = estimate_size(result)
+        with self._lock:
+            if size > self.max_entry_bytes:
+                self._stats["oversized"] += 1
+                return False
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (result, size, time.monotonic())
+            self._bytes += size
+            self._stats["stores"] += 1
+            while self._bytes > self.max_bytes and self._entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self._stats["evictions"] += 1
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+    def _drop(self, key: Hashable):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
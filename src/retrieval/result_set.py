@@ -0,0 +1,128 @@
+from collections.abc import Mapping
+from typing import List, Dict, Any, Optional, Sequence, Tuple, Iterator
+
+class RowView(Mapping):
+    """Read-only dict view over one tuple row of a ResultSet; nothing is copied."""
+    __slots__ = ("_result", "_row")
+
+    def __init__(self, result: "ResultSet", row: tuple):
+        self._result = result
+        self._row = row
+
+    def __getitem__(self, key: str) -> Any:
+        return self._row[self._result.index(key)]
+
+    def __contains__(self, key) -> bool:
+        return key in self._result._positions
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._result.columns)
+
+    def __len__(self) -> int:
+        return len(self._result.columns)
+
+    def values(self):
+        # Faster than the Mapping default, and keeps column order
+        return list(self._row)
+
+    def __repr__(self) -> str:
+        return repr(dict(zip(self._result.columns, self._row)))
+
+class ResultSet:
+    """
+    Compact query result: one column header plus plain tuple rows, instead of a
+    dict per row. Rows are exposed lazily as `RowView` mappings so code written
+    against `List[dict]` keeps working (`rs[0]["name"]`, `"error" in rs[0]`,
+    `rs == [{...}]`), while downstream stages can use `columns` / `rows` /
+    `column(name)` directly without building dicts.
+
+    Failed queries are represented as a one-row result whose `error` is set and
+    whose row holds the error fields.
+    """
+    __slots__ = ("columns", "rows", "error", "_positions", "_types")
+
+    def __init__(self, columns: Sequence[str], rows: List[tuple], error: Optional[str] = None):
+        self.columns: Tuple[str, ...] = tuple(columns)
+        self.rows = rows
+        self.error = error
+        self._positions: Dict[str, int] = {}
+        for i, name in enumerate(self.columns):
+            # Like dict(sqlite3.Row), a duplicated column name resolves to the last one
+            self._positions[name] = i
+        self._types: Optional[Tuple[Optional[str], ...]] = None
+
+    @classmethod
+    def from_dicts(cls, rows: List[Dict[str, Any]]) -> "ResultSet":
+        if not rows:
+            return cls((), [])
+        columns = list(rows[0].keys())
+        return cls(columns, [tuple(r.get(c) for c in columns) for r in rows])
+
+    @classmethod
+    def failed(cls, error_row: Dict[str, Any]) -> "ResultSet":
+        """A result holding a single error row (e.g. {"error": ..., "aborted": {...}})."""
+        return cls(list(error_row.keys()), [tuple(error_row.values())], error=error_row.get("error"))
+
+    @property
+    def row_count(self) -> int:
+        return len(self.rows)
+
+    @property
+    def aborted(self) -> Optional[Dict[str, Any]]:
+        if self.error is None or "aborted" not in self._positions:
+            return None
+        return self.rows[0][self._positions["aborted"]]
+
+    @property
+    def types(self) -> Tuple[Optional[str], ...]:
+        """Python type name of the first non-NULL value in each column (None if all NULL)."""
+        if self._types is None:
+            types: List[Optional[str]] = [None] * len(self.columns)
+            missing = set(range(len(self.columns)))
+            for row in self.rows:
+                for i in list(missing):
+                    if row[i] is not None:
+                        types[i] = type(row[i]).__name__
+                        missing.discard(i)
+                if not missing:
+                    break
+            self._types = tuple(types)
+        return self._types
+
+    def index(self, name: str) -> int:
+        try:
+            return self._positions[name]
+        except KeyError:
+            raise KeyError(name) from None
+
+    def column(self, name: str) -> List[Any]:
+        i = self.index(name)
+        return [row[i] for row in self.rows]
+
+    def as_dicts(self) -> List[Dict[str, Any]]:
+        """Materializes the rows as dictionaries (only for callers that really need them)."""
+        return [dict(zip(self.columns, row)) for row in self.rows]
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return ResultSet(self.columns, self.rows[i], self.error)
+        return RowView(self, self.rows[i])
+
+    def __iter__(self) -> Iterator[RowView]:
+        for row in self.rows:
+            yield RowView(self, row)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, ResultSet):
+            return self.columns == other.columns and self.rows == other.rows
+        if isinstance(other, list):
+            return len(other) == len(self.rows) and all(RowView(self, r) == o for r, o in zip(self.rows, other))
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ResultSet(columns={list(self.columns)}, row_count={self.row_count})"
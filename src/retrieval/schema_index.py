@@ -0,0 +1,137 @@
+import math
+import re
+from collections import Counter, deque
+from typing import List, Dict, Any, Optional, Set
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def tokenize(text: str) -> List[str]:
+    """Lowercases, splits identifiers on non-alphanumerics and strips simple suffixes."""
+    tokens = []
+    for tok in _TOKEN_RE.findall(str(text).lower()):
+        if len(tok) > 3:
+            if tok.endswith("ies"):
+                tok = tok[:-3] + "y"
+            elif tok.endswith("sses"):
+                tok = tok[:-2]
+            elif tok.endswith("s") and not tok.endswith("ss"):
+                tok = tok[:-1]
+        if len(tok) > 5 and tok.endswith("ed"):
+            tok = tok[:-2]
+        elif len(tok) > 6 and tok.endswith("ing"):
+            tok = tok[:-3]
+        tokens.append(tok)
+    return tokens
+
+class SchemaIndex:
+    """
+    BM25 index over the tables of a schema snapshot.
+
+    Each table is indexed as one document made of its name, column names, the
+    names of its FK neighbours and its short sample values (names are weighted
+    higher than values). Question terms also match longer schema terms they are
+    a prefix of ("member" -> "membership") at a discount. Selection returns the
+    top-k tables for a question plus the tables on the FK join paths between them.
+    """
+    TABLE_WEIGHT = 3
+    COLUMN_WEIGHT = 2
+    # Free-text samples (descriptions, titles) add noise rather than signal
+    MAX_SAMPLE_WORDS = 3
+    PREFIX_DISCOUNT = 0.5
+
+    def __init__(self, schema: Dict[str, Any], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.tables = list(schema.keys())
+        self.graph: Dict[str, Set[str]] = {t: set() for t in self.tables}
+        for t, details in schema.items():
+            for fk in details.get("foreign_keys", []):
+                if fk["table"] in self.graph and fk["table"] != t:
+                    self.graph[t].add(fk["table"])
+                    self.graph[fk["table"]].add(t)
+
+        self._docs: Dict[str, Counter] = {}
+        for t, details in schema.items():
+            terms = tokenize(t) * self.TABLE_WEIGHT
+            for c in details.get("columns", []):
+                terms += tokenize(c["name"]) * self.COLUMN_WEIGHT
+                for s in c.get("samples", []):
+                    if isinstance(s, str) and len(s.split()) <= self.MAX_SAMPLE_WORDS:
+                        terms += tokenize(s)
+            for neighbour in self.graph[t]:
+                terms += tokenize(neighbour)
+            self._docs[t] = Counter(terms)
+
+        self._doc_len = {t: sum(d.values()) for t, d in self._docs.items()}
+        self._avg_len = (sum(self._doc_len.values()) / len(self._docs)) if self._docs else 0.0
+        df: Counter = Counter()
+        for d in self._docs.values():
+            df.update(d.keys())
+        n = len(self._docs)
+        self._idf = {term: math.log(1 + (n - freq + 0.5) / (freq + 0.5)) for term, freq in df.items()}
+        self._vocab = sorted(self._idf)
+
+    def _expand(self, question: str) -> Dict[str, float]:
+        """Maps question terms to schema terms with a weight (1.0 exact, discounted for prefixes)."""
+        weights: Dict[str, float] = {}
+        for q in set(tokenize(question)):
+            if q in self._idf:
+                weights[q] = 1.0
+            if len(q) >= 4:
+                for term in self._vocab:
+                    if term != q and term.startswith(q):
+                        weights[term] = max(weights.get(term, 0.0), self.PREFIX_DISCOUNT)
+        return weights
+
+    def score(self, question: str) -> Dict[str, float]:
+        """BM25 score of every table for the question (tables with no matching term are omitted)."""
+        scores: Dict[str, float] = {}
+        q_terms = self._expand(question)
+        for t, doc in self._docs.items():
+            total = 0.0
+            norm = self.k1 * (1 - self.b + self.b * self._doc_len[t] / self._avg_len) if self._avg_len else self.k1
+            for term, weight in q_terms.items():
+                tf = doc.get(term)
+                if tf:
+                    total += weight * self._idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            if total > 0:
+                scores[t] = total
+        return scores
+
+    def select(self, question: str, top_k: int = 5, max_hops: int = 3, min_relative_score: float = 0.3) -> List[str]:
+        """
+        Returns the top-k tables by score (ignoring those scoring below
+        `min_relative_score` of the best one), each followed by any tables needed
+        to join it to the ones already selected. Empty if nothing matched.
+        """
+        scores = self.score(question)
+        ranked = sorted(scores, key=lambda t: (-scores[t], t))[:top_k]
+        if ranked:
+            cutoff = scores[ranked[0]] * min_relative_score
+            ranked = [t for t in ranked if scores[t] >= cutoff]
+
+        selected: List[str] = []
+        for t in ranked:
+            if t in selected:
+                continue
+            path = self.join_path(selected, t, max_hops) if selected else [t]
+            for p in path or [t]:
+                if p not in selected:
+                    selected.append(p)
+        return selected
+
+    def join_path(self, sources: List[str], target: str, max_hops: int = 3) -> Optional[List[str]]:
+        """Shortest FK path (excluding the source) from any of `sources` to `target`."""
+        frontier = deque((s, []) for s in sources)
+        seen = set(sources)
+        while frontier:
+            node, path = frontier.popleft()
+            if node == target:
+                return path
+            if len(path) >= max_hops:
+                continue
+            for nxt in sorted(self.graph.get(node, ())):
+                if nxt not in seen:
+                    seen.add(nxt)
+                    frontier.append((nxt, path + [nxt]))
+        return None
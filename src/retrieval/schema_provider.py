@@ -1,79 +1,195 @@
-import sqlite3
-from typing import List, Dict, Any
+import threading
+from typing import List, Dict, Any, Optional
+from .backends import DatabaseBackend, SQLiteBackend, get_backend, is_postgres_url
+from .column_stats import ColumnStatsCatalog
+from .connection_pool import ConnectionPool
+from .schema_index import SchemaIndex
 
 class SchemaProvider:
     """
-    Dynamically extracts schema information from a SQLite database.
+    Dynamically extracts schema information from the database backend (SQLite
+    file or PostgreSQL URL, see `DBClient`).
     Provides table names, column details, and foreign key relationships.
+
+    Introspection results are kept as a versioned snapshot. The snapshot (and the
+    rendered summary) is only rebuilt when the backend reports a DDL change (on
+    SQLite, `PRAGMA schema_version` or the file being replaced) or when the
+    column statistics catalog publishes new stats. Introspection runs on the
+    backend's shared read-only pool.
+
+    On SQLite, sample values come from the `ColumnStatsCatalog`, which is
+    refreshed in the background, so no table is scanned on the request path.
+
+    `get_relevant_summary` renders only the tables a question needs, chosen by a
+    BM25 `SchemaIndex` that is rebuilt together with the snapshot.
     """
-    def __init__(self, db_path: str = "school.db"):
+    SUMMARY_HEADER = "DATABASE SCHEMA (with sample values):\n"
+
+    def __init__(
+        self,
+        db_path: str = "school.db",
+        stats: Optional[ColumnStatsCatalog] = None,
+        detailed_stats: bool = False,
+        top_k: int = 5,
+        token_budget: int = 1500,
+        pool: Optional[ConnectionPool] = None,
+        backend: Optional[DatabaseBackend] = None,
+    ):
         self.db_path = db_path
+        if backend is None:
+            backend = get_backend(db_path) if is_postgres_url(db_path) else SQLiteBackend(db_path, pool)
+        self.backend = backend
+        if stats is None and self.backend.dialect == "sqlite":
+            stats = ColumnStatsCatalog(db_path)
+        self.stats = stats
+        # Adds distinct counts, ranges and null fractions to the summary.
+        self.detailed_stats = detailed_stats
+        # Defaults for query-relevant pruning
+        self.top_k = top_k
+        self.token_budget = token_budget
+        self._lock = threading.RLock()
+        self._version: Optional[tuple] = None
+        self._snapshot: Optional[Dict[str, Any]] = None
+        self._summary: Optional[str] = None
+        self._table_summaries: Dict[str, str] = {}
+        self._index: Optional[SchemaIndex] = None
+        self.rebuilds = 0
 
     def get_schema_summary(self) -> str:
         """Returns a string representation of the schema for LLM consumption, including sample values."""
-        schema_info = self.get_full_schema()
-        summary = "DATABASE SCHEMA (with sample values):\n"
-        
-        for table_name, details in schema_info.items():
-            col_parts = []
-            for c in details['columns']:
-                samples = ", ".join([str(s) for s in c['samples'] if s is not None])
-                sample_str = f" [samples: {samples}]" if samples else ""
-                col_parts.append(f"{c['name']} ({c['type']}){sample_str}")
-            
-            cols = "\n  - ".join(col_parts)
-            summary += f"- Table '{table_name}':\n  - {cols}\n"
-            if details['foreign_keys']:
-                for fk in details['foreign_keys']:
-                    summary += f"  - FK: {fk['from']} -> {fk['table']}.{fk['to']}\n"
-        
-        return summary
+        with self._lock:
+            self._refresh_if_stale()
+            if self._summary is None:
+                self._summary = self._render_summary(list(self._snapshot))
+            return self._summary
+
+    def get_relevant_summary(self, question: str, top_k: Optional[int] = None, token_budget: Optional[int] = None) -> str:
+        """
+        Returns a summary restricted to the top-k tables relevant to the question
+        plus the tables on their FK join paths, trimmed to an approximate token
+        budget. Falls back to the full summary when nothing in the schema matches.
+        """
+        top_k = top_k or self.top_k
+        token_budget = token_budget or self.token_budget
+        with self._lock:
+            self._refresh_if_stale()
+            if self._index is None:
+                self._index = SchemaIndex(self._snapshot)
+            candidates = self._index.select(question, top_k=top_k)
+            if not candidates:
+                return self.get_schema_summary()
+
+            tables: List[str] = []
+            used = self._estimate_tokens(self.SUMMARY_HEADER)
+            for t in candidates:
+                cost = self._estimate_tokens(self._render_table(t))
+                if tables and used + cost > token_budget:
+                    break
+                tables.append(t)
+                used += cost
+
+            if len(tables) == len(self._snapshot):
+                return self.get_schema_summary()
+            note = f"(showing {len(tables)} of {len(self._snapshot)} tables relevant to the question)\n"
+            return self._render_summary(tables, note)
 
     def get_full_schema(self) -> Dict[str, Any]:
-        """Fetches full schema metadata from SQLite, including sample data."""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # Get all tables
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
-        tables = [row[0] for row in cursor.fetchall()]
-        
-        schema = {}
-        for table in tables:
-            # Columns
-            cursor.execute(f"PRAGMA table_info({table});")
-            cols_info = cursor.fetchall()
-            
-            cols = []
-            for r in cols_info:
-                col_name = r[1]
-                col_type = r[2]
-                
-                # Fetch distinct sample values
-                try:
-                    cursor.execute(f"SELECT DISTINCT {col_name} FROM {table} WHERE {col_name} IS NOT NULL LIMIT 3;")
-                    samples = [row[0] for row in cursor.fetchall()]
-                except Exception:
-                    samples = []
-                
-                cols.append({
-                    "name": col_name,
-                    "type": col_type,
-                    "samples": samples
-                })
-            
-            # Foreign Keys
-            cursor.execute(f"PRAGMA foreign_key_list({table});")
-            fks = [{"table": r[2], "from": r[3], "to": r[4]} for r in cursor.fetchall()]
-            
-            schema[table] = {
-                "columns": cols,
-                "foreign_keys": fks
-            }
-            
-        conn.close()
+        """Returns the cached schema snapshot, rebuilding it if the database changed."""
+        with self._lock:
+            self._refresh_if_stale()
+            return self._snapshot
+
+    @property
+    def version(self) -> Optional[tuple]:
+        """Version token of the current snapshot; changes whenever the snapshot is rebuilt."""
+        with self._lock:
+            self._refresh_if_stale()
+            return self._version
+
+    def invalidate(self):
+        """Drops the cached snapshot so the next call re-introspects the database."""
+        with self._lock:
+            self._version = None
+            self._snapshot = None
+            self._summary = None
+            self._table_summaries = {}
+            self._index = None
+
+    def _refresh_if_stale(self):
+        if self.stats is not None:
+            self.stats.maybe_refresh_async()
+        version = self._current_version()
+        if self._snapshot is not None and version == self._version:
+            return
+        self._snapshot = self._introspect() if version is not None else {}
+        self._summary = None
+        self._table_summaries = {}
+        self._index = None
+        self._version = version
+        self.rebuilds += 1
+
+    def _current_version(self) -> Optional[tuple]:
+        """Database identity and schema token from the backend, plus the stats version."""
+        counters = self.backend.version()
+        if counters is None:
+            return None
+        identity, schema_version, _ = counters
+        return (identity, schema_version, self.stats.version if self.stats is not None else None)
+
+    def _render_summary(self, tables: List[str], note: str = "") -> str:
+        return self.SUMMARY_HEADER + note + "".join(self._render_table(t) for t in tables)
+
+    def _render_table(self, table_name: str) -> str:
+        """Renders (and memoizes per snapshot) the summary block of one table."""
+        rendered = self._table_summaries.get(table_name)
+        if rendered is not None:
+            return rendered
+
+        details = self._snapshot[table_name]
+        col_parts = []
+        for c in details['columns']:
+            samples = ", ".join([str(s) for s in c['samples'] if s is not None])
+            sample_str = f" [samples: {samples}]" if samples else ""
+            if self.detailed_stats and c.get('stats'):
+                sample_str += self._render_stats(c['stats'])
+            col_parts.append(f"{c['name']} ({c['type']}){sample_str}")
+
+        cols = "\n  - ".join(col_parts)
+        rendered = f"- Table '{table_name}':\n  - {cols}\n"
+        if details['foreign_keys']:
+            for fk in details['foreign_keys']:
+                rendered += f"  - FK: {fk['from']} -> {fk['table']}.{fk['to']}\n"
+
+        self._table_summaries[table_name] = rendered
+        return rendered
+
+    @staticmethod
+    def _estimate_tokens(text: str) -> int:
+        # Roughly four characters per token for English/identifier-heavy text
+        return len(text) // 4 + 1
+
+    @staticmethod
+    def _render_stats(stats: Dict[str, Any]) -> str:
+        parts = [f"~{stats.get('distinct_estimate')} distinct"]
+        if stats.get('min') is not None and stats.get('max') is not None:
+            parts.append(f"range: {stats['min']}..{stats['max']}")
+        if stats.get('null_fraction'):
+            parts.append(f"{stats['null_fraction']:.0%} null")
+        return f" [{'; '.join(parts)}]"
+
+    def _introspect(self) -> Dict[str, Any]:
+        """Fetches schema metadata from the backend and merges in the cached column statistics."""
+        schema = self.backend.introspect()
+        for table, details in schema.items():
+            for col in details["columns"]:
+                # Sample values are precomputed by the stats catalog
+                col_stats = self.stats.get_column(table, col["name"]) if self.stats is not None else {}
+                col["samples"] = col_stats.get("samples", [])
+                col["stats"] = col_stats
         return schema
 
 if __name__ == "__main__":
     provider = SchemaProvider()
+    if provider.stats is not None:
+        provider.stats.refresh()
     print(provider.get_schema_summary())
@@ -1,15 +1,119 @@
-from typing import Any, Dict, List, Optional
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
 from sqlalchemy import select, func, column, table, join, text, desc
-from sqlalchemy.dialects import postgresql
+from sqlalchemy.dialects import postgresql, sqlite
+from .backends.base import Params
+
+DIALECTS = {"sqlite": sqlite.dialect, "postgresql": postgresql.dialect}
+
+# Comparisons that take a single bind value
+_SINGLE_VALUE_OPERATORS = {"==": "=", "LIKE": "LIKE", "ILIKE": "ILIKE"}
+
+# Physical tables whose names are not plurals
+_UNCOUNTABLE_TABLES = {"attendance", "timetable"}
+
+def table_name(name: str) -> str:
+    """Maps a domain entity name ("grade", "student") to its physical table name."""
+    if name == "grade" or name == "report_card":
+        return "report_cards"
+    if name.endswith("s") or name in _UNCOUNTABLE_TABLES:
+        return name
+    return name + "s"
+
+class Statement(NamedTuple):
+    """A compiled statement and its bind values, in the driver's paramstyle (None when there are none)."""
+    sql: str
+    params: Params
+
+class _Template(NamedTuple):
+    sql: str
+    # Bind names in placeholder order for positional paramstyles, None for named ones
+    positions: Optional[Tuple[str, ...]]
+
+def _freeze(value: Any) -> Any:
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    return value
+
+def intent_shape(intent: Dict[str, Any]) -> Tuple:
+    """Everything about an intent that affects the SQL text: all of it except the filter values."""
+    filters = tuple((f.get("column"), f.get("operator"), isinstance(f.get("value"), (list, tuple))) for f in intent.get("filters") or [])
+    return (_freeze({k: v for k, v in intent.items() if k != "filters"}), filters)
+
+def filter_values(intent: Dict[str, Any]) -> Dict[str, Any]:
+    """Bind values of an intent's filters, by the names the compiled template uses."""
+    values = {}
+    for i, f in enumerate(intent.get("filters") or []):
+        if f["operator"] == "BETWEEN":
+            values[f"filter_{i}_low"], values[f"filter_{i}_high"] = f["value"][0], f["value"][1]
+        elif f["operator"] in _SINGLE_VALUE_OPERATORS:
+            values[f"filter_{i}"] = f["value"]
+    return values
 
 class SQLBuilder:
     """
     Constructs SQL queries programmatically based on structured intent.
     Uses SQLAlchemy's expression language for dialect-agnostic (mostly) building.
+
+    `build` returns a parameterized `Statement` for the target `dialect`:
+    filter values become bind parameters, so every intent with the same
+    shape (action, entities, joins, filter columns and operators) yields the
+    same SQL text. Compiled templates are memoized by shape (LRU, at most
+    `max_templates`), so a repeated shape skips SQLAlchemy entirely and the
+    driver's prepared-statement cache can reuse the statement. `generate`
+    still returns the SQL with the values inlined, for display.
     """
-    
+    def __init__(self, dialect: str = "sqlite", max_templates: int = 256):
+        if dialect not in DIALECTS:
+            raise ValueError(f"Unsupported dialect {dialect!r}; expected one of {', '.join(DIALECTS)}")
+        self.dialect = DIALECTS[dialect]()
+        self.max_templates = max_templates
+        self._lock = threading.Lock()
+        self._templates: "OrderedDict[Tuple, _Template]" = OrderedDict()
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def build(self, intent: Dict[str, Any]) -> Statement:
+        """Returns the parameterized statement for an intent, compiling it only for a new shape."""
+        shape = intent_shape(intent)
+        with self._lock:
+            template = self._templates.get(shape)
+            if template is not None:
+                self._templates.move_to_end(shape)
+                self._stats["hits"] += 1
+        if template is None:
+            template = self._template(self._statement(intent, inline=False))
+            with self._lock:
+                self._stats["misses"] += 1
+                self._templates[shape] = template
+                while len(self._templates) > self.max_templates:
+                    self._templates.popitem(last=False)
+                    self._stats["evictions"] += 1
+
+        values = filter_values(intent)
+        if not values:
+            return Statement(template.sql, None)
+        if template.positions is not None:
+            return Statement(template.sql, tuple(values[name] for name in template.positions))
+        return Statement(template.sql, values)
+
     def generate(self, intent: Dict[str, Any]) -> str:
-        """Generates a SQL string from the provided intent object."""
+        """Generates a SQL string from the provided intent object, with the filter values inlined."""
+        stmt = self._statement(intent, inline=True)
+        return stmt if isinstance(stmt, str) else self._compile(stmt)
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"templates": len(self._templates), "max_templates": self.max_templates, **self._stats}
+
+    def clear(self):
+        with self._lock:
+            self._templates.clear()
+
+    def _statement(self, intent: Dict[str, Any], inline: bool):
+        """The SQLAlchemy construct for an intent (or plain SQL text); filter values are bound only if `inline`."""
         
         # 1. Base query from entities/tables
         tables = {}
@@ -20,10 +124,7 @@ class SQLBuilder:
             if "." in entity:
                 t_name, c_name = entity.split(".", 1)
                 # Map domain names to physical table names if necessary
-                if t_name == "grade" or t_name == "report_card":
-                    t_name = "report_cards"
-                elif not t_name.endswith("s"):
-                    t_name += "s"
+                t_name = table_name(t_name)
                 
                 if t_name not in tables:
                     tables[t_name] = table(t_name)
@@ -35,49 +136,43 @@ class SQLBuilder:
                 else:
                     columns.append(text(f"{t_name}.{c_name}"))
                     seen_cols.add(c_name)
-        
-        # If no entities specified but action is aggregate, we still need tables
-        if not columns and intent.get("action") == "aggregate":
-            target = intent.get("target", "")
-            if "." in target:
-                t_name, _ = target.split(".", 1)
-                table_name = "report_cards" if t_name == "grade" else (t_name if t_name.endswith("s") else t_name + "s")
-                tables[table_name] = table(table_name)
 
         # 2. Handle Aggregates
         if intent.get("action") == "aggregate":
             target = intent.get("target", "")
             if "." in target:
                 t_name, c_name = target.split(".", 1)
-                table_name = "report_cards" if t_name == "grade" else (t_name if t_name.endswith("s") else t_name + "s")
+                t_name = table_name(t_name)
+                joins = intent.get("joins")
                 
+                # Joined tables may share column names, so those stay qualified
                 func_name = intent.get("function", "AVG")
-                agg_col = func.__getattr__(func_name)(text(c_name))
+                agg_col = func.__getattr__(func_name)(text(f"{t_name}.{c_name}" if joins else c_name))
+                if intent.get("alias"):
+                    agg_col = agg_col.label(intent["alias"])
+                source = self._join(joins) if joins else table(t_name)
                 
                 # Group by
                 group_by_field = intent.get("group_by")
                 if group_by_field and "." in group_by_field:
-                    _, g_c_name = group_by_field.split(".", 1)
-                    stmt = select(text(g_c_name), agg_col).select_from(table(table_name)).group_by(text(g_c_name))
-                    return self._compile(stmt)
+                    g_t_name, g_c_name = group_by_field.split(".", 1)
+                    group_col = text(f"{table_name(g_t_name)}.{g_c_name}" if joins else g_c_name)
+                    stmt = select(group_col, agg_col).select_from(source).group_by(group_col)
+                else:
+                    stmt = select(agg_col).select_from(source)
+                return self._refine(stmt, intent, inline)
 
         # 3. Handle Window Functions (Rank)
         if intent.get("action") == "rank":
             partition_by = intent.get("partition_by")
             order_by = intent.get("order_by", "")
             
-            stmt = text(f"SELECT name, {partition_by}, RANK() OVER (PARTITION BY {partition_by} ORDER BY {order_by}) as rank FROM student_scores")
-            return str(stmt)
+            return f"SELECT name, {partition_by}, RANK() OVER (PARTITION BY {partition_by} ORDER BY {order_by}) as rank FROM student_scores"
 
         # 4. Handle Joins
         if intent.get("joins"):
-            primary_table = intent["joins"][0]["from"]
-            j_obj = table(primary_table)
-            for j in intent["joins"]:
-                j_obj = join(j_obj, table(j["to"]), text(j["on"]))
-            
-            stmt = select(*columns).select_from(j_obj)
-            return self._compile(stmt)
+            stmt = select(*columns).select_from(self._join(intent["joins"]))
+            return self._refine(stmt, intent, inline)
 
         # 5. Handle Filters
         if intent.get("filters"):
@@ -87,31 +182,54 @@ class SQLBuilder:
             elif not t_name:
                 t_name = "dual"
                 
-            stmt = select(text("*")).select_from(table(t_name))
-            clauses = []
-            for f in intent["filters"]:
-                col = text(f["column"])
-                op = f["operator"]
-                val = f["value"]
-                
-                if op == "BETWEEN":
-                    clauses.append(text(f"{f['column']} BETWEEN '{val[0]}' AND '{val[1]}'"))
-                elif op == "==":
-                    clauses.append(text(f"{f['column']} = '{val}'"))
-            
-            if clauses:
-                stmt = stmt.where(*clauses)
-            return self._compile(stmt)
+            stmt = select(*columns or [text("*")]).select_from(table(t_name))
+            return self._refine(stmt, intent, inline)
 
         # Default fallthrough
         if columns:
             stmt = select(*columns)
             if tables:
                 stmt = stmt.select_from(*tables.values())
-            return self._compile(stmt)
+            return self._refine(stmt, intent, inline)
             
         return "SELECT * FROM dual"
 
+    @staticmethod
+    def _join(joins: List[Dict[str, str]]):
+        j_obj = table(joins[0]["from"])
+        for j in joins:
+            j_obj = join(j_obj, table(j["to"]), text(j["on"]))
+        return j_obj
+
+    @staticmethod
+    def _refine(stmt, intent: Dict[str, Any], inline: bool):
+        """Adds the intent's filters (as bind parameters) and ordering to a SELECT."""
+        clauses = []
+        values = filter_values(intent) if inline else {}
+        for i, f in enumerate(intent.get("filters") or []):
+            op = f["operator"]
+            name = f"filter_{i}"
+            
+            if op == "BETWEEN":
+                clause = text(f"{f['column']} BETWEEN :{name}_low AND :{name}_high")
+                clauses.append(clause.bindparams(**{k: values[k] for k in (f"{name}_low", f"{name}_high")}) if inline else clause)
+            elif op in _SINGLE_VALUE_OPERATORS:
+                clause = text(f"{f['column']} {_SINGLE_VALUE_OPERATORS[op]} :{name}")
+                clauses.append(clause.bindparams(**{name: values[name]}) if inline else clause)
+        
+        if clauses:
+            stmt = stmt.where(*clauses)
+        if intent.get("order_by"):
+            stmt = stmt.order_by(text(intent["order_by"]))
+        return stmt
+
+    def _template(self, stmt) -> _Template:
+        if isinstance(stmt, str):
+            return _Template(stmt, ())
+        compiled = stmt.compile(dialect=self.dialect)
+        positions = tuple(compiled.positiontup) if self.dialect.positional else None
+        return _Template(str(compiled), positions)
+
     def _compile(self, stmt) -> str:
-        """Compile SQLAlchemy statement to PostgreSQL dialect string."""
-        return str(stmt.compile(dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}))
+        """Compile a SQLAlchemy statement to a literal SQL string in the target dialect."""
+        return str(stmt.compile(dialect=self.dialect, compile_kwargs={"literal_binds": True}))
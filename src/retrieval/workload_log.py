@@ -0,0 +1,128 @@
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
+from .result_cache import normalize_sql
+
+# Literals are replaced so "... WHERE id = 3" and "... WHERE id = 4" share one entry
+_LITERAL_RE = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+def query_shape(sql: str) -> str:
+    return _LITERAL_RE.sub("?", normalize_sql(sql))
+
+class WorkloadLog:
+    """
+    Record of the SQL that actually ran, grouped by query shape (normalized SQL
+    with literals replaced), with execution counts and total time.
+
+    Only the shape is kept by default, so no literal values (student names,
+    ids) end up in memory or on disk; the `IndexAdvisor` EXPLAINs shapes with
+    NULLs bound. With `record_values=True` one example statement and its
+    params are kept per shape instead, so plans can be checked against real
+    values. Left unset, `record_values` is on only with
+    SUTRADHARA_WORKLOAD_VALUES=1 in the environment.
+
+    The log is kept in memory, bounded to `max_entries` shapes (the least
+    recently run are dropped). When `path` is set it is persisted to a JSON
+    side file by a background thread at most every `flush_interval` seconds,
+    so recording never writes on the query thread; call `save()` to flush
+    synchronously.
+    """
+    def __init__(self, path: Optional[str] = None, max_entries: int = 5000, flush_interval: float = 5.0, record_values: Optional[bool] = None):
+        self.path = path
+        self.max_entries = max_entries
+        self.flush_interval = flush_interval
+        if record_values is None:
+            record_values = os.environ.get("SUTRADHARA_WORKLOAD_VALUES") == "1"
+        self.record_values = record_values
+        self._lock = threading.Lock()
+        # Serializes writers of the side file (a background flush and an explicit save)
+        self._write_lock = threading.Lock()
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._unsaved = 0
+        self._flusher: Optional[threading.Thread] = None
+        self._last_flush = time.monotonic()
+        self._load()
+
+    def record(self, sql: str, elapsed_ms: float, params=None):
+        """Counts one run of `sql`; the statement and `params` are kept only with `record_values`."""
+        shape = query_shape(sql)
+        with self._lock:
+            entry = self._entries.get(shape)
+            if entry is None:
+                entry = self._entries[shape] = {"sql": shape, "count": 0, "total_ms": 0.0}
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+            self._entries.move_to_end(shape)
+            if self.record_values:
+                entry["sql"] = sql
+                if params:
+                    entry["params"] = params
+                else:
+                    entry.pop("params", None)
+            entry["count"] += 1
+            entry["total_ms"] = round(entry["total_ms"] + elapsed_ms, 3)
+            entry["last_run"] = time.time()
+            self._unsaved += 1
+        self._maybe_flush_async()
+
+    def wait(self, timeout: Optional[float] = None):
+        """Blocks until a running background flush has finished."""
+        flusher = self._flusher
+        if flusher is not None:
+            flusher.join(timeout)
+
+    def entries(self) -> List[Dict[str, Any]]:
+        """Logged shapes, most expensive (total time) first."""
+        with self._lock:
+            entries = [{"shape": shape, **entry} for shape, entry in self._entries.items()]
+        return sorted(entries, key=lambda e: e["total_ms"], reverse=True)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def save(self):
+        if self.path is None:
+            return
+        with self._lock:
+            payload = json.dumps({"queries": self._entries}, default=str)
+            self._unsaved = 0
+            self._last_flush = time.monotonic()
+        tmp_path = f"{self.path}.tmp"
+        with self._write_lock:
+            try:
+                with open(tmp_path, "w") as f:
+                    f.write(payload)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"Could not persist query workload to {self.path}: {str(e)}")
+
+    def _load(self):
+        if self.path is None:
+            return
+        try:
+            with open(self.path, "r") as f:
+                self._entries = OrderedDict(json.load(f).get("queries", {}))
+        except (OSError, ValueError):
+            self._entries = OrderedDict()
+        if not self.record_values:
+            # Files written with values recorded are redacted as soon as they are read
+            for shape, entry in self._entries.items():
+                entry["sql"] = shape
+                entry.pop("params", None)
+
+    def _maybe_flush_async(self):
+        if self.path is None:
+            return
+        with self._lock:
+            if not self._unsaved or time.monotonic() - self._last_flush < self.flush_interval:
+                return
+            if self._flusher is not None and self._flusher.is_alive():
+                return
+            self._last_flush = time.monotonic()
+            self._flusher = threading.Thread(target=self.save, name="workload-log-flush", daemon=True)
+            self._flusher.start()
@@ -0,0 +1,142 @@
+import re
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Sequence, Tuple
+
+# Latency buckets in seconds, from a cache hit to a slow LLM call
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_NAME_RE = re.compile(r"[^a-zA-Z0-9_]")
+
+def metric_name(*parts: str) -> str:
+    return _NAME_RE.sub("_", "_".join(p for p in parts if p))
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+def _labels(labels: Tuple[Tuple[str, Any], ...], le: Optional[str] = None) -> str:
+    pairs = [f'{k}="{_escape(v)}"' for k, v in labels]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Histogram:
+    """Cumulative-bucket histogram, as Prometheus exposes them."""
+    __slots__ = ("buckets", "counts", "count", "sum")
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float):
+        i = bisect_left(self.buckets, value)
+        if i < len(self.counts):
+            self.counts[i] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[Tuple[float, int]]:
+        total, out = 0, []
+        for bound, n in zip(self.buckets, self.counts):
+            total += n
+            out.append((bound, total))
+        return out
+
+class MetricsRegistry:
+    """
+    Process-wide counters and latency histograms, keyed by name and labels,
+    rendered in the Prometheus text exposition format. Component snapshots
+    (cache hit rates, pool usage, ...) are passed to `render` as nested dicts
+    and exposed as gauges, so components keep their own `metrics()`.
+    """
+    def __init__(self, prefix: str = "sutradhara"):
+        self.prefix = prefix
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, Histogram]] = {}
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels):
+        key = tuple(sorted(labels.items()))
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timed(self, name: str, **labels):
+        """Observes the duration of the block in seconds, whether or not it raises."""
+        started_at = time.monotonic()
+        try:
+            yield
+        finally:
+            self.observe(name, time.monotonic() - started_at, **labels)
+
+    def counter(self, name: str, **labels) -> float:
+        with self._lock:
+            return self._counters.get(name, {}).get(tuple(sorted(labels.items())), 0)
+
+    def histogram(self, name: str, **labels) -> Optional[Histogram]:
+        with self._lock:
+            return self._histograms.get(name, {}).get(tuple(sorted(labels.items())))
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self, gauges: Optional[Dict[str, Any]] = None, label_keys: Optional[Dict[str, str]] = None) -> str:
+        """
+        Renders every series. `gauges` is a nested dict of numbers, flattened
+        into `<prefix>_<path>` gauges; a key listed in `label_keys` turns the
+        level below it into a label (e.g. {"models": "model"}).
+        """
+        lines: List[str] = []
+        with self._lock:
+            for name, series in sorted(self._counters.items()):
+                full = metric_name(self.prefix, name)
+                lines.append(f"# TYPE {full} counter")
+                for labels, value in sorted(series.items()):
+                    lines.append(f"{full}{_labels(labels)} {value:g}")
+            for name, series in sorted(self._histograms.items()):
+                full = metric_name(self.prefix, name)
+                lines.append(f"# TYPE {full} histogram")
+                for labels, histogram in sorted(series.items()):
+                    for bound, count in histogram.cumulative():
+                        lines.append(f"{full}_bucket{_labels(labels, f'{bound:g}')} {count}")
+                    lines.append(f"{full}_bucket{_labels(labels, '+Inf')} {histogram.count}")
+                    lines.append(f"{full}_sum{_labels(labels)} {histogram.sum:.6f}")
+                    lines.append(f"{full}_count{_labels(labels)} {histogram.count}")
+
+        flat: Dict[str, List[Tuple[tuple, float]]] = {}
+        self._flatten(gauges or {}, (self.prefix,), (), label_keys or {}, flat)
+        for name, series in sorted(flat.items()):
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in series:
+                lines.append(f"{name}{_labels(labels)} {value:g}")
+        return "\n".join(lines) + "\n"
+
+    def _flatten(self, data: Dict[str, Any], path: tuple, labels: tuple, label_keys: Dict[str, str], out: Dict[str, list]):
+        for key, value in data.items():
+            if isinstance(value, dict):
+                if key in label_keys:
+                    for label_value, nested in value.items():
+                        if isinstance(nested, dict):
+                            self._flatten(nested, path, labels + ((label_keys[key], label_value),), label_keys, out)
+                else:
+                    self._flatten(value, path + (key,), labels, label_keys, out)
+            elif isinstance(value, (int, float)) and not isinstance(value, bool):
+                out.setdefault(metric_name(*path, key), []).append((labels, value))
+
+registry = MetricsRegistry()
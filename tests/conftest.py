@@ -1,3 +1,4 @@
+import os
 import pytest
 from unittest.mock import patch, MagicMock
 
@@ -9,5 +10,5 @@ def mock_llm():
     
     with patch("src.agents.intent_agent.ChatGoogleGenerativeAI.ainvoke", return_value=mock_response), \
          patch("src.agents.intent_agent.ChatOpenAI.ainvoke", return_value=mock_response), \
-         patch("src.agents.intent_agent.os.getenv", side_effect=lambda k, *args: "fake_key" if ("GOOGLE" in k or "OPENAI" in k) else None):
+         patch("src.agents.intent_agent.os.getenv", side_effect=lambda k, *args: "fake_key" if ("GOOGLE" in k or "OPENAI" in k) else os.environ.get(k, *args)):
         yield
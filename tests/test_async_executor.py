@@ -0,0 +1,63 @@
+import asyncio
+import sqlite3
+import time
+import pytest
+from src.retrieval.async_executor import AsyncQueryExecutor
+from src.retrieval.db_client import DBClient
+
+@pytest.mark.asyncio
+async def test_blocking_work_does_not_stall_event_loop():
+    executor = AsyncQueryExecutor(max_workers=1)
+    ticks = 0
+
+    async def ticker():
+        nonlocal ticks
+        while True:
+            ticks += 1
+            await asyncio.sleep(0.01)
+
+    tick_task = asyncio.create_task(ticker())
+    await executor.run(time.sleep, 0.2)
+    tick_task.cancel()
+    assert ticks >= 5
+
+@pytest.mark.asyncio
+async def test_concurrency_limit_queues_extra_work():
+    executor = AsyncQueryExecutor(max_workers=2)
+    await asyncio.gather(*[executor.run(time.sleep, 0.05) for _ in range(4)])
+    metrics = executor.metrics()
+    assert metrics["completed"] == 4
+    assert metrics["queued"] == 0 and metrics["running"] == 0
+    # Two of the four had to wait for a free worker
+    assert metrics["queue_wait_s_max"] >= 0.04
+
+@pytest.mark.asyncio
+async def test_queue_limit_rejects_and_errors_are_counted():
+    executor = AsyncQueryExecutor(max_workers=1, max_queue=1)
+    # One running, one waiting: the third is turned away
+    running = asyncio.create_task(executor.run(time.sleep, 0.05))
+    await asyncio.sleep(0.01)
+    waiting = asyncio.create_task(executor.run(time.sleep, 0))
+    await asyncio.sleep(0)
+    with pytest.raises(RuntimeError):
+        await executor.run(time.sleep, 0)
+    await asyncio.gather(running, waiting)
+
+    with pytest.raises(ZeroDivisionError):
+        await executor.run(lambda: 1 / 0)
+    metrics = executor.metrics()
+    assert metrics["rejected"] == 1
+    assert metrics["failed"] == 1
+
+@pytest.mark.asyncio
+async def test_db_client_aexecute(tmp_path):
+    path = str(tmp_path / "async.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE courses (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.execute("INSERT INTO courses (name) VALUES ('Physics 101')")
+    conn.commit()
+    conn.close()
+
+    client = DBClient(path)
+    assert await client.aexecute("SELECT name FROM courses") == [{"name": "Physics 101"}]
+    assert client.metrics()["executor"]["completed"] == 1
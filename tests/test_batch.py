@@ -0,0 +1,118 @@
+import asyncio
+import json
+import time
+import pytest
+from unittest.mock import patch, MagicMock
+from fastapi.testclient import TestClient
+from src.gateway.main import app, get_orchestrator
+
+class SlowModel:
+    """Answers every question with a fixed query after `delay` seconds; tracks how many calls overlap."""
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(self.delay)
+        finally:
+            self.in_flight -= 1
+        result = MagicMock()
+        result.content = "SELECT name FROM departments"
+        return result
+
+@pytest.fixture
+def orchestrator():
+    return get_orchestrator()
+
+def test_batch_runs_items_in_parallel_and_keeps_order(orchestrator):
+    model = SlowModel(delay=0.3)
+    queries = [f"list departments {i}" for i in range(4)]
+    with patch.object(orchestrator.intent_agent, "models", [model]):
+        response = TestClient(app).post("/api/v1/ask/batch", json={"queries": queries, "max_concurrency": 4})
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert len(results) == 4
+    assert all(r["type"] == "answer" for r in results)
+    assert model.calls == 4
+    # The model calls overlapped instead of running one after another
+    assert 1 < model.max_in_flight <= 4
+
+def test_run_many_keeps_at_most_max_concurrency_items_in_flight(orchestrator):
+    model = SlowModel(delay=0.1)
+    with patch.object(orchestrator.intent_agent, "models", [model]):
+        results = asyncio.run(orchestrator.run_many([f"departments in batch {i}" for i in range(5)], max_concurrency=2))
+    assert all(r.get("answer") for r in results)
+    assert model.calls == 5
+    assert model.max_in_flight == 2
+
+def test_batch_schema_is_fetched_once(orchestrator):
+    model = SlowModel(delay=0)
+    provider = orchestrator.schema_provider
+    provider.invalidate()
+    with patch.object(orchestrator.intent_agent, "models", [model]), \
+         patch.object(provider, "_introspect", wraps=provider._introspect) as introspect, \
+         patch.object(provider, "get_relevant_summary", wraps=provider.get_relevant_summary) as summary:
+        results = asyncio.run(orchestrator.run_many([f"departments please {i}" for i in range(3)]))
+    # One snapshot build serves every item of the batch
+    assert introspect.call_count == 1
+    assert summary.call_count == 3
+    assert all(r["schema_version"] == results[0]["schema_version"] for r in results)
+
+def test_run_many_isolates_item_failures(orchestrator):
+    async def ainvoke(state):
+        if state["query"] == "boom":
+            raise RuntimeError("model exploded")
+        return {**state, "answer": f"answer to {state['query']}"}
+
+    fake_app = MagicMock()
+    fake_app.ainvoke = ainvoke
+    with patch.object(orchestrator, "app", fake_app):
+        results = asyncio.run(orchestrator.run_many(["first", "boom", "last"]))
+
+    assert [r.get("answer") for r in results] == ["answer to first", None, "answer to last"]
+    assert results[1]["error"] == "model exploded"
+
+def test_run_many_reports_an_item_timeout_without_a_deadline_as_an_error(orchestrator):
+    async def ainvoke(state):
+        if state["query"] == "stuck":
+            raise asyncio.TimeoutError
+        return {**state, "answer": "done"}
+
+    fake_app = MagicMock()
+    fake_app.ainvoke = ainvoke
+    with patch.object(orchestrator, "app", fake_app):
+        results = asyncio.run(orchestrator.run_many(["first", "stuck", "last"]))
+
+    assert [r.get("answer") for r in results] == ["done", None, "done"]
+    assert results[1]["error"] == "TimeoutError" and results[1].get("aborted") is None
+
+def test_run_many_deadline_aborts_only_slow_items(orchestrator):
+    async def ainvoke(state):
+        await asyncio.sleep(1.0 if state["query"] == "slow" else 0)
+        return {**state, "answer": "done"}
+
+    fake_app = MagicMock()
+    fake_app.ainvoke = ainvoke
+    with patch.object(orchestrator, "app", fake_app):
+        results = asyncio.run(orchestrator.run_many(["fast", "slow"], deadline=time.monotonic() + 0.2))
+
+    assert results[0]["answer"] == "done"
+    assert results[1]["aborted"]["reason"] == "deadline"
+
+def test_batch_renders_requested_format(orchestrator):
+    model = SlowModel(delay=0)
+    with patch.object(orchestrator.intent_agent, "models", [model]):
+        response = TestClient(app).post("/api/v1/ask/batch", json={"queries": ["departments as json"], "format": "json", "max_rows": 1})
+
+    result = response.json()["results"][0]
+    data = json.loads(result["answer"])
+    assert data["columns"] == ["name"]
+    assert len(data["rows"]) <= 1
+    assert result["sql"] == "SELECT name FROM departments"
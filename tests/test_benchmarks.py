@@ -0,0 +1,86 @@
+import asyncio
+import httpx
+from langchain_core.messages import SystemMessage, HumanMessage
+from benchmarks.fake_llm import FakeChatModel, load_corpus
+from benchmarks.run_benchmarks import build_orchestrator, run_suite
+from benchmarks.load_test import LoopLagMonitor, in_process_client, sweep
+from benchmarks.stats import summarize, compare
+from src.gateway import main
+
+def test_fake_model_is_deterministic():
+    model = FakeChatModel({"How many students?": "SELECT COUNT(*) FROM students"})
+    messages = [SystemMessage(content="schema"), HumanMessage(content="how many  students?")]
+    first = asyncio.run(model.ainvoke(messages))
+    second = asyncio.run(model.ainvoke(messages))
+    assert first.content == second.content == "SELECT COUNT(*) FROM students"
+    assert first.usage_metadata["output_tokens"] > 0
+    unknown = asyncio.run(model.ainvoke([HumanMessage(content="something else")]))
+    assert unknown.content.startswith("CLARIFICATION:")
+
+def test_run_suite_reports_percentiles_per_stage():
+    corpus = load_corpus()[:2]
+    orchestrator = build_orchestrator("school.db", corpus=corpus)
+    report = asyncio.run(run_suite(orchestrator, corpus, iterations=2, warmup=0))
+
+    assert report["runs"] == 4
+    assert report["errors"] == 0
+    assert report["total"]["count"] == 4
+    assert {"fetch_schema", "resolve_intent", "enforce_policy", "execute_sql", "summarize"} <= set(report["stages"])
+    # Cold runs: every run asked the model
+    assert orchestrator.intent_agent.models[0].calls == 4
+
+def test_summarize_and_compare():
+    stats = summarize([float(ms) for ms in range(1, 101)])
+    assert (stats["p50_ms"], stats["p95_ms"], stats["p99_ms"]) == (50.0, 95.0, 99.0)
+
+    baseline = {"total": {"p50_ms": 10.0, "p95_ms": 20.0}, "stages": {"execute_sql": {"p50_ms": 0.2, "p95_ms": 0.4}}}
+    current = {"total": {"p50_ms": 10.5, "p95_ms": 30.0}, "stages": {"execute_sql": {"p50_ms": 0.5, "p95_ms": 0.9}}}
+    regressions = compare(current, baseline)
+    # The total p95 regressed; the stage changes are below the 1 ms noise floor
+    assert len(regressions) == 1 and regressions[0].startswith("total p95_ms")
+
+def test_load_sweep_in_process():
+    corpus = load_corpus()[:3]
+    previous = main._orchestrator
+
+    async def go():
+        async with in_process_client(llm_delay=0.05) as client:
+            return await sweep(client, [1, 4], corpus, requests_per_worker=2, min_requests=8, monitor=LoopLagMonitor())
+
+    levels = asyncio.run(go())
+    assert [level["concurrency"] for level in levels] == [1, 4]
+    assert [level["requests"] for level in levels] == [8, 8]
+    assert all(level["error_rate"] == 0 and level["errors"] == {} for level in levels)
+    for level in levels:
+        assert level["latency"]["count"] == level["requests"]
+        # Every request paid for one simulated 50 ms model call
+        assert level["latency"]["p50_ms"] >= 50
+        assert level["throughput_rps"] > 0 and level["elapsed_s"] > 0
+    assert levels[0]["loop_lag"]["count"] > 0
+    assert main._orchestrator is previous
+
+def test_load_sweep_stops_once_the_error_rate_passes_the_limit():
+    corpus = load_corpus()[:3]
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        # Every other request fails, so each level has a 50% error rate
+        if len(calls) % 2:
+            return httpx.Response(503)
+        return httpx.Response(200, json={"type": "answer"})
+
+    async def go(stop_error_rate):
+        calls.clear()
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler), base_url="http://gateway") as client:
+            return await sweep(client, [1, 2, 4], corpus, requests_per_worker=1, min_requests=4, stop_error_rate=stop_error_rate)
+
+    levels = asyncio.run(go(stop_error_rate=0.25))
+    assert [level["concurrency"] for level in levels] == [1]
+    assert levels[0]["error_rate"] == 0.5 and levels[0]["errors"] == {"http_503": 2}
+    assert len(calls) == 4
+
+    levels = asyncio.run(go(stop_error_rate=0.5))
+    assert [level["concurrency"] for level in levels] == [1, 2, 4]
+    assert all(level["error_rate"] == 0.5 for level in levels)
+    assert len(calls) == 12
@@ -0,0 +1,70 @@
+import sqlite3
+import pytest
+from src.retrieval.column_stats import ColumnStatsCatalog
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "stats.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE attendance (id INTEGER PRIMARY KEY, student_id INTEGER, status TEXT)")
+    rows = [(i % 50, None if i % 10 == 0 else ("Present" if i % 3 else "Absent")) for i in range(1000)]
+    conn.executemany("INSERT INTO attendance (student_id, status) VALUES (?, ?)", rows)
+    conn.commit()
+    conn.close()
+    return path
+
+def test_column_stats_values(db_path):
+    catalog = ColumnStatsCatalog(db_path)
+    assert catalog.refresh() == ["attendance"]
+
+    status = catalog.get_column("attendance", "status")
+    assert status["null_fraction"] == 0.1
+    assert status["distinct_estimate"] == 2
+    assert status["samples"][0] == "Present"
+    assert catalog.get_column("attendance", "student_id")["max"] == 49
+
+def test_sampled_distinct_estimate(db_path):
+    catalog = ColumnStatsCatalog(db_path, sample_rows=100)
+    catalog.refresh()
+    ids = catalog.get_column("attendance", "id")
+    # Every id is unique; the estimate should scale well beyond the sample size
+    assert ids["distinct_estimate"] > 500
+    assert catalog.get_column("attendance", "student_id")["distinct_estimate"] <= 50
+
+def test_refresh_is_incremental_and_persisted(db_path):
+    catalog = ColumnStatsCatalog(db_path)
+    catalog.refresh()
+    assert catalog.refresh() == []
+
+    reloaded = ColumnStatsCatalog(db_path)
+    assert reloaded.get_column("attendance", "status")["distinct_estimate"] == 2
+    assert reloaded.refresh() == []
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO attendance (student_id, status) VALUES (1, 'Late')")
+    conn.commit()
+    conn.close()
+    assert reloaded.refresh() == ["attendance"]
+    assert reloaded.get_column("attendance", "status")["distinct_estimate"] == 3
+
+def test_unchanged_database_skips_the_table_checks(db_path, monkeypatch):
+    catalog = ColumnStatsCatalog(db_path)
+    catalog.refresh()
+    statements = []
+    fingerprint = catalog._fingerprint
+
+    def traced(cursor, table):
+        cursor.connection.set_trace_callback(statements.append)
+        return fingerprint(cursor, table)
+
+    monkeypatch.setattr(catalog, "_fingerprint", traced)
+    # Nothing changed: data_version on the probe says so without touching any table
+    assert catalog.refresh() == [] and statements == []
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO attendance (student_id, status) VALUES (1, 'Late')")
+    conn.commit()
+    conn.close()
+    assert catalog.refresh() == ["attendance"]
+    assert statements[0] == "SELECT MAX(rowid) FROM attendance;"
+    assert catalog.get_table("attendance")["row_count"] == 1001
@@ -0,0 +1,76 @@
+import os
+import sqlite3
+import pytest
+from src.retrieval.connection_pool import ConnectionPool, get_pool
+from src.retrieval.db_client import DBClient
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "pool.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE courses (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.execute("INSERT INTO courses (name) VALUES ('Physics 101')")
+    conn.commit()
+    conn.close()
+    return path
+
+def test_connections_are_reused_and_tuned(db_path):
+    pool = ConnectionPool(db_path)
+    for _ in range(3):
+        with pool.connection() as conn:
+            assert conn.execute("PRAGMA query_only;").fetchone()[0] == 1
+    metrics = pool.metrics()
+    assert metrics["created"] == 1
+    assert metrics["checkouts"] == 3
+    assert metrics["idle"] == 1 and metrics["in_use"] == 0
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+
+def test_pool_is_read_only(db_path):
+    client = DBClient(db_path, pool=ConnectionPool(db_path))
+    result = client.execute("DELETE FROM courses")
+    assert "error" in result[0]
+    assert client.execute("SELECT name FROM courses") == [{"name": "Physics 101"}]
+
+def test_acquire_times_out_when_exhausted(db_path):
+    pool = ConnectionPool(db_path, max_size=1)
+    conn = pool.acquire()
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+    pool.release(conn)
+    assert pool.metrics()["waits"] == 1
+    pool.release(pool.acquire(timeout=0.05))
+
+def test_change_counters_and_file_replacement(db_path):
+    pool = ConnectionPool(db_path)
+    identity, schema_version, data_version = pool.change_counters()
+    with pool.connection():
+        pass
+
+    writer = sqlite3.connect(db_path)
+    writer.execute("INSERT INTO courses (name) VALUES ('Chemistry 201')")
+    writer.commit()
+    writer.close()
+    assert pool.change_counters()[2] != data_version
+
+    os.remove(db_path)
+    replacement = sqlite3.connect(db_path)
+    replacement.execute("CREATE TABLE other (id INTEGER)")
+    replacement.commit()
+    replacement.close()
+    assert pool.change_counters()[0] != identity
+    # The idle connection to the old file was recycled
+    assert pool.metrics()["idle"] == 0
+
+def test_health_check_and_missing_database(tmp_path, db_path):
+    pool = ConnectionPool(db_path)
+    with pool.connection():
+        pass
+    assert pool.health_check() == {"ok": True, "checked": 1, "failed": 0}
+
+    missing = str(tmp_path / "missing.db")
+    assert ConnectionPool(missing).health_check()["ok"] is False
+    assert DBClient(missing).execute("SELECT 1") == [{"error": f"Database {missing} not found."}]
+
+def test_get_pool_is_shared(db_path):
+    assert get_pool(db_path) is get_pool(os.path.abspath(db_path))
@@ -0,0 +1,43 @@
+import hashlib
+import sqlite3
+from scripts.init_school_db import init_db
+
+def _digest(path):
+    conn = sqlite3.connect(path)
+    digest = hashlib.sha256()
+    for (table,) in conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%' ORDER BY name"):
+        for row in conn.execute(f"SELECT * FROM {table} ORDER BY rowid"):
+            digest.update(repr(row).encode())
+    conn.close()
+    return digest.hexdigest()
+
+def test_scale_sets_row_counts(tmp_path):
+    path = str(tmp_path / "scaled.db")
+    loaded = init_db(path, scale=0.2, days=10, terms=2)
+    conn = sqlite3.connect(path)
+    students = conn.execute("SELECT COUNT(*) FROM students").fetchone()[0]
+    assert students == 100
+    assert conn.execute("SELECT COUNT(*) FROM attendance").fetchone()[0] == students * 10
+    enrollments = conn.execute("SELECT COUNT(*) FROM enrollments").fetchone()[0]
+    assert conn.execute("SELECT COUNT(*) FROM report_cards").fetchone()[0] == enrollments * 2
+    assert loaded["attendance"] == students * 10
+    # Every reference points at an existing row
+    assert conn.execute("SELECT COUNT(*) FROM students s LEFT JOIN users u ON u.id = s.user_id WHERE u.role IS NOT 'student'").fetchone()[0] == 0
+    assert conn.execute("SELECT COUNT(*) FROM enrollments e LEFT JOIN courses c ON c.id = e.course_id WHERE c.id IS NULL").fetchone()[0] == 0
+    assert conn.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+    assert conn.execute("SELECT COUNT(*) FROM sqlite_stat1").fetchone()[0] > 0
+
+def test_same_seed_same_data_whatever_the_workers(tmp_path):
+    single, parallel, other_seed = (str(tmp_path / name) for name in ("single.db", "parallel.db", "other.db"))
+    init_db(single, scale=0.5, days=5, workers=1, partition_students=60)
+    init_db(parallel, scale=0.5, days=5, workers=2, partition_students=60)
+    init_db(other_seed, scale=0.5, days=5, seed=7, partition_students=60)
+    assert _digest(single) == _digest(parallel)
+    assert _digest(single) != _digest(other_seed)
+
+def test_replaces_an_existing_database(tmp_path):
+    path = str(tmp_path / "school.db")
+    init_db(path, scale=0.1, days=1)
+    init_db(path, scale=0.2, days=1)
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT COUNT(*) FROM students").fetchone()[0] == 100
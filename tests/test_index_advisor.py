@@ -0,0 +1,95 @@
+import sqlite3
+import pytest
+from src.retrieval.connection_pool import ConnectionPool
+from src.retrieval.db_client import DBClient
+from src.retrieval.index_advisor import IndexAdvisor
+from src.retrieval.workload_log import WorkloadLog, query_shape
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "advisor.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE students (user_id INTEGER PRIMARY KEY, grade_level INTEGER)")
+    conn.execute("CREATE TABLE attendance (id INTEGER PRIMARY KEY, student_id INTEGER, date TEXT, status TEXT, "
+                 "FOREIGN KEY (student_id) REFERENCES students(user_id))")
+    conn.executemany("INSERT INTO students (grade_level) VALUES (?)", [(9 + i % 4,) for i in range(100)])
+    conn.executemany("INSERT INTO attendance (student_id, date, status) VALUES (?, ?, ?)",
+                     [(i % 100 + 1, f"2024-01-{i % 28 + 1:02d}", "Present") for i in range(5000)])
+    conn.commit()
+    conn.close()
+    return path
+
+def test_workload_groups_queries_by_shape(tmp_path):
+    log = WorkloadLog(str(tmp_path / "w.json"), flush_interval=0)
+    log.record("SELECT * FROM attendance WHERE student_id = 3", 2.0)
+    log.wait()
+    log.record("select *  from attendance where student_id = 4;", 3.0)
+    log.wait()
+    assert query_shape("SELECT 'x', 10") == "select ?, ?"
+    [entry] = WorkloadLog(str(tmp_path / "w.json")).entries()
+    assert entry["count"] == 2 and entry["total_ms"] == 5.0
+
+def test_workload_keeps_no_literal_values_unless_asked(tmp_path):
+    path = str(tmp_path / "w.json")
+    log = WorkloadLog(path, flush_interval=3600)
+    log.record("SELECT * FROM users WHERE name = 'Alice Smith' AND id = 42", 1.0)
+    log.record("SELECT * FROM users WHERE name = ?", 1.0, ("Bob Jones",))
+    # Recording never writes the file itself; that is left to the periodic flush
+    assert not (tmp_path / "w.json").exists()
+    log.save()
+    text = (tmp_path / "w.json").read_text()
+    assert "Alice" not in text and "id = 42" not in text and "Bob" not in text
+    assert [e["sql"] for e in log.entries()] == ["select * from users where name = ? and id = ?", "select * from users where name = ?"]
+    assert all("params" not in e for e in log.entries())
+
+    kept = WorkloadLog(record_values=True)
+    kept.record("SELECT * FROM users WHERE name = ?", 1.0, ("Bob Jones",))
+    [entry] = kept.entries()
+    assert entry["sql"] == "SELECT * FROM users WHERE name = ?" and entry["params"] == ("Bob Jones",)
+
+    # A file written with values is redacted when read without the opt-in
+    kept.path = path
+    kept.save()
+    [entry] = WorkloadLog(path).entries()
+    assert entry["sql"] == entry["shape"] and "params" not in entry
+
+def test_executed_queries_are_recorded(db_path):
+    client = DBClient(db_path, pool=ConnectionPool(db_path), workload=WorkloadLog())
+    client.execute("SELECT COUNT(*) FROM students")
+    client.execute("SELECT nope FROM students")
+    assert [e["shape"] for e in client.workload.entries()] == ["select count(*) from students"]
+
+def test_recommends_fk_index_for_join_with_before_and_after_plans(db_path):
+    log = WorkloadLog()
+    for _ in range(3):
+        log.record("SELECT a.* FROM attendance a JOIN students s ON s.user_id = a.student_id WHERE s.grade_level = 10", 20.0)
+    log.record("SELECT * FROM students", 1.0)
+
+    [rec] = IndexAdvisor(db_path, workload=log).recommend()
+    assert (rec["table"], rec["columns"], rec["kind"]) == ("attendance", ["student_id"], "fk")
+    assert rec["executions"] == 3
+    plan = rec["plans"][0]
+    assert plan["before"][0] == "SCAN a"
+    assert any("idx_attendance_student_id" in step for step in plan["after"])
+    assert plan["estimated_rows_after"] < plan["estimated_rows_before"]
+
+def test_covering_index_and_apply(db_path):
+    log = WorkloadLog()
+    log.record("SELECT date FROM attendance WHERE student_id = 7", 5.0)
+    advisor = IndexAdvisor(db_path, workload=log)
+    [rec] = advisor.recommend()
+    assert rec["kind"] == "covering" and rec["columns"] == ["student_id", "date"]
+
+    advisor.apply([rec])
+    conn = sqlite3.connect(db_path)
+    plan = conn.execute("EXPLAIN QUERY PLAN SELECT date FROM attendance WHERE student_id = 7").fetchall()
+    conn.close()
+    assert "COVERING INDEX idx_attendance_student_id_date" in plan[0][3]
+    # Nothing left to recommend once the index exists
+    assert advisor.recommend() == []
+
+def test_parameterized_queries_are_explained_with_their_values(db_path):
+    log = WorkloadLog(record_values=True)
+    log.record("SELECT date FROM attendance WHERE student_id = ?", 5.0, (7,))
+    [rec] = IndexAdvisor(db_path, workload=log).recommend()
+    assert rec["columns"] == ["student_id", "date"]
@@ -1,7 +1,7 @@
 import pytest
-from unittest.mock import MagicMock, patch
+from unittest.mock import MagicMock, AsyncMock, patch
 from fastapi.testclient import TestClient
-from src.gateway.main import app
+from src.gateway.main import app, get_orchestrator
 from src.gateway.models import ResponseType
 
 client = TestClient(app)
@@ -40,3 +40,12 @@ def test_ask_endpoint_success():
     """Generic successful endpoint test."""
     response = client.post("/api/v1/ask", json={"query": "test"})
     assert response.status_code == 200
+
+def test_empty_result_says_no_records_found():
+    """An empty result keeps the original wording."""
+    model = MagicMock()
+    model.ainvoke = AsyncMock(return_value=MagicMock(content="SELECT name FROM departments WHERE 1 = 0"))
+    with patch.object(get_orchestrator().intent_agent, "models", [model]):
+        response = client.post("/api/v1/ask", json={"query": "departments that were never created"})
+    assert response.status_code == 200
+    assert response.json()["answer"].endswith("**Results:**\nNo records found.")
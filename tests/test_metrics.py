@@ -0,0 +1,52 @@
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from fastapi.testclient import TestClient
+from src.gateway.main import app, get_orchestrator
+from src.telemetry.metrics import MetricsRegistry
+
+def test_histogram_buckets_are_cumulative():
+    registry = MetricsRegistry(prefix="t")
+    for value in (0.002, 0.02, 0.2, 60):
+        registry.observe("latency_seconds", value, stage="a")
+    text = registry.render()
+    assert 't_latency_seconds_bucket{stage="a",le="0.005"} 1' in text
+    assert 't_latency_seconds_bucket{stage="a",le="0.25"} 3' in text
+    assert 't_latency_seconds_bucket{stage="a",le="+Inf"} 4' in text
+    assert 't_latency_seconds_count{stage="a"} 4' in text
+
+def test_counters_and_gauges():
+    registry = MetricsRegistry(prefix="t")
+    registry.inc("tokens_total", 10, model="m1", kind="input")
+    registry.inc("tokens_total", 5, model="m1", kind="input")
+    text = registry.render({"cache": {"hit_rate": 0.25, "state": "open"}, "llm": {"models": {"gpt-4o": {"calls": 3}}}}, label_keys={"models": "model"})
+    assert "# TYPE t_tokens_total counter" in text
+    assert 't_tokens_total{kind="input",model="m1"} 15' in text
+    assert "t_cache_hit_rate 0.25" in text
+    assert 't_llm_calls{model="gpt-4o"} 3' in text
+    assert "state" not in text
+
+def test_ask_reports_timings_and_metrics():
+    mock_res = MagicMock()
+    mock_res.content = "SELECT name FROM departments"
+    mock_res.usage_metadata = {"input_tokens": 120, "output_tokens": 8, "total_tokens": 128}
+    fake_model = MagicMock()
+    fake_model.model_name = "fake-model"
+    fake_model.ainvoke = AsyncMock(return_value=mock_res)
+    client = TestClient(app)
+    with patch.object(get_orchestrator().intent_agent, "models", [fake_model]):
+        response = client.post("/api/v1/ask", json={"query": "department names with timings", "include_timings": True})
+
+    timings = response.json()["timings"]
+    assert list(timings) == ["match_template", "fetch_schema", "resolve_intent", "enforce_policy", "plan_query", "execute_sql", "summarize"]
+    assert all(ms >= 0 for ms in timings.values())
+
+    text = client.get("/metrics").text
+    assert 'sutradhara_stage_seconds_count{stage="execute_sql"}' in text
+    assert 'sutradhara_llm_tokens_total{kind="input",model="fake-model"}' in text
+    assert 'sutradhara_db_query_seconds_count{dialect="sqlite"}' in text
+    assert "sutradhara_question_cache_hit_rate" in text
+    assert 'sutradhara_http_request_seconds_count{path="/api/v1/ask",status="200"}' in text
+
+def test_timings_are_omitted_unless_requested():
+    response = TestClient(app).post("/api/v1/ask", json={"query": "list departments please"})
+    assert response.json()["timings"] is None
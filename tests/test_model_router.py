@@ -0,0 +1,133 @@
+import asyncio
+import gc
+import pytest
+from src.agents.intent_agent import IntentResolutionAgent
+from src.agents.model_router import ModelRouter
+
+class FakeResponse:
+    def __init__(self, content):
+        self.content = content
+
+class FakeChatModel:
+    """Chat model double: answers `reply` after `delay` seconds, or raises `error`."""
+    def __init__(self, model_name, reply="SELECT 1", delay=0.0, error=None):
+        self.model_name = model_name
+        self.reply = reply
+        self.delay = delay
+        self.error = error
+        self.calls = 0
+        self.cancelled = 0
+
+    async def ainvoke(self, messages):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if self.error:
+            raise self.error
+        return FakeResponse(self.reply)
+
+def make_agent(*models, **router_options):
+    agent = IntentResolutionAgent(router=ModelRouter(**router_options))
+    agent.models = list(models)
+    return agent
+
+@pytest.mark.asyncio
+async def test_slow_primary_is_hedged_with_the_backup():
+    primary = FakeChatModel("primary", "SELECT 'slow'", delay=1.0)
+    backup = FakeChatModel("backup", "SELECT 'fast'", delay=0.01)
+    agent = make_agent(primary, backup, default_hedge_delay=0.05)
+
+    assert await agent.resolve("q", "schema") == {"sql": "SELECT 'fast'"}
+    await asyncio.sleep(0)  # let the losing call process its cancellation
+    assert primary.cancelled == 1
+    assert agent.router.metrics()["hedges"] == 1 and agent.router.metrics()["hedge_wins"] == 1
+
+@pytest.mark.asyncio
+async def test_fast_primary_is_not_hedged():
+    primary = FakeChatModel("primary", delay=0.0)
+    backup = FakeChatModel("backup")
+    agent = make_agent(primary, backup, default_hedge_delay=0.5)
+    await agent.resolve("q", "schema")
+    assert backup.calls == 0
+
+@pytest.mark.asyncio
+async def test_hedge_delay_follows_observed_p95():
+    router = ModelRouter(default_hedge_delay=5.0, min_samples=5)
+    model = FakeChatModel("primary")
+    health = router.health(model)
+    for latency in [0.1, 0.1, 0.1, 0.2, 0.4]:
+        health.record_success(latency)
+    assert router.hedge_delay(model) == 0.4
+    assert 0.1 < health.ewma_latency < 0.4
+
+@pytest.mark.asyncio
+async def test_failure_falls_through_and_opens_the_breaker():
+    broken = FakeChatModel("broken", error=RuntimeError("503"))
+    backup = FakeChatModel("backup", "SELECT 'ok'")
+    agent = make_agent(broken, backup, failure_threshold=2, open_seconds=60)
+
+    for _ in range(3):
+        assert await agent.resolve("q", "schema") == {"sql": "SELECT 'ok'"}
+    # Third request skipped the open breaker entirely
+    assert broken.calls == 2
+    stats = agent.router.metrics()["models"]["broken"]
+    assert stats["state"] == "open" and stats["failures"] == 2
+
+@pytest.mark.asyncio
+async def test_half_open_trial_closes_the_breaker():
+    flaky = FakeChatModel("flaky", error=RuntimeError("503"))
+    agent = make_agent(flaky, failure_threshold=1, open_seconds=0.01)
+    assert "error" in await agent.resolve("q", "schema")
+    assert agent.router.health(flaky).state == "open"
+
+    await asyncio.sleep(0.02)
+    flaky.error = None
+    assert await agent.resolve("q", "schema") == {"sql": "SELECT 1"}
+    assert agent.router.health(flaky).state == "closed"
+
+@pytest.mark.asyncio
+async def test_all_breakers_open_still_tries_and_reports_error():
+    down = FakeChatModel("down", error=RuntimeError("timeout"))
+    agent = make_agent(down, failure_threshold=1, open_seconds=60)
+    await agent.resolve("q", "schema")
+    result = await agent.resolve("q", "schema")
+    assert result == {"error": "Internal Model Error: timeout"}
+    assert down.calls == 2 and agent.router.metrics()["all_open"] == 1
+
+@pytest.mark.asyncio
+async def test_no_call_outlives_invoke_and_every_failure_is_retrieved():
+    loop = asyncio.get_running_loop()
+    unhandled = []
+    loop.set_exception_handler(lambda loop, context: unhandled.append(context))
+    release = asyncio.Event()
+
+    async def call(model):
+        await release.wait()
+        if model.error:
+            raise model.error
+        return model.reply
+
+    failing = FakeChatModel("failing", error=RuntimeError("boom"))
+    winning = FakeChatModel("winning", "SELECT 'ok'")
+    slow = FakeChatModel("slow", delay=10.0)
+    router = ModelRouter(default_hedge_delay=0.01, min_hedge_delay=0.01)
+
+    async def release_later():
+        # Both hedged calls are in flight by now; they finish in the same loop iteration
+        await asyncio.sleep(0.1)
+        release.set()
+
+    releaser = asyncio.ensure_future(release_later())
+    assert await router.invoke([failing, winning], call) == "SELECT 'ok'"
+    await releaser
+
+    assert await router.invoke([slow, winning], lambda m: m.ainvoke([])) is not None
+    assert asyncio.all_tasks() == {asyncio.current_task()}
+    assert slow.cancelled == 1
+
+    gc.collect()
+    assert unhandled == []
+    assert router.health(failing).failures == 1
@@ -0,0 +1,108 @@
+import sqlite3
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from src.agents.query_lifecycle import QueryLifecycleAgent
+from src.retrieval.column_stats import ColumnStatsCatalog
+from src.retrieval.connection_pool import ConnectionPool
+from src.retrieval.query_planner import QueryCostGuard
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "planner.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE students (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.execute("CREATE TABLE attendance (id INTEGER PRIMARY KEY, student_id INTEGER, status TEXT)")
+    conn.executemany("INSERT INTO students (name) VALUES (?)", [(f"S{i}",) for i in range(50)])
+    conn.executemany("INSERT INTO attendance (student_id, status) VALUES (?, ?)",
+                     [(i % 50 + 1, "Present") for i in range(2000)])
+    conn.commit()
+    conn.close()
+    return path
+
+def make_guard(db_path, **kwargs):
+    stats = ColumnStatsCatalog(db_path, path=f"{db_path}.stats.json")
+    return QueryCostGuard(db_path, pool=ConnectionPool(db_path), stats=stats, **kwargs)
+
+def test_small_queries_run_unchanged(db_path):
+    guard = make_guard(db_path)
+    plan = guard.check("SELECT * FROM attendance")
+    assert plan["action"] == "allow" and plan["sql"] == "SELECT * FROM attendance"
+    assert plan["findings"][0] == {"kind": "full_scan", "table": "attendance", "rows": 2000, "index": False}
+
+def test_large_scan_gets_a_limit(db_path):
+    guard = make_guard(db_path, large_table_rows=1000, limit_rows=100)
+    plan = guard.check("SELECT a.status FROM attendance AS a ORDER BY a.status;")
+    assert plan["action"] == "limit"
+    assert plan["sql"] == "SELECT a.status FROM attendance AS a ORDER BY a.status\nLIMIT 100"
+    assert {"kind": "temp_btree", "purpose": "ORDER BY"} in plan["findings"]
+
+    # Aggregates and already-limited queries return few rows anyway
+    assert guard.check("SELECT status, COUNT(*) FROM attendance GROUP BY status")["action"] == "allow"
+    assert guard.check("SELECT * FROM attendance LIMIT 10")["action"] == "allow"
+
+def test_existing_limit_above_the_cap_is_lowered_in_place(db_path):
+    guard = make_guard(db_path, large_table_rows=1000, limit_rows=100)
+    plan = guard.check("SELECT * FROM attendance LIMIT 500;")
+    assert plan["action"] == "limit" and plan["sql"] == "SELECT * FROM attendance LIMIT 100"
+    assert guard.check("SELECT * FROM attendance LIMIT 500 OFFSET 20")["sql"] == "SELECT * FROM attendance LIMIT 100 OFFSET 20"
+    # SQLite's "LIMIT offset, count" form
+    assert guard.check("SELECT * FROM attendance LIMIT 20, 500")["sql"] == "SELECT * FROM attendance LIMIT 100 OFFSET 20"
+    assert guard.check("SELECT * FROM attendance LIMIT 20, 50")["action"] == "allow"
+
+    conn = sqlite3.connect(db_path)
+    assert len(conn.execute(plan["sql"]).fetchall()) == 100
+    conn.close()
+
+def test_parameterized_limit_is_honoured_or_wrapped(db_path):
+    guard = make_guard(db_path, large_table_rows=1000, limit_rows=100)
+    sql = "SELECT * FROM attendance WHERE status = ? LIMIT ?"
+    assert guard.check(sql, ("Present", 50))["action"] == "allow"
+    assert guard.check("SELECT * FROM attendance WHERE status = :s LIMIT :n", {"s": "Present", "n": 50})["action"] == "allow"
+    assert guard.check("SELECT * FROM attendance LIMIT ? OFFSET ?", (50, 10))["action"] == "allow"
+
+    # A bind value above the cap (or one that can't be read) is capped by wrapping, never by a second LIMIT
+    plan = guard.check(sql, ("Present", 500))
+    assert plan["action"] == "limit"
+    assert plan["sql"] == "SELECT * FROM (\nSELECT * FROM attendance WHERE status = ? LIMIT ?\n) LIMIT 100"
+    conn = sqlite3.connect(db_path)
+    assert len(conn.execute(plan["sql"], ("Present", 500)).fetchall()) == 100
+    conn.close()
+    assert guard.limit("SELECT * FROM attendance LIMIT %s") == "SELECT * FROM (\nSELECT * FROM attendance LIMIT %s\n) LIMIT 100"
+
+def test_missing_join_predicate_asks_for_clarification(db_path):
+    guard = make_guard(db_path, large_table_rows=1000)
+    plan = guard.check("SELECT * FROM students s, attendance a")
+    assert plan["action"] == "clarify"
+    assert {"kind": "cartesian", "tables": ["students", "attendance"], "rows": 100000} in plan["findings"]
+
+    joined = guard.check("SELECT * FROM students s JOIN attendance a ON a.student_id = s.id WHERE s.id = 3")
+    assert joined["action"] != "clarify"
+
+def test_expensive_queries_are_rejected(db_path):
+    guard = make_guard(db_path, max_cost=50_000)
+    plan = guard.check("SELECT * FROM students, attendance")
+    assert plan["action"] == "reject"
+    assert plan["message"].startswith("Query rejected by cost guard")
+
+def test_invalid_sql_is_left_to_the_executor(db_path):
+    plan = make_guard(db_path).check("SELECT nope FROM attendance")
+    assert plan["action"] == "allow" and "no such column" in plan["error"]
+
+@pytest.mark.asyncio
+async def test_lifecycle_limits_and_rejects_before_execution():
+    orchestrator = QueryLifecycleAgent()
+    orchestrator.cost_guard.large_table_rows = 100
+    orchestrator.cost_guard.limit_rows = 5
+    response = MagicMock()
+    response.content = "SELECT * FROM attendance"
+    model = MagicMock()
+    model.ainvoke = AsyncMock(return_value=response)
+    orchestrator.intent_agent.models = [model]
+
+    result = await orchestrator.run("Show attendance")
+    assert result["plan"]["action"] == "limit"
+    assert result["sql"].endswith("LIMIT 5") and result["data"].row_count == 5
+
+    orchestrator.cost_guard.max_cost = 10
+    result = await orchestrator.run("Show every attendance record")
+    assert result["plan"]["action"] == "reject" and result["data"].error.startswith("Query rejected")
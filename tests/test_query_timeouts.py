@@ -0,0 +1,74 @@
+import asyncio
+import sqlite3
+import time
+import pytest
+from src.retrieval.connection_pool import ConnectionPool
+from src.retrieval.db_client import DBClient, QueryBudget
+from src.gateway.main import run_cancellable
+
+RUNAWAY_SQL = "WITH RECURSIVE c(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM c) SELECT COUNT(*) FROM c"
+
+@pytest.fixture
+def client(tmp_path):
+    path = str(tmp_path / "timeouts.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE attendance (id INTEGER PRIMARY KEY, status TEXT)")
+    conn.commit()
+    conn.close()
+    return DBClient(path, pool=ConnectionPool(path), query_timeout=0.2)
+
+def test_runaway_query_hits_timeout(client):
+    started = time.monotonic()
+    result = client.execute(RUNAWAY_SQL)
+    assert time.monotonic() - started < 2
+    assert result[0]["aborted"]["reason"] == "timeout"
+    assert result[0]["aborted"]["budget_ms"] == 200.0
+    assert result[0]["error"].startswith("Query aborted")
+    # The connection went back to the pool without its progress handler
+    assert client.execute("SELECT COUNT(*) AS n FROM attendance") == [{"n": 0}]
+
+def test_request_deadline_is_reported_separately(client):
+    result = client.execute(RUNAWAY_SQL, QueryBudget(timeout=5, deadline=time.monotonic() + 0.1))
+    assert result[0]["aborted"]["reason"] == "deadline"
+
+    expired = QueryBudget(deadline=time.monotonic() - 1)
+    assert client.execute("SELECT 1", expired)[0]["aborted"]["reason"] == "deadline"
+
+@pytest.mark.asyncio
+async def test_cancelling_aexecute_interrupts_the_statement(client):
+    client.query_timeout = None
+    task = asyncio.create_task(client.aexecute(RUNAWAY_SQL))
+    await asyncio.sleep(0.1)
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+    for _ in range(100):
+        if client.executor.metrics()["running"] == 0:
+            break
+        await asyncio.sleep(0.01)
+    assert client.executor.metrics()["running"] == 0
+    assert client.pool.metrics()["in_use"] == 0
+
+@pytest.mark.asyncio
+async def test_run_cancellable_stops_on_disconnect():
+    class DisconnectedRequest:
+        async def is_disconnected(self):
+            return True
+
+    cancelled = False
+
+    async def slow():
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    result, reason = await run_cancellable(slow(), DisconnectedRequest())
+    assert result is None and reason == "client_disconnected"
+    assert cancelled
+
+    result, reason = await run_cancellable(asyncio.sleep(10), DisconnectedRequest(), deadline=time.monotonic())
+    assert reason == "deadline"
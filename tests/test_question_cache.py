@@ -0,0 +1,87 @@
+import pytest
+from unittest.mock import MagicMock, AsyncMock
+from src.agents.question_cache import QuestionCache, make_scope, normalize_question, literal_signature, content_key
+from src.agents.query_lifecycle import QueryLifecycleAgent
+
+SCOPE = make_scope((1, 2), {"role": "teacher"})
+
+def test_normalization_and_literals():
+    assert normalize_question("  Average grade, per COURSE? ") == "average grade per course"
+    assert normalize_question("Students with score>=90!") == "students with score >= 90"
+    assert literal_signature("List students in grade 10") == ("10",)
+    assert literal_signature("Attendance for Alice Smith") == ("alice", "smith")
+    assert content_key("show me all the students not in grade 5") == ("students", "not", "in", "grade", "5")
+
+def test_exact_and_near_duplicate_hits():
+    cache = QuestionCache()
+    cache.put("What is the average grade per course?", SCOPE, {"sql": "SELECT 1"})
+    assert cache.get("what is the average grade per course", SCOPE) == {"sql": "SELECT 1"}
+    assert cache.get("Show me the average grade per course", SCOPE) == {"sql": "SELECT 1"}
+    # A typo is a different question as far as the cache is concerned
+    assert cache.get("What is the avrage grade per course?", SCOPE) is None
+    assert cache.get("Which teachers teach physics?", SCOPE) is None
+    metrics = cache.metrics()
+    assert (metrics["exact_hits"], metrics["near_hits"], metrics["misses"]) == (1, 1, 2)
+
+    exact_only = QuestionCache(near_matching=False)
+    exact_only.put("What is the average grade per course?", SCOPE, {"sql": "SELECT 1"})
+    assert exact_only.get("Show me the average grade per course", SCOPE) is None
+
+@pytest.mark.parametrize("cached, asked", [
+    ("How many students were present in grade 5 today?", "How many students were absent in grade 5 today?"),
+    ("Which student has the highest average grade?", "Which student has the lowest average grade?"),
+    ("List teachers not in the science department", "List teachers in the science department"),
+    ("Sort students by grade ascending", "Sort students by grade descending"),
+    ("Show fee payments per month", "Show fee payments per week"),
+])
+def test_questions_that_differ_in_meaning_never_match(cached, asked):
+    cache = QuestionCache()
+    cache.put(cached, SCOPE, {"sql": "SELECT 1"})
+    assert cache.get(asked, SCOPE) is None
+    assert cache.metrics()["near_hits"] == 0
+
+def test_different_literals_or_scope_never_match():
+    cache = QuestionCache()
+    cache.put("List students in grade 10", SCOPE, {"sql": "SELECT 10"})
+    assert cache.get("List students in grade 11", SCOPE) is None
+    assert cache.get("List students in grade 10", make_scope((1, 3), {"role": "teacher"})) is None
+    assert cache.get("List students in grade 10", make_scope((1, 2), {"role": "parent"})) is None
+
+def test_errors_are_not_cached_and_size_is_bounded():
+    cache = QuestionCache(max_entries=2)
+    cache.put("broken question", SCOPE, {"error": "timeout"})
+    assert cache.get("broken question", SCOPE) is None
+    for q in ("first question", "second question", "third question"):
+        cache.put(q, SCOPE, {"sql": q})
+    assert cache.metrics()["entries"] == 2
+    assert cache.metrics()["evictions"] == 1
+    assert cache.get("first question", SCOPE) is None
+
+@pytest.mark.asyncio
+async def test_lifecycle_skips_llm_on_repeat_question():
+    orchestrator = QueryLifecycleAgent()
+    response = MagicMock()
+    response.content = "SELECT name FROM departments"
+    model = MagicMock()
+    model.ainvoke = AsyncMock(return_value=response)
+    orchestrator.intent_agent.models = [model]
+
+    first = await orchestrator.run("List all departments")
+    second = await orchestrator.run("list all departments?")
+    assert model.ainvoke.await_count == 1
+    assert first["answer"] == second["answer"]
+
+@pytest.mark.parametrize("asked", [
+    "students with score < 90",
+    "students with score >= 90",
+    "students with score = 90",
+    "students with score != 90",
+    "students with balance -90",
+    "students with score 90%",
+])
+def test_questions_that_differ_only_by_an_operator_miss(asked):
+    cache = QuestionCache()
+    cache.put("students with score > 90", SCOPE, {"sql": "SELECT 1"})
+    assert normalize_question(asked) != normalize_question("students with score > 90")
+    assert cache.get(asked, SCOPE) is None
+    assert cache.get("Students with score >90?", SCOPE) == {"sql": "SELECT 1"}
@@ -0,0 +1,63 @@
+import csv
+import io
+import json
+import pytest
+from unittest.mock import patch
+from src.retrieval.rendering import render, make_writer, MarkdownWriter
+from src.retrieval.result_set import ResultSet
+
+@pytest.fixture
+def result():
+    return ResultSet(["id", "name"], [(i, f"student {i}") for i in range(1, 6)])
+
+def test_markdown_table(result):
+    rendering = render(result)
+    lines = rendering.text.splitlines()
+    assert lines[:3] == ["| id | name |", "| --- | --- |", "| 1 | student 1 |"]
+    assert len(lines) == 7
+    assert not rendering.truncated and rendering.summary is None
+
+def test_markdown_escapes_cells():
+    rendering = render(ResultSet(["note"], [("a | b\nc",), (None,)]))
+    assert rendering.text.splitlines()[2:] == ["| a \\| b c |", "|  |"]
+
+def test_row_cap_truncates_with_summary(result):
+    rendering = render(result, "markdown", max_rows=2)
+    assert rendering.rows_rendered == 2
+    assert rendering.total_rows == 5
+    assert rendering.truncated
+    assert rendering.summary == "Showing the first 2 of 5 rows."
+
+def test_byte_cap(result):
+    rendering = render(result, "csv", max_bytes=40)
+    assert len(rendering.text.encode()) <= 40
+    assert rendering.truncated and rendering.rows_rendered < 5
+
+def test_json_and_columns_formats(result):
+    data = json.loads(render(result, "json", max_rows=3).text)
+    assert data == {"columns": ["id", "name"], "rows": [[1, "student 1"], [2, "student 2"], [3, "student 3"]], "row_count": 5, "truncated": True}
+
+    data = json.loads(render(result, "columns").text)
+    assert data["columns"]["id"] == [1, 2, 3, 4, 5]
+    assert data["row_count"] == 5 and data["truncated"] is False
+
+def test_csv_quotes_values():
+    text = render(ResultSet(["a", "b"], [("x,y", 'say "hi"')]), "csv").text
+    assert list(csv.reader(io.StringIO(text))) == [["a", "b"], ["x,y", 'say "hi"']]
+
+def test_incremental_writer_matches_render(result):
+    writer = make_writer("json", result.columns, max_rows=4)
+    text = writer.open() + writer.write(result.rows[:2]) + writer.write(result.rows[2:]) + writer.close()
+    assert text == render(result, "json", max_rows=4).text
+    assert writer.summary() == "Showing the first 4 of 5 rows."
+
+def test_rendering_cost_does_not_grow_with_result_size():
+    big = ResultSet(["n"], [(1,)] * 1_000_000)
+    with patch.object(MarkdownWriter, "_row", autospec=True, side_effect=lambda self, row: "| 1 |\n") as format_row:
+        rendering = render(big, max_rows=100)
+    assert format_row.call_count == 100
+    assert rendering.total_rows == 1_000_000
+
+def test_unknown_format(result):
+    with pytest.raises(ValueError):
+        render(result, "xml")
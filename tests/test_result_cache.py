@@ -0,0 +1,74 @@
+import sqlite3
+import time
+import pytest
+from src.retrieval.connection_pool import ConnectionPool
+from src.retrieval.db_client import DBClient
+from src.retrieval.result_cache import ResultCache, normalize_sql, is_cacheable
+from src.retrieval.result_set import ResultSet
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "cache.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE report_cards (id INTEGER PRIMARY KEY, course_id INTEGER, grade REAL)")
+    conn.executemany("INSERT INTO report_cards (course_id, grade) VALUES (?, ?)", [(1, 80.0), (1, 90.0), (2, 70.0)])
+    conn.commit()
+    conn.close()
+    return path
+
+def test_normalize_sql_keeps_literals():
+    assert normalize_sql("SELECT  *\n FROM Attendance WHERE status = 'Present' ;") == \
+        "select * from attendance where status = 'Present'"
+    assert not is_cacheable("SELECT * FROM exams WHERE exam_date > date('now')")
+    assert not is_cacheable("SELECT random()")
+
+def test_repeated_query_is_served_from_cache(db_path):
+    client = DBClient(db_path, pool=ConnectionPool(db_path))
+    sql = "SELECT course_id, AVG(grade) AS avg_grade FROM report_cards GROUP BY course_id"
+    first = client.execute(sql)
+    second = client.execute(sql.lower() + ";")
+    assert second is first
+    metrics = client.metrics()["result_cache"]
+    assert metrics["hits"] == 1 and metrics["misses"] == 1
+
+def test_write_invalidates_cached_results(db_path):
+    client = DBClient(db_path, pool=ConnectionPool(db_path))
+    sql = "SELECT COUNT(*) AS n FROM report_cards"
+    assert client.execute(sql) == [{"n": 3}]
+
+    writer = sqlite3.connect(db_path)
+    writer.execute("INSERT INTO report_cards (course_id, grade) VALUES (3, 60.0)")
+    writer.commit()
+    writer.close()
+
+    assert client.execute(sql) == [{"n": 4}]
+
+def test_errors_and_disabled_cache_are_not_stored(db_path):
+    client = DBClient(db_path, pool=ConnectionPool(db_path))
+    client.execute("SELECT nope FROM report_cards")
+    assert client.cache.metrics()["entries"] == 0
+    assert DBClient(db_path, cache=False).cache is None
+
+@pytest.mark.asyncio
+async def test_aexecute_hits_cache_without_thread_hop(db_path):
+    client = DBClient(db_path, pool=ConnectionPool(db_path))
+    await client.aexecute("SELECT * FROM report_cards")
+    await client.aexecute("SELECT * FROM report_cards")
+    assert client.executor.metrics()["submitted"] == 1
+    assert client.cache.metrics()["hits"] == 1
+
+def test_lru_eviction_under_byte_budget_and_ttl():
+    result = ResultSet(["v"], [(i,) for i in range(100)])
+    cache = ResultCache(max_bytes=12000, max_entry_bytes=12000)
+    for key in ("a", "b", "c"):
+        cache.put(key, result)
+    assert cache.get("a") is None
+    assert cache.get("c") is result
+    assert cache.metrics()["evictions"] >= 1
+    assert cache.metrics()["bytes"] <= 12000
+
+    short_lived = ResultCache(ttl=0.01)
+    short_lived.put("k", result)
+    time.sleep(0.02)
+    assert short_lived.get("k") is None
+    assert short_lived.metrics()["expirations"] == 1
@@ -0,0 +1,37 @@
+import pytest
+from src.retrieval.result_set import ResultSet
+
+@pytest.fixture
+def result():
+    return ResultSet(["name", "grade"], [("Alice", 91.5), ("Bob", None), ("Cara", 78.0)])
+
+def test_row_views_behave_like_dicts(result):
+    assert result[0]["name"] == "Alice"
+    assert dict(result[1]) == {"name": "Bob", "grade": None}
+    assert list(result[2].keys()) == ["name", "grade"]
+    assert result[2].values() == ["Cara", 78.0]
+    assert "grade" in result[0] and "error" not in result[0]
+    assert result == [{"name": "Alice", "grade": 91.5}, {"name": "Bob", "grade": None}, {"name": "Cara", "grade": 78.0}]
+
+def test_columnar_access_and_metadata(result):
+    assert result.row_count == len(result) == 3
+    assert result.column("grade") == [91.5, None, 78.0]
+    assert result.types == ("str", "float")
+    assert result[:1].rows == [("Alice", 91.5)]
+    assert result.error is None and result.aborted is None
+    with pytest.raises(KeyError):
+        result[0]["missing"]
+
+def test_failed_result_keeps_error_row_shape():
+    failed = ResultSet.failed({"error": "Query aborted: timeout", "aborted": {"reason": "timeout"}})
+    assert failed
+    assert failed.error == "Query aborted: timeout"
+    assert failed.aborted == {"reason": "timeout"}
+    assert "error" in failed[0]
+
+def test_from_dicts_round_trip():
+    rows = [{"id": 1, "status": "Present"}, {"id": 2, "status": "Late"}]
+    result = ResultSet.from_dicts(rows)
+    assert result.rows == [(1, "Present"), (2, "Late")]
+    assert result.as_dicts() == rows
+    assert not ResultSet.from_dicts([])
@@ -0,0 +1,43 @@
+import pytest
+from src.retrieval.schema_index import SchemaIndex, tokenize
+
+def _table(columns, fks=(), samples=None):
+    samples = samples or {}
+    return {
+        "columns": [{"name": c, "type": "TEXT", "samples": samples.get(c, [])} for c in columns],
+        "foreign_keys": [{"from": f, "table": t, "to": to} for f, t, to in fks],
+    }
+
+@pytest.fixture
+def index():
+    schema = {
+        "users": _table(["id", "name", "role"], samples={"role": ["student", "teacher"]}),
+        "students": _table(["user_id", "grade_level"], [("user_id", "users", "id")]),
+        "courses": _table(["id", "name", "teacher_id"]),
+        "report_cards": _table(["id", "student_id", "course_id", "grade"],
+                               [("student_id", "students", "user_id"), ("course_id", "courses", "id")]),
+        "library_books": _table(["id", "title", "category"], samples={"category": ["Science", "Fiction"]}),
+        "fee_payments": _table(["id", "student_id", "amount"], [("student_id", "students", "user_id")]),
+    }
+    return SchemaIndex(schema)
+
+def test_tokenize_splits_identifiers_and_plurals():
+    assert tokenize("report_cards") == ["report", "card"]
+    assert tokenize("Which categories were borrowed?") == ["which", "category", "were", "borrow"]
+
+def test_select_ranks_relevant_tables(index):
+    selected = index.select("average grade per course", top_k=2)
+    assert selected[:2] == ["report_cards", "courses"]
+    assert "library_books" not in selected
+
+def test_select_adds_join_path_tables(index):
+    # users and report_cards are only connected through students
+    assert index.join_path(["users"], "report_cards") == ["students", "report_cards"]
+    selected = index.select("role of everyone with a report card", top_k=2)
+    assert set(selected) == {"users", "students", "report_cards"}
+
+def test_sample_values_are_searchable(index):
+    assert index.select("science books")[0] == "library_books"
+
+def test_no_match_returns_empty(index):
+    assert index.select("xyzzy") == []
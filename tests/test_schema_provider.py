@@ -0,0 +1,81 @@
+import sqlite3
+import pytest
+from src.retrieval.schema_provider import SchemaProvider
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = str(tmp_path / "snapshot.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+    CREATE TABLE departments (id INTEGER PRIMARY KEY, name TEXT);
+    CREATE TABLE teachers (user_id INTEGER PRIMARY KEY, department_id INTEGER,
+        FOREIGN KEY (department_id) REFERENCES departments(id));
+    INSERT INTO departments (name) VALUES ('Science');
+    """)
+    conn.commit()
+    conn.close()
+    return path
+
+def make_provider(db_path):
+    provider = SchemaProvider(db_path)
+    # Warm the stats catalog so background refreshes don't race the assertions
+    provider.stats.refresh()
+    return provider
+
+def test_summary_is_cached_until_database_changes(db_path):
+    provider = make_provider(db_path)
+    first = provider.get_schema_summary()
+    second = provider.get_schema_summary()
+    assert first is second
+    assert provider.rebuilds == 1
+    assert "FK: department_id -> departments.id" in first
+
+def test_ddl_change_rebuilds_snapshot(db_path):
+    provider = make_provider(db_path)
+    provider.get_schema_summary()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE clubs (id INTEGER PRIMARY KEY, name TEXT)")
+    conn.commit()
+    conn.close()
+
+    assert "clubs" in provider.get_full_schema()
+    assert provider.rebuilds == 2
+
+def test_samples_come_from_stats_catalog(db_path):
+    provider = SchemaProvider(db_path)
+    provider.get_schema_summary()
+    provider.stats.wait()
+    assert "samples: Science" in provider.get_schema_summary()
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("INSERT INTO departments (name) VALUES ('Math')")
+    conn.commit()
+    conn.close()
+
+    # Data changes are picked up by the stats refresh, not on the request path
+    assert "Math" not in provider.get_schema_summary()
+    assert provider.stats.refresh() == ["departments"]
+    assert "Math" in provider.get_schema_summary()
+
+def test_invalidate_forces_rebuild(db_path):
+    provider = make_provider(db_path)
+    version = provider.version
+    provider.invalidate()
+    assert provider.version == version
+    assert provider.rebuilds == 2
+
+def test_relevant_summary_prunes_tables(db_path):
+    conn = sqlite3.connect(db_path)
+    conn.execute("CREATE TABLE library_books (id INTEGER PRIMARY KEY, title TEXT, category TEXT)")
+    conn.commit()
+    conn.close()
+
+    provider = make_provider(db_path)
+    summary = provider.get_relevant_summary("Which department has the most teachers?")
+    assert "Table 'teachers'" in summary
+    assert "Table 'departments'" in summary
+    assert "library_books" not in summary
+    assert "showing 2 of 3 tables" in summary
+    # Nothing matches: fall back to the full schema
+    assert provider.get_relevant_summary("xyzzy") == provider.get_schema_summary()
@@ -0,0 +1,96 @@
+import asyncio
+import pytest
+from unittest.mock import MagicMock
+from src.agents.query_lifecycle import QueryLifecycleAgent
+from src.agents.single_flight import SingleFlight
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_execution():
+    flight = SingleFlight()
+    calls = 0
+
+    async def resolve():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return {"sql": "SELECT 1"}
+
+    results = await asyncio.gather(*[flight.do("q", resolve) for _ in range(10)])
+    assert calls == 1 and all(r == {"sql": "SELECT 1"} for r in results)
+    assert flight.metrics() == {"leaders": 1, "coalesced": 9, "failed": 0, "abandoned": 0, "in_flight": 0}
+
+    # Finished calls are not remembered
+    await flight.do("q", resolve)
+    assert calls == 2
+
+@pytest.mark.asyncio
+async def test_errors_reach_every_waiter():
+    flight = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("model down")
+
+    results = await asyncio.gather(flight.do("q", boom), flight.do("q", boom), return_exceptions=True)
+    assert [type(r) for r in results] == [ValueError, ValueError]
+    assert flight.metrics()["failed"] == 1
+
+@pytest.mark.asyncio
+async def test_cancelling_one_waiter_keeps_the_call_for_the_others():
+    flight = SingleFlight()
+    started = asyncio.Event()
+    release = asyncio.Event()
+
+    async def slow():
+        started.set()
+        await release.wait()
+        return "done"
+
+    first = asyncio.ensure_future(flight.do("q", slow))
+    second = asyncio.ensure_future(flight.do("q", slow))
+    await started.wait()
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await second == "done"
+    assert first.cancelled()
+
+@pytest.mark.asyncio
+async def test_call_is_cancelled_when_every_waiter_leaves():
+    flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def slow():
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiters = [asyncio.ensure_future(flight.do("q", slow)) for _ in range(3)]
+    await asyncio.sleep(0.01)
+    for w in waiters:
+        w.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert flight.in_flight() == 0 and flight.metrics()["abandoned"] == 1
+
+@pytest.mark.asyncio
+async def test_lifecycle_coalesces_identical_questions():
+    orchestrator = QueryLifecycleAgent()
+    calls = 0
+
+    async def ainvoke(messages):
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        response = MagicMock()
+        response.content = "SELECT name FROM courses"
+        return response
+
+    model = MagicMock()
+    model.ainvoke = ainvoke
+    orchestrator.intent_agent.models = [model]
+
+    results = await asyncio.gather(*[orchestrator.run("Which courses exist?", {"role": "teacher"}) for _ in range(5)])
+    assert calls == 1
+    assert len({r["answer"] for r in results}) == 1
@@ -1,4 +1,6 @@
 import pytest
+from scripts.init_school_db import init_db
+from src.retrieval.db_client import DBClient
 from src.retrieval.sql_builder import SQLBuilder
 
 @pytest.fixture
@@ -65,3 +67,52 @@ def test_sql_complex_selection_subset():
     }
     # Expected SQL should handle multiple joins and specific column aliasing
     pass
+
+def test_build_parameterizes_filters_and_reuses_the_template(generator):
+    """Requirement: Same intent shape, one compiled template; values travel as bind parameters."""
+    def intent(status, student_id):
+        return {
+            "entity": "attendance",
+            "filters": [
+                {"column": "status", "operator": "==", "value": status},
+                {"column": "student_id", "operator": "==", "value": student_id},
+            ],
+        }
+    first = generator.build(intent("present", 3))
+    second = generator.build(intent("absent'; DROP TABLE users; --", 4))
+    assert first.sql == second.sql
+    assert "status = ?" in first.sql and "present" not in first.sql
+    assert first.params == ("present", 3)
+    assert second.params == ("absent'; DROP TABLE users; --", 4)
+    assert generator.metrics()["misses"] == 1 and generator.metrics()["hits"] == 1
+
+    between = generator.build({
+        "entity": "invoices",
+        "filters": [{"column": "created_at", "operator": "BETWEEN", "value": ["2023-01-01", "2023-06-30"]}],
+    })
+    assert "BETWEEN ? AND ?" in between.sql
+    assert between.params == ("2023-01-01", "2023-06-30")
+    assert generator.build({"action": "aggregate", "function": "AVG", "target": "grade.score", "group_by": "class.id"}).params is None
+
+def test_build_targets_the_configured_dialect():
+    statement = SQLBuilder(dialect="postgresql").build({"entity": "attendance", "filters": [{"column": "status", "operator": "==", "value": "late"}]})
+    assert "status = %(filter_0)s" in statement.sql
+    assert statement.params == {"filter_0": "late"}
+    with pytest.raises(ValueError):
+        SQLBuilder(dialect="oracle")
+
+def test_parameterized_statement_runs_and_caches_per_value(generator, tmp_path):
+    path = str(tmp_path / "school.db")
+    init_db(path, scale=0.1, days=2)
+    client = DBClient(path, workload=False)
+
+    def attendance(status):
+        return generator.build({"entity": "attendance", "filters": [{"column": "status", "operator": "==", "value": status}]})
+
+    statement = attendance("Present")
+    present = client.execute(statement.sql, params=statement.params)
+    expected = client.execute(generator.generate({"entity": "attendance", "filters": [{"column": "status", "operator": "==", "value": "Present"}]}))
+    assert not present.error
+    assert present.rows == expected.rows and len(present) > 0
+    # Same SQL text, different values: separate result-cache entries
+    assert client.cache_key(*attendance("Present")) != client.cache_key(*attendance("absent"))
@@ -0,0 +1,43 @@
+import json
+import time
+import subprocess
+import sys
+from fastapi.testclient import TestClient
+from src.gateway import main
+
+HEAVY_MODULES = ["langgraph", "langchain_openai", "langchain_google_genai", "src.agents.query_lifecycle"]
+
+def test_gateway_import_is_light():
+    # A fresh interpreter, so modules loaded by other tests do not count
+    code = (
+        "import sys, time, json\n"
+        "started = time.perf_counter()\n"
+        "import src.gateway.main\n"
+        "elapsed = time.perf_counter() - started\n"
+        f"print(json.dumps({{'elapsed_s': elapsed, 'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules]}}))\n"
+    )
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    report = json.loads(out.stdout.strip().splitlines()[-1])
+    print(f"gateway import took {report['elapsed_s'] * 1000:.0f} ms")
+    assert report["loaded"] == []
+
+def test_lifespan_warms_up_and_reports_ready(monkeypatch):
+    monkeypatch.setitem(main._warmup, "state", "pending")
+    with TestClient(main.app) as client:
+        for _ in range(200):
+            response = client.get("/ready")
+            if response.status_code == 200:
+                break
+            assert response.json()["state"] in ("pending", "warming")
+            time.sleep(0.05)
+        assert response.status_code == 200
+        assert response.json()["state"] == "ready"
+        assert main._orchestrator is not None
+
+def test_ready_without_warm_up(monkeypatch):
+    monkeypatch.setenv("SUTRADHARA_WARMUP", "0")
+    monkeypatch.setitem(main._warmup, "state", "pending")
+    with TestClient(main.app) as client:
+        response = client.get("/ready")
+    assert response.status_code == 200
+    assert response.json()["state"] == "disabled"
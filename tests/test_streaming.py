@@ -0,0 +1,126 @@
+import asyncio
+import json
+import sqlite3
+import threading
+import pytest
+from unittest.mock import patch, MagicMock, AsyncMock
+from src.retrieval.async_executor import AsyncQueryExecutor
+from src.retrieval.connection_pool import ConnectionPool
+from src.retrieval.db_client import DBClient
+from fastapi.testclient import TestClient
+from src.gateway.main import app, get_orchestrator
+
+@pytest.fixture
+def client(tmp_path):
+    path = str(tmp_path / "stream.db")
+    conn = sqlite3.connect(path)
+    conn.execute("CREATE TABLE attendance (id INTEGER PRIMARY KEY, status TEXT)")
+    conn.executemany("INSERT INTO attendance (status) VALUES (?)", [("Present",)] * 1050)
+    conn.commit()
+    conn.close()
+    return DBClient(path, pool=ConnectionPool(path))
+
+@pytest.fixture
+def orchestrator():
+    orchestrator = get_orchestrator()
+    # The gateway orchestrator is shared; answers cached by other tests must not leak in
+    orchestrator.question_cache.clear()
+    return orchestrator
+
+def test_iter_chunks_uses_fetchmany(client):
+    chunks = list(client.iter_chunks("SELECT id, status FROM attendance", chunk_size=500))
+    assert chunks[0] == ("columns", ["id", "status"])
+    assert [len(rows) for kind, rows in chunks[1:]] == [500, 500, 50]
+    assert chunks[1][1][0] == (1, "Present")
+
+def test_iter_chunks_reports_errors(client):
+    assert list(client.iter_chunks("SELECT nope FROM attendance")) == [("error", {"error": "no such column: nope"})]
+
+@pytest.mark.asyncio
+async def test_astream_delivers_all_rows(client):
+    total = 0
+    async for kind, payload in client.astream("SELECT * FROM attendance", chunk_size=100, max_buffered_chunks=2):
+        if kind == "rows":
+            total += len(payload)
+    assert total == 1050
+    assert client.pool.metrics()["in_use"] == 0
+
+@pytest.mark.asyncio
+async def test_closing_astream_early_releases_the_query(client):
+    stream = client.astream("SELECT * FROM attendance", chunk_size=10, max_buffered_chunks=1)
+    assert (await stream.__anext__())[0] == "columns"
+    await stream.aclose()
+    assert client.executor.metrics()["running"] == 0
+    assert client.pool.metrics()["in_use"] == 0
+
+@pytest.mark.asyncio
+async def test_astream_reports_a_saturated_executor_instead_of_hanging(client):
+    client.executor = AsyncQueryExecutor(max_workers=1, max_queue=1)
+    release = threading.Event()
+    busy = [asyncio.ensure_future(client.executor.run(release.wait)) for _ in range(2)]
+    await asyncio.sleep(0.05)
+    try:
+        async def collect():
+            return [item async for item in client.astream("SELECT * FROM attendance")]
+        events = await asyncio.wait_for(collect(), timeout=5)
+    finally:
+        release.set()
+        await asyncio.gather(*busy)
+    assert len(events) == 1 and events[0][0] == "error"
+    assert "queue is full" in events[0][1]["error"]
+    assert client.executor.metrics()["rejected"] == 1
+
+def test_stream_endpoint_emits_ndjson(orchestrator):
+    mock_res = MagicMock()
+    mock_res.content = "SELECT name FROM departments"
+    fake_model = MagicMock()
+    fake_model.ainvoke = AsyncMock(return_value=mock_res)
+    with patch.object(orchestrator.intent_agent, "models", [fake_model]):
+        response = TestClient(app).post("/api/v1/ask/stream", json={"query": "list departments"})
+
+    assert response.status_code == 200
+    events = [json.loads(line) for line in response.text.splitlines()]
+    assert events[0] == {"type": "sql", "sql": "SELECT name FROM departments"}
+    assert events[1] == {"type": "columns", "columns": ["name"]}
+    assert events[-1]["type"] == "end"
+    assert events[-1]["row_count"] == sum(len(e["rows"]) for e in events if e["type"] == "rows")
+
+def _sse_events(text):
+    events = []
+    for block in text.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.splitlines())
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_events_endpoint_streams_stages_then_rows_then_answer(orchestrator):
+    mock_res = MagicMock()
+    mock_res.content = "SELECT name FROM departments"
+    fake_model = MagicMock()
+    fake_model.ainvoke = AsyncMock(return_value=mock_res)
+    with patch.object(orchestrator.intent_agent, "models", [fake_model]):
+        response = TestClient(app).post("/api/v1/ask/events", json={"query": "name every department"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = _sse_events(response.text)
+    kinds = [kind for kind, _ in events]
+    stages = [data["stage"] for kind, data in events if kind == "stage"]
+    assert stages == ["match_template", "fetch_schema", "resolve_intent", "enforce_policy", "plan_query"]
+    assert all(data["duration_ms"] >= 0 for kind, data in events if kind == "stage")
+    assert kinds.index("sql") > kinds.index("stage") and kinds.index("sql") < kinds.index("columns")
+    assert kinds[-1] == "answer"
+    answer = events[-1][1]
+    assert answer["row_count"] == sum(len(data["rows"]) for kind, data in events if kind == "rows")
+    assert "SQL used" in answer["answer"]
+
+def test_events_endpoint_reports_clarification(orchestrator):
+    mock_res = MagicMock()
+    mock_res.content = "CLARIFICATION: Which term?"
+    fake_model = MagicMock()
+    fake_model.ainvoke = AsyncMock(return_value=mock_res)
+    with patch.object(orchestrator.intent_agent, "models", [fake_model]):
+        response = TestClient(app).post("/api/v1/ask/events", json={"query": "grades for the term please"})
+
+    events = _sse_events(response.text)
+    assert events[-1] == ("clarification", {"clarification": {"clarification": "Which term?"}})
+    assert "sql" not in [kind for kind, _ in events]
@@ -0,0 +1,86 @@
+import asyncio
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+from scripts.init_school_db import init_db
+from src.agents.query_lifecycle import QueryLifecycleAgent
+from src.agents.template_matcher import TemplateMatcher
+from src.telemetry.metrics import registry
+
+@pytest.fixture(scope="module")
+def db_path(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp("templates") / "school.db")
+    init_db(path, scale=0.1, days=3)
+    return path
+
+@pytest.fixture
+def orchestrator(db_path):
+    orchestrator = QueryLifecycleAgent(db_path)
+    model = MagicMock()
+    model.ainvoke = AsyncMock(return_value=MagicMock(content="SELECT name FROM departments"))
+    orchestrator.intent_agent.models = [model]
+    return orchestrator
+
+def test_matches_common_shapes_with_slots_resolved_against_the_schema(orchestrator):
+    schema = orchestrator.schema_provider.get_full_schema()
+    matcher = TemplateMatcher()
+
+    match = matcher.match("What is the average grade per course?", schema)
+    assert match.template == "average_grade_per_course"
+    assert "AVG(report_cards.grade)" in match.statement.sql and match.statement.params is None
+
+    match = matcher.match("  show attendance for  Alice Smith ", schema)
+    assert match.template == "attendance_for_student"
+    assert "users.name LIKE ?" in match.statement.sql and match.statement.params == ("Alice Smith",)
+
+    match = matcher.match("List all the students in grade 10.", schema)
+    assert match.template == "students_in_grade" and match.statement.params == (10,)
+
+    # A slot that does not look like a student name falls back to the LLM
+    assert matcher.match("attendance for the students who missed the most days", schema) is None
+    assert matcher.match("Which department has the most teachers?", schema) is None
+    # Without the tables a template needs, it never matches
+    assert matcher.match("What is the average grade per course?", {}) is None
+
+    metrics = matcher.metrics()
+    assert (metrics["lookups"], metrics["matched"], metrics["misses"]) == (6, 3, 3)
+    assert metrics["templates"]["attendance_for_student"]["unresolved"] == 1
+    assert metrics["templates"]["students_in_grade"]["hit_rate"] == round(1 / 6, 4)
+
+@pytest.mark.parametrize("question", [
+    "Show attendance for absent students",
+    "attendance for teachers",
+    "attendance for Teachers",
+    "attendance for late arrivals",
+    "attendance for Alice in March",
+    "attendance for March",
+    "attendance of students yesterday",
+])
+def test_attendance_slot_accepts_only_a_proper_name(orchestrator, question):
+    schema = orchestrator.schema_provider.get_full_schema()
+    assert TemplateMatcher().match(question, schema) is None
+
+def test_name_filters_are_case_insensitive_on_postgresql(orchestrator):
+    schema = orchestrator.schema_provider.get_full_schema()
+    match = TemplateMatcher(dialect="postgresql").match("attendance for Alice Smith", schema)
+    assert "users.name ILIKE %(filter_0)s" in match.statement.sql
+    assert match.intent["filters"][0]["operator"] == "ILIKE"
+    assert "ILIKE" not in TemplateMatcher().match("attendance for Alice Smith", schema).statement.sql
+
+def test_template_hit_skips_the_llm(orchestrator):
+    hits_before = registry.counter("template_lookups_total", template="students_in_grade", outcome="hit")
+    result = asyncio.run(orchestrator.run("List the students in grade 10", output={"format": "json"}))
+
+    orchestrator.intent_agent.models[0].ainvoke.assert_not_called()
+    assert list(result["timings"]) == ["match_template", "enforce_policy", "plan_query", "execute_sql", "summarize"]
+    assert result["intent"]["template"] == "students_in_grade"
+    assert result["params"] == (10,)
+    assert not result["data"].error and len(result["data"]) > 0
+    assert set(result["data"].column("grade_level")) == {10}
+    assert registry.counter("template_lookups_total", template="students_in_grade", outcome="hit") == hits_before + 1
+
+def test_template_miss_falls_back_to_the_llm(orchestrator):
+    result = asyncio.run(orchestrator.run("name every department"))
+    orchestrator.intent_agent.models[0].ainvoke.assert_called_once()
+    assert "match_template" in result["timings"] and "resolve_intent" in result["timings"]
+    assert result["params"] is None
+    assert orchestrator.metrics()["template_matcher"]["misses"] == 1